@@ -1,10 +1,7 @@
 import pandas as pd
 import numpy as np
 
-# ===============================
-# 데이터 로드
-# ===============================
-df = pd.read_csv("data/raw_data.csv")
+from feature_store import load_training_frame
 
 # ===============================
 # 분석 대상 feature (RF 상위 12개)
@@ -24,6 +21,11 @@ top_features = [
     "MA20_slope"
 ]
 
+# ===============================
+# 데이터 로드 (없는 피처 컬럼은 피처 저장소에서)
+# ===============================
+df = load_training_frame("data/raw_data.csv", top_features)
+
 # ===============================
 # 성공 / 실패 분리
 # ===============================
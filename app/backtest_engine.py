@@ -0,0 +1,712 @@
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from panel_cube import open_cube
+from ev_rank import build_ev_rank, entry_ticker, held_present
+
+# ============================================================
+# 파라미터 그리드
+# ============================================================
+
+def build_param_grid(ev, ev_quantiles, holding_days_list, stop_levels, profit_targets):
+    param_grid = []
+    for q in ev_quantiles:
+        ev_cut = ev.quantile(q)
+        for max_days in holding_days_list:
+            for stop_level in stop_levels:
+                for profit_target in profit_targets:
+                    param_grid.append((q, ev_cut, profit_target, max_days, stop_level))
+    return param_grid
+
+
+def param_arrays(param_grid):
+    grid = np.array([p[1:] for p in param_grid], dtype=np.float64).reshape(-1, 4)
+    return {
+        "ev_cut": grid[:, 0],
+        "profit_target": grid[:, 1],
+        "max_days": grid[:, 2],
+        "stop_level": grid[:, 3],
+    }
+
+
+# ============================================================
+# 상태 벡터 (길이 P)
+# ============================================================
+
+def init_state(P, initial_seed):
+    return {
+        "seed": np.full(P, initial_seed, dtype=np.float64),
+        "in_position": np.zeros(P, dtype=bool),
+        "idle_days": np.zeros(P),
+        "total_trades": np.zeros(P),
+        "win_trades": np.zeros(P),
+        "total_shares": np.zeros(P),
+        "total_invested": np.zeros(P),
+        "holding_day": np.zeros(P),
+        "extending": np.zeros(P, dtype=bool),
+        "actual_max_holding_days": np.zeros(P),
+        # 원래 엔진과 동일하게 int64 (equity 갱신 시 정수로 절삭됨)
+        "max_equity": np.full(P, initial_seed),
+        "max_dd": np.zeros(P),
+        "picked_ticker": np.full(P, -1, dtype=np.int64),
+        "last_close": np.zeros(P),
+        "cycle_unit": np.zeros(P),
+        "cycle_start_seed": np.zeros(P),
+        "cycle_start_t": np.full(P, -1, dtype=np.int64),
+        "cycle_max_loss": np.zeros(P),
+        "exceeded_max_days_count": np.zeros(P),
+        "exceeded_flag": np.zeros(P, dtype=bool),
+        "total_holding_days_sum": np.zeros(P),
+        "in_position_days": np.zeros(P),
+    }
+
+
+# ============================================================
+# Trace 버퍼 (선택한 파라미터의 사이클 / 체결 기록, 컬럼 단위)
+# ============================================================
+
+EXIT_TYPES = np.array(["MAX_DAYS", "STOP", "PROFIT"])
+FILL_TYPES = np.array(["ENTRY", "DCA", "DCA_HALF", "EXTEND"])
+
+
+def new_trace(mask):
+    return {"mask": np.asarray(mask, dtype=bool), "cycles": {}, "fills": {}}
+
+
+def _emit(buf, **cols):
+    for key, arr in cols.items():
+        buf.setdefault(key, []).append(np.asarray(arr))
+
+
+def _concat_buffer(buf):
+    return {key: np.concatenate(arrs) for key, arrs in buf.items()}
+
+
+def trace_frames(trace, cube, param_grid):
+    dates = pd.to_datetime(np.asarray(cube["dates"]))
+    tickers = np.asarray(cube["tickers"])
+    grid = pd.DataFrame(
+        param_grid,
+        columns=["EV_quantile", "EV_cut", "Profit_Target", "Max_Holding_Days", "Stop_Level"],
+    ).drop(columns="EV_cut")
+
+    cyc = _concat_buffer(trace["cycles"])
+    cycles = pd.DataFrame()
+    if cyc:
+        cycles = pd.DataFrame({
+            "Param_Index": cyc["param"],
+            "Start_Date": dates[cyc["start_t"]],
+            "End_Date": dates[cyc["end_t"]],
+            "Ticker": tickers[cyc["ticker"]],
+            "Holding_Days": cyc["holding_day"],
+            "Start_Seed": cyc["start_seed"],
+            "End_Seed": cyc["end_seed"],
+            "Cycle_Return": cyc["cycle_return"],
+            "Exit_Type": EXIT_TYPES[cyc["exit_type"]],
+        })
+
+    fil = _concat_buffer(trace["fills"])
+    fills = pd.DataFrame()
+    if fil:
+        fills = pd.DataFrame({
+            "Param_Index": fil["param"],
+            "Date": dates[fil["t"]],
+            "Ticker": tickers[fil["ticker"]],
+            "Fill_Type": FILL_TYPES[fil["fill_type"]],
+            "Holding_Day": fil["holding_day"],
+            "Price": fil["price"],
+            "Invest": fil["invest"],
+            "Shares": fil["shares"],
+        })
+
+    # 날짜 순으로 쌓였으므로 파라미터별로 묶되 시간 순서는 유지
+    frames = []
+    for frame in [cycles, fills]:
+        if len(frame):
+            frame = frame.sort_values("Param_Index", kind="stable").reset_index(drop=True)
+            frame = pd.concat([grid.iloc[frame["Param_Index"]].reset_index(drop=True), frame], axis=1)
+        frames.append(frame)
+    return frames[0], frames[1]
+
+
+# ============================================================
+# 🔥 Vector Engine: 날짜마다 P개 상태를 마스크 연산으로 한 번에 전진
+# ============================================================
+
+EQUITY_BLOCK = 64
+
+
+def run_vector_engine(
+    cube, param_grid, initial_seed, state=None, t_start=0, trace=None, equity_out=None, t_end=None
+):
+    # state / t_start 를 주면 체크포인트 상태에서 t_start 일부터 이어서 진행 (t_end 일 직전까지)
+    # trace (new_trace) 를 주면 mask 에 해당하는 파라미터의 사이클 / 체결을 같은 패스에서 기록
+    # equity_out ((P, T) 배열 / memmap) 을 주면 일별 평가금액을 EQUITY_BLOCK 일 단위로 기록
+    params = param_arrays(param_grid)
+    ev_cut = params["ev_cut"]
+    profit_target = params["profit_target"]
+    max_days = params["max_days"]
+    stop_level = params["stop_level"]
+
+    P = len(param_grid)
+    if state is None:
+        s = init_state(P, initial_seed)
+    else:
+        s = {key: arr.copy() for key, arr in state.items()}
+
+    close = cube["Close"]
+    high = cube["High"]
+    rank = build_ev_rank(cube)
+
+    if equity_out is not None:
+        equity_block = np.empty((P, EQUITY_BLOCK), dtype=equity_out.dtype)
+        block_start = t_start
+
+    if t_end is None:
+        t_end = len(close)
+
+    for t in range(t_start, t_end):
+        close_t = close[t]
+        high_t = high[t]
+
+        # =========================
+        # 진입 전
+        # =========================
+        flat = ~s["in_position"]
+        pick = entry_ticker(rank, t, ev_cut)
+        enter = flat & (pick >= 0)
+        s["idle_days"][flat & ~enter] += 1
+
+        if enter.any():
+            price = close_t[pick[enter]]
+            s["cycle_start_seed"][enter] = s["seed"][enter]
+            s["cycle_unit"][enter] = s["cycle_start_seed"][enter] / max_days[enter]
+
+            invest = s["cycle_unit"][enter]
+            s["total_shares"][enter] = invest / price
+            s["total_invested"][enter] = invest
+            s["seed"][enter] -= invest
+
+            s["holding_day"][enter] = 1
+            s["extending"][enter] = False
+            s["exceeded_flag"][enter] = False
+            s["in_position"][enter] = True
+            s["picked_ticker"][enter] = pick[enter]
+            s["cycle_start_t"][enter] = t
+            s["last_close"][enter] = price
+
+            if trace is not None:
+                idx = np.flatnonzero(enter & trace["mask"])
+                _emit(
+                    trace["fills"],
+                    param=idx,
+                    t=np.full(len(idx), t),
+                    ticker=pick[idx],
+                    fill_type=np.zeros(len(idx), dtype=np.int64),
+                    holding_day=s["holding_day"][idx],
+                    price=close_t[pick[idx]],
+                    invest=s["total_invested"][idx],
+                    shares=s["total_shares"][idx],
+                )
+
+        # =========================
+        # 보유 중 (보유 종목이 없는 날은 아무것도 하지 않음)
+        # =========================
+        hold = ~flat & held_present(rank, t, s["picked_ticker"])
+        picked = np.maximum(s["picked_ticker"], 0)
+
+        row_close = close_t[picked]
+        row_high = high_t[picked]
+
+        s["holding_day"][hold] += 1
+        s["last_close"][hold] = row_close[hold]
+        s["actual_max_holding_days"][hold] = np.maximum(
+            s["actual_max_holding_days"][hold], s["holding_day"][hold]
+        )
+
+        exceeded = hold & (s["holding_day"] > max_days) & ~s["exceeded_flag"]
+        s["exceeded_max_days_count"][exceeded] += 1
+        s["exceeded_flag"][exceeded] = True
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg_price = s["total_invested"] / s["total_shares"]
+            current_return = (row_close - avg_price) / avg_price
+
+        # max_days 도달 시 분기
+        reach = hold & (s["holding_day"] >= max_days) & ~s["extending"]
+        sell_close = reach & (current_return >= stop_level)
+        s["extending"][reach & ~sell_close] = True
+
+        # 물타기 모드
+        ext = hold & ~sell_close & s["extending"]
+        sell_stop = ext & (row_high >= avg_price * (1 + stop_level))
+        ext_buy = ext & ~sell_stop
+
+        # 일반 구간
+        normal = hold & ~sell_close & ~s["extending"]
+        sell_profit = normal & (row_high >= avg_price * (1 + profit_target))
+        dca = normal & ~sell_profit
+
+        unit = s["cycle_unit"]
+        invest = np.where(
+            ext_buy, unit,
+            np.where(
+                dca & (row_close <= avg_price), unit,
+                np.where(dca & (row_close <= avg_price * 1.05), unit / 2, 0),
+            ),
+        )
+        buy = invest > 0
+        s["total_shares"][buy] += invest[buy] / row_close[buy]
+        s["total_invested"][buy] += invest[buy]
+        s["seed"][buy] -= invest[buy]
+
+        if trace is not None:
+            idx = np.flatnonzero(buy & trace["mask"])
+            _emit(
+                trace["fills"],
+                param=idx,
+                t=np.full(len(idx), t),
+                ticker=picked[idx],
+                fill_type=np.where(ext_buy[idx], 3, np.where(invest[idx] < unit[idx], 2, 1)),
+                holding_day=s["holding_day"][idx],
+                price=row_close[idx],
+                invest=invest[idx],
+                shares=invest[idx] / row_close[idx],
+            )
+
+        # 청산 (세 가지 청산 마스크는 서로 배타적)
+        sold = sell_close | sell_stop | sell_profit
+        if sold.any():
+            sell_price = np.where(
+                sell_close, row_close,
+                np.where(sell_stop, avg_price * (1 + stop_level), avg_price * (1 + profit_target)),
+            )[sold]
+            proceeds = s["total_shares"][sold] * sell_price
+            cycle_return = (proceeds - s["total_invested"][sold]) / s["total_invested"][sold]
+
+            s["cycle_max_loss"][sold] = np.minimum(s["cycle_max_loss"][sold], cycle_return)
+            s["seed"][sold] += proceeds
+            s["total_trades"][sold] += 1
+
+            win = np.zeros(P, dtype=bool)
+            win[sold] = cycle_return > 0
+            s["win_trades"][(sell_close & win) | sell_profit] += 1
+
+            s["total_holding_days_sum"][sold] += s["holding_day"][sold]
+
+            if trace is not None:
+                traced = trace["mask"][sold]
+                idx = np.flatnonzero(sold)[traced]
+                _emit(
+                    trace["cycles"],
+                    param=idx,
+                    start_t=s["cycle_start_t"][idx],
+                    end_t=np.full(len(idx), t),
+                    ticker=picked[idx],
+                    holding_day=s["holding_day"][idx],
+                    start_seed=s["cycle_start_seed"][idx],
+                    end_seed=s["seed"][idx],
+                    cycle_return=cycle_return[traced],
+                    exit_type=np.where(sell_close[idx], 0, np.where(sell_stop[idx], 1, 2)),
+                )
+
+            s["in_position"][sold] = False
+            s["total_shares"][sold] = 0
+            s["total_invested"][sold] = 0
+            s["holding_day"][sold] = 0
+            s["extending"][sold] = False
+            s["cycle_unit"][sold] = 0
+            s["cycle_start_seed"][sold] = 0
+            s["cycle_start_t"][sold] = -1
+            s["picked_ticker"][sold] = -1
+            s["last_close"][sold] = 0
+
+        # =========================
+        # MDD 계산 (청산일 / 보유 종목 결측일은 제외 — 기존 엔진과 동일)
+        # =========================
+        update = flat | (hold & ~sold)
+        picked = np.where(s["in_position"], s["picked_ticker"], 0)
+        current_value = np.where(s["in_position"], s["total_shares"] * close_t[picked], 0)
+        equity = s["seed"] + current_value
+
+        new_high = update & (equity > s["max_equity"])
+        s["max_equity"][new_high] = equity[new_high]
+
+        dd = (equity - s["max_equity"]) / s["max_equity"]
+        new_dd = update & (dd < s["max_dd"])
+        s["max_dd"][new_dd] = dd[new_dd]
+
+        s["in_position_days"][s["in_position"]] += 1
+
+        # =========================
+        # 일별 평가금액 (보유 종목 결측일은 마지막 종가로 평가)
+        # =========================
+        if equity_out is not None:
+            held_value = np.where(s["in_position"], s["total_shares"] * s["last_close"], 0)
+            equity_block[:, t - block_start] = s["seed"] + held_value
+
+            if t - block_start + 1 == EQUITY_BLOCK or t == t_end - 1:
+                equity_out[:, block_start : t + 1] = equity_block[:, : t - block_start + 1]
+                block_start = t + 1
+
+    return s
+
+
+def mark_to_market(cube, state):
+    last = len(cube["Close"]) - 1
+    picked = np.where(state["in_position"], state["picked_ticker"], 0)
+    alive = state["in_position"] & cube["present"][last, picked]
+    return np.where(alive, state["total_shares"] * cube["Close"][last, picked], 0)
+
+
+def equity_value(state):
+    # 진행 중인 상태의 평가금액 (보유분은 마지막으로 본 종가 기준, equity_out 과 동일)
+    held = np.where(state["in_position"], state["total_shares"] * state["last_close"], 0)
+    return state["seed"] + held
+
+
+# ============================================================
+# 멀티프로세스 샤딩
+# ============================================================
+# 각 워커는 cube_dir 를 mmap 으로 열기 때문에 패널은 복사되지 않는다 (page cache 공유).
+# 파라미터는 서로 독립이므로 샤드 순서대로 이어 붙이면 단일 프로세스 결과와 동일.
+
+def run_vector_shard(
+    cube_dir, param_grid, initial_seed, state=None, t_start=0, trace_mask=None, equity_rows=None
+):
+    cube = open_cube(cube_dir)
+    trace = None if trace_mask is None else new_trace(trace_mask)
+
+    # equity_rows = (equity.npy 경로, 시작 행) → 워커가 자기 행 구간에 직접 기록
+    equity_out = None
+    if equity_rows is not None:
+        equity_path, row_start = equity_rows
+        equity_mm = np.load(equity_path, mmap_mode="r+")
+        equity_out = equity_mm[row_start : row_start + len(param_grid)]
+
+    state = run_vector_engine(cube, param_grid, initial_seed, state, t_start, trace, equity_out)
+
+    if equity_out is not None:
+        equity_mm.flush()
+    return state, mark_to_market(cube, state), trace
+
+
+def slice_state(state, idx):
+    return {key: arr[idx] for key, arr in state.items()}
+
+
+def merge_states(states):
+    return {key: np.concatenate([s[key] for s in states]) for key in states[0]}
+
+
+def merge_traces(traces, shards):
+    # 샤드 로컬 Param_Index → 전체 그리드 인덱스
+    merged = new_trace(np.concatenate([tr["mask"] for tr in traces]))
+    for tr, idx in zip(traces, shards):
+        for kind in ["cycles", "fills"]:
+            for key, arrs in tr[kind].items():
+                if key == "param":
+                    arrs = [idx[a] for a in arrs]
+                merged[kind].setdefault(key, []).extend(arrs)
+    return merged
+
+
+def run_vector_engine_parallel(
+    cube_dir, param_grid, initial_seed, workers, state=None, t_start=0, trace=None, equity_path=None
+):
+    shards = [idx for idx in np.array_split(np.arange(len(param_grid)), workers) if len(idx)]
+
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        futures = [
+            executor.submit(
+                run_vector_shard,
+                cube_dir,
+                [param_grid[i] for i in idx],
+                initial_seed,
+                None if state is None else slice_state(state, idx),
+                t_start,
+                None if trace is None else trace["mask"][idx],
+                None if equity_path is None else (equity_path, int(idx[0])),
+            )
+            for idx in shards
+        ]
+        parts = [f.result() for f in futures]
+
+    state = merge_states([part[0] for part in parts])
+    final_value = np.concatenate([part[1] for part in parts])
+    if trace is not None:
+        merged = merge_traces([part[2] for part in parts], shards)
+        trace["cycles"], trace["fills"] = merged["cycles"], merged["fills"]
+    return state, final_value
+
+
+# ============================================================
+# Loop Engine (기존 파라미터별 pandas 루프, 검증용)
+# ============================================================
+
+def run_loop_engine(df, param_grid, initial_seed):
+    P = len(param_grid)
+    s = init_state(P, initial_seed)
+    s["picked_ticker"] = np.array([None] * P, dtype=object)
+
+    seed = s["seed"]
+    in_position = s["in_position"]
+    idle_days = s["idle_days"]
+    total_trades = s["total_trades"]
+    win_trades = s["win_trades"]
+    total_shares = s["total_shares"]
+    total_invested = s["total_invested"]
+    holding_day = s["holding_day"]
+    extending = s["extending"]
+    actual_max_holding_days = s["actual_max_holding_days"]
+    max_equity = s["max_equity"]
+    max_dd = s["max_dd"]
+    picked_ticker = s["picked_ticker"]
+    cycle_unit = s["cycle_unit"]
+    cycle_start_seed = s["cycle_start_seed"]
+    cycle_max_loss = s["cycle_max_loss"]
+    exceeded_max_days_count = s["exceeded_max_days_count"]
+    exceeded_flag = s["exceeded_flag"]
+    total_holding_days_sum = s["total_holding_days_sum"]
+
+    grouped = df.groupby("Date", sort=False)
+
+    for date, day_data in grouped:
+        day_data = day_data.set_index("Ticker")
+        daily_buy_done = np.zeros(P, dtype=bool)
+
+        for i, (q, ev_cut, profit_target, max_days, stop_level) in enumerate(param_grid):
+
+            # =========================
+            # 진입 전
+            # =========================
+            if not in_position[i]:
+                candidates = day_data[day_data["EV"] >= ev_cut]
+
+                if len(candidates) > 0 and not daily_buy_done[i]:
+                    pick = candidates.sort_values("EV", ascending=False).iloc[0]
+                    ticker = pick.name
+                    price = pick["Close"]
+
+                    cycle_start_seed[i] = seed[i]
+                    cycle_unit[i] = cycle_start_seed[i] / max_days
+
+                    invest = cycle_unit[i]
+                    shares = invest / price
+
+                    total_shares[i] = shares
+                    total_invested[i] = invest
+                    seed[i] -= invest
+
+                    holding_day[i] = 1
+                    extending[i] = False
+                    exceeded_flag[i] = False
+
+                    in_position[i] = True
+                    picked_ticker[i] = ticker
+                    daily_buy_done[i] = True
+                else:
+                    idle_days[i] += 1
+
+            # =========================
+            # 보유 중
+            # =========================
+            else:
+                if picked_ticker[i] not in day_data.index:
+                    continue
+
+                row = day_data.loc[picked_ticker[i]]
+
+                holding_day[i] += 1
+
+                actual_max_holding_days[i] = max(
+                    actual_max_holding_days[i], holding_day[i]
+                )
+
+                if holding_day[i] > max_days and not exceeded_flag[i]:
+                    exceeded_max_days_count[i] += 1
+                    exceeded_flag[i] = True
+
+                avg_price = total_invested[i] / total_shares[i]
+
+                # max_days 도달 시 분기
+                if holding_day[i] >= max_days and not extending[i]:
+
+                    current_return = (row["Close"] - avg_price) / avg_price
+
+                    if current_return >= stop_level:
+                        sell_price = row["Close"]
+                        proceeds = total_shares[i] * sell_price
+                        cycle_return = (proceeds - total_invested[i]) / total_invested[i]
+
+                        cycle_max_loss[i] = min(cycle_max_loss[i], cycle_return)
+
+                        seed[i] += proceeds
+                        total_trades[i] += 1
+
+                        if cycle_return > 0:
+                            win_trades[i] += 1
+
+                        total_holding_days_sum[i] += holding_day[i]
+
+                        in_position[i] = False
+                        total_shares[i] = 0
+                        total_invested[i] = 0
+                        holding_day[i] = 0
+                        extending[i] = False
+                        cycle_unit[i] = 0
+                        cycle_start_seed[i] = 0
+                        picked_ticker[i] = None
+                        continue
+                    else:
+                        extending[i] = True
+
+                # 물타기 모드
+                if extending[i]:
+
+                    if row["High"] >= avg_price * (1 + stop_level):
+                        sell_price = avg_price * (1 + stop_level)
+                        proceeds = total_shares[i] * sell_price
+                        cycle_return = (proceeds - total_invested[i]) / total_invested[i]
+
+                        cycle_max_loss[i] = min(cycle_max_loss[i], cycle_return)
+
+                        seed[i] += proceeds
+                        total_trades[i] += 1
+
+                        total_holding_days_sum[i] += holding_day[i]
+
+                        in_position[i] = False
+                        total_shares[i] = 0
+                        total_invested[i] = 0
+                        holding_day[i] = 0
+                        extending[i] = False
+                        cycle_unit[i] = 0
+                        cycle_start_seed[i] = 0
+                        picked_ticker[i] = None
+                        continue
+
+                    if not daily_buy_done[i]:
+                        close_price = row["Close"]
+                        invest = cycle_unit[i]
+                        shares = invest / close_price
+                        total_shares[i] += shares
+                        total_invested[i] += invest
+                        seed[i] -= invest
+                        daily_buy_done[i] = True
+
+                # 일반 구간
+                if not extending[i]:
+
+                    if row["High"] >= avg_price * (1 + profit_target):
+                        sell_price = avg_price * (1 + profit_target)
+                        proceeds = total_shares[i] * sell_price
+                        cycle_return = (proceeds - total_invested[i]) / total_invested[i]
+
+                        cycle_max_loss[i] = min(cycle_max_loss[i], cycle_return)
+
+                        seed[i] += proceeds
+                        total_trades[i] += 1
+                        win_trades[i] += 1
+
+                        total_holding_days_sum[i] += holding_day[i]
+
+                        in_position[i] = False
+                        total_shares[i] = 0
+                        total_invested[i] = 0
+                        holding_day[i] = 0
+                        extending[i] = False
+                        cycle_unit[i] = 0
+                        cycle_start_seed[i] = 0
+                        picked_ticker[i] = None
+                        continue
+
+                    close_price = row["Close"]
+
+                    if not daily_buy_done[i]:
+                        if close_price <= avg_price:
+                            invest = cycle_unit[i]
+                        elif close_price <= avg_price * 1.05:
+                            invest = cycle_unit[i] / 2
+                        else:
+                            invest = 0
+
+                        if invest > 0:
+                            shares = invest / close_price
+                            total_shares[i] += shares
+                            total_invested[i] += invest
+                            seed[i] -= invest
+                            daily_buy_done[i] = True
+
+            # =========================
+            # MDD 계산
+            # =========================
+            if in_position[i] and picked_ticker[i] in day_data.index:
+                current_price = day_data.loc[picked_ticker[i]]["Close"]
+                current_value = total_shares[i] * current_price
+            else:
+                current_value = 0
+
+            equity = seed[i] + current_value
+
+            if equity > max_equity[i]:
+                max_equity[i] = equity
+
+            dd = (equity - max_equity[i]) / max_equity[i]
+
+            if dd < max_dd[i]:
+                max_dd[i] = dd
+
+    # 마지막 날 평가금액
+    last_date = df["Date"].max()
+    last_day = df[df["Date"] == last_date].set_index("Ticker")
+    final_value = np.zeros(P)
+    for i in range(P):
+        if in_position[i] and picked_ticker[i] in last_day.index:
+            final_value[i] = total_shares[i] * last_day.loc[picked_ticker[i]]["Close"]
+
+    return s, final_value
+
+
+# ============================================================
+# 결과 생성
+# ============================================================
+
+def build_results(param_grid, state, final_value, scenario, initial_seed):
+    results = []
+
+    for i, (q, ev_cut, profit_target, max_days, stop_level) in enumerate(param_grid):
+
+        final_equity = state["seed"][i] + final_value[i]
+        total_trades = state["total_trades"][i]
+
+        success_rate = (
+            state["win_trades"][i] / total_trades if total_trades > 0 else 0
+        )
+
+        avg_holding = (
+            state["total_holding_days_sum"][i] / total_trades
+            if total_trades > 0 else 0
+        )
+
+        results.append({
+            "Scenario": scenario,
+            "EV_quantile": q,
+            "EV_cut": ev_cut,
+            "Profit_Target": profit_target,
+            "Max_Holding_Days": max_days,
+            "Actual_Max_Holding_Days": state["actual_max_holding_days"][i],
+            "Exceeded_Max_Days_Count": state["exceeded_max_days_count"][i],
+            "Avg_Holding_Days": avg_holding,
+            "Stop_Level": stop_level,
+            "Total_Return": (final_equity / initial_seed) - 1,
+            "Seed_Multiple": final_equity / initial_seed,
+            "Max_Drawdown": state["max_dd"][i],
+            "Max_Loss_Rate": state["cycle_max_loss"][i],
+            "Idle_Days": state["idle_days"][i],
+            "Success_Rate": success_rate,
+            "Cycle_Count": total_trades,
+        })
+
+    return pd.DataFrame(results)
@@ -1,127 +1,62 @@
+import argparse
 import pandas as pd
 import numpy as np
 from config import *
 
-df = pd.read_csv("data/scored_dataset.csv")
-df["Date"] = pd.to_datetime(df["Date"])
-df = df.sort_values("Date").reset_index(drop=True)
-
-def run_backtest(threshold, mode="A"):
-
-    capital = INITIAL_CAPITAL
-    trades = 0
-    wins = 0
-    holding_days = []
-
-    i = 0
-
-    while i < len(df) - DCA_DAYS:
-
-        row = df.iloc[i]
-
-        if row["Probability"] >= threshold:
-
-            trades += 1
-            total_invest = 0
-            total_shares = 0
-            start_index = i
-
-            # -----------------------
-            # 1차 40일 분할매수
-            # -----------------------
-            sold = False
-
-            for j in range(DCA_DAYS):
-
-                price = df.iloc[i+j]["Close"]
-                invest = capital / DCA_DAYS
-
-                total_invest += invest
-                total_shares += invest / price
-
-                avg_price = total_invest / total_shares
-                ret = price / avg_price - 1
-
-                if ret >= TARGET:
-                    capital *= (1 + TARGET)
-                    wins += 1
-                    holding_days.append(j+1)
-                    i += j+1
-                    sold = True
-                    break
-
-            if sold:
-                continue
-
-            # -----------------------
-            # 40일 종료 시점
-            # -----------------------
+from real_market_engine import MODES, CURVE_COLUMNS, run_sweep, threshold_curve
 
-            final_price = df.iloc[i + DCA_DAYS - 1]["Close"]
-            avg_price = total_invest / total_shares
-            ret = final_price / avg_price - 1
+CURVE_PATH = "data/threshold_curve.csv"
 
-            # ===== 전략 A =====
-            if mode == "A":
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--sweep",
+    action="store_true",
+    help="THRESHOLDS 대신 촘촘한 threshold 곡선 (자본 / 승률 / 보유일) 을 CSV 로 저장 "
+    "(거래 결과는 초기 자본 기준 → 기본 실행 결과와 반올림 수준 차이 가능)",
+)
+parser.add_argument("--sweep-min", type=float, default=0.50)
+parser.add_argument("--sweep-max", type=float, default=0.95)
+parser.add_argument("--sweep-step", type=float, default=0.001)
+args = parser.parse_args()
 
-                capital *= (1 + ret)
-                holding_days.append(DCA_DAYS)
-                i += DCA_DAYS
-                continue
-
-            # ===== 전략 B =====
-            if mode == "B":
-
-                # -10% 이하 손실이면 정리
-                if ret >= STOP_LOSS:
-                    capital *= (1 + ret)
-                    holding_days.append(DCA_DAYS)
-                    i += DCA_DAYS
-                    continue
-
-                # -10% 초과 손실 → 무한 추가매수
-                j = DCA_DAYS
-
-                while i + j < len(df):
-
-                    price = df.iloc[i+j]["Close"]
-                    invest = capital / DCA_DAYS
-
-                    total_invest += invest
-                    total_shares += invest / price
-
-                    avg_price = total_invest / total_shares
-                    ret = price / avg_price - 1
-
-                    if ret >= STOP_LOSS:
-                        capital *= (1 + STOP_LOSS)
-                        holding_days.append(j+1)
-                        break
-
-                    j += 1
-
-                i += j+1
-                continue
-
-        else:
-            i += 1
-
-    return {
-        "Threshold": threshold,
-        "Mode": mode,
-        "Trades": trades,
-        "WinRate": round(wins/trades,4) if trades else 0,
-        "FinalCapital": int(capital),
-        "TotalMultiple": round(capital/INITIAL_CAPITAL,2),
-        "AvgHoldingDays": round(np.mean(holding_days),2) if holding_days else 0,
-        "MaxHoldingDays": max(holding_days) if holding_days else 0
-    }
-
-results = []
+df = pd.read_csv("data/scored_dataset.csv")
+df["Date"] = pd.to_datetime(df["Date"])
+df = df.sort_values("Date").reset_index(drop=True)
 
-for th in THRESHOLDS:
-    results.append(run_backtest(th, "A"))
-    results.append(run_backtest(th, "B"))
+# ===============================
+# threshold 곡선 모드 (거래 결과를 시작일별로 공유)
+# ===============================
+if args.sweep:
+    n_steps = int(round((args.sweep_max - args.sweep_min) / args.sweep_step)) + 1
+    thresholds = np.round(np.linspace(args.sweep_min, args.sweep_max, n_steps), 6)
+
+    curve = pd.DataFrame(
+        threshold_curve(df["Close"].to_numpy(np.float64), df["Probability"].to_numpy(np.float64), thresholds),
+        columns=CURVE_COLUMNS,
+    )
+    curve.to_csv(CURVE_PATH, index=False)
+
+    print(f"✅ threshold 곡선 저장: {CURVE_PATH} ({len(thresholds)}개 × 모드 {MODES})")
+    print("ℹ️ 곡선은 거래별 결과를 초기 자본 기준으로 한 번만 계산 → 기본 실행 (THRESHOLDS, simulate) 과는 "
+          "EPS 경계 거래에서 자본 반올림 수준 차이가 날 수 있음")
+    for mode in MODES:
+        best = curve[curve["Mode"] == mode].sort_values("FinalCapital", ascending=False).iloc[0]
+        print(f"🔥 모드 {mode} 최고: threshold {best['Threshold']} → x{best['TotalMultiple']} "
+              f"(거래 {best['Trades']}, 승률 {best['WinRate']})")
+    raise SystemExit
+
+# ===============================
+# 전체 threshold × 모드 A/B 한 번에 (real_market_engine.py)
+# ===============================
+# 결과는 (threshold, mode) 로 memo → 아래 출력은 다시 시뮬레이션하지 않는다
+sweep = run_sweep(
+    df["Close"].to_numpy(np.float64),
+    df["Probability"].to_numpy(np.float64),
+    THRESHOLDS,
+    MODES,
+)
+
+results = [sweep[(th, mode)] for th in THRESHOLDS for mode in MODES]
 
 result_df = pd.DataFrame(results)
 print(result_df)
@@ -131,6 +66,6 @@ result_df.to_csv("data/backtest_results.csv", index=False)
 
 
 for th in THRESHOLDS:
-    print(run_backtest(th, "A"))
-    print(run_backtest(th, "B"))
+    print(sweep[(th, "A")])
+    print(sweep[(th, "B")])
     print("-"*60)
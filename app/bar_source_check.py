@@ -0,0 +1,99 @@
+import argparse
+import tempfile
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+import numpy as np
+
+from bar_store import BAR_FIELDS, http_source, load_universe
+
+# ============================================================
+# load_universe + http_source 점검 (로컬 대역 HTTP 서버)
+# ============================================================
+# 127.0.0.1 에 임시 서버를 띄우고 임시 저장소로 load_universe 를 돌린다.
+#   - FLAKY : 처음 FAIL_TIMES 번은 503 → backoff 재시도 후 성공해야 함
+#   - NOPE  : 404 → 재시도 없이 1번만 요청, 오류 리포트에 남아야 함
+#   - SPY   : 두 번 넘겨도 1번만 요청 (중복 제거)
+# 점검 하나라도 실패하면 종료 코드 1.
+
+FAIL_TIMES = 2
+
+
+def synthetic_csv(days=50, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, days)))
+    df = pd.DataFrame(
+        {"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close, "Volume": 1e6},
+        index=pd.bdate_range("2024-01-02", periods=days, name="Date"),
+    )
+    return df[BAR_FIELDS].to_csv().encode()
+
+
+def make_server(body):
+    hits = Counter()
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            ticker = self.path.strip("/").removesuffix(".csv")
+            with lock:
+                hits[ticker] += 1
+                n = hits[ticker]
+            if ticker == "NOPE":
+                self.send_error(404)
+            elif ticker == "FLAKY" and n <= FAIL_TIMES:
+                self.send_error(503)
+            else:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/csv")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    return server, hits
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    body = synthetic_csv()
+    server, hits = make_server(body)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        with tempfile.TemporaryDirectory() as store_dir:
+            bars, errors = load_universe(
+                ["SPY", "FLAKY", "NOPE", "SPY"],
+                "2024-01-01",
+                source=http_source(url, timeout=5),
+                store_dir=store_dir,
+                workers=args.workers,
+                backoff=0.05,
+            )
+    finally:
+        server.shutdown()
+
+    checks = [
+        ("5xx 재시도 후 성공", hits["FLAKY"] == FAIL_TIMES + 1 and "FLAKY" not in errors and len(bars["FLAKY"]) == 50),
+        ("404 재시도 없음", hits["NOPE"] == 1 and "HTTPError" in errors.get("NOPE", "")),
+        ("중복 종목 1회 요청", hits["SPY"] == 1 and len(bars["SPY"]) == 50),
+        ("오류 리포트는 NOPE 만", set(errors) == {"NOPE"}),
+    ]
+
+    print(f"📊 요청 수: {dict(hits)}")
+    for name, ok in checks:
+        print(f"{'✅' if ok else '⚠️'} {name}")
+    if not all(ok for _, ok in checks):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
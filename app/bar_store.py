@@ -0,0 +1,311 @@
+import io
+import os
+import time
+import urllib.error
+import urllib.request
+import pandas as pd
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# ============================================================
+# 로컬 OHLCV 저장소 (종목당 컬럼형 파일 1개 + 증분 갱신)
+# ============================================================
+# data/bars/<TICKER>.npz : Date(datetime64) + Open/High/Low/Close/Volume
+#
+# load_bars() 는 저장된 마지막 날짜 이후 구간만 source 에서 받아 붙인다.
+# (마지막 봉은 다시 받아 덮어쓴다. 같은 날 두 번째 호출부터는 받지 않지만,
+#  마지막 봉 날짜가 마지막 갱신일 이후면 장중 봉일 수 있어서 매번 다시 받는다)
+# fetched_on 은 뒤쪽 구간을 실제로 받아 온 (비어 있지 않은) 경우에만 오늘로 바뀐다.
+# 앞/뒤 구간은 저장된 확정 봉 1개와 겹치게 받아서 가격을 비교한다. 다르면 (분할 / 배당으로
+# auto-adjust 값이 바뀐 경우) 붙이지 않고 requested_start 부터 전체를 다시 받는다.
+# source 는 fetch(ticker, start, end) → Date 인덱스 DataFrame 인 함수면 된다.
+#   - yfinance_source : 기본
+#   - local_source(dir) : <dir>/<TICKER>.csv 에서 읽음 (오프라인 테스트용)
+#   - http_source(url)  : <url>/<TICKER>.csv 를 HTTP 로 받음 (로컬 대역 서버 테스트용)
+# 환경변수 BAR_SOURCE_DIR / BAR_SOURCE_URL 이 있으면 기본 source 가 바뀐다.
+#
+# load_universe() 는 여러 종목을 스레드 풀로 동시에 갱신한다
+# (중복 종목 1회, 요청별 timeout, 실패 시 backoff 재시도, 종목별 오류 리포트).
+# 실패는 예외로 올린다: Ticker.history 는 실패해도 예외 없이 빈 프레임을 돌려주므로
+# 처음 받기 / 뒤쪽 구간이 비어 있으면 EmptyFetchError (재시도 대상).
+# 없는 종목 (404 / 파일 없음) 은 재시도하지 않고 바로 오류 리포트로.
+
+BAR_DIR = "data/bars"
+BAR_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+FETCH_WORKERS = 8
+FETCH_TIMEOUT = 30
+FETCH_RETRIES = 3
+FETCH_BACKOFF = 1.0
+
+# 겹치는 봉 비교 (가격만, 거래량은 사후 정정이 잦다)
+OVERLAP_FIELDS = ["Open", "High", "Low", "Close"]
+OVERLAP_RTOL = 1e-6
+
+
+class EmptyFetchError(ValueError):
+    pass
+
+
+# ===============================
+# Source
+# ===============================
+def yfinance_source(ticker, start=None, end=None):
+    import yfinance as yf
+
+    # yf.download 는 결과를 모듈 전역 (yf.shared._DFS / _ERRORS) 에 모아서
+    # load_universe 의 스레드끼리 섞일 수 있다 → 종목별 Ticker.history 사용
+    # (실패 / 없는 종목은 빈 프레임 → _fetch 에서 EmptyFetchError)
+    period = "max" if start is None else None
+    return yf.Ticker(ticker).history(
+        period=period, start=start, end=end, auto_adjust=True, timeout=FETCH_TIMEOUT
+    )
+
+
+def local_source(root):
+    def fetch(ticker, start=None, end=None):
+        path = os.path.join(root, f"{ticker}.csv")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{ticker}: {path} 없음")
+        df = pd.read_csv(path, parse_dates=["Date"], index_col="Date", float_precision="round_trip")
+        return _slice(df, start, end)
+    return fetch
+
+
+def http_source(base_url, timeout=FETCH_TIMEOUT):
+    def fetch(ticker, start=None, end=None):
+        url = f"{base_url.rstrip('/')}/{ticker}.csv"
+        with urllib.request.urlopen(url, timeout=timeout) as resp:
+            body = resp.read()
+        df = pd.read_csv(
+            io.BytesIO(body), parse_dates=["Date"], index_col="Date", float_precision="round_trip"
+        )
+        return _slice(df, start, end)
+    return fetch
+
+
+def default_source():
+    if os.environ.get("BAR_SOURCE_URL"):
+        return http_source(os.environ["BAR_SOURCE_URL"])
+    if os.environ.get("BAR_SOURCE_DIR"):
+        return local_source(os.environ["BAR_SOURCE_DIR"])
+    return yfinance_source
+
+
+# ===============================
+# 저장 / 읽기
+# ===============================
+def _slice(df, start=None, end=None):
+    # [start, end) — yfinance 의 start / end 와 같은 규칙
+    if start is not None:
+        df = df[df.index >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df.index < pd.Timestamp(end)]
+    return df
+
+
+def _normalize(df):
+    df = df.reindex(columns=BAR_FIELDS).astype(np.float64)
+    df.index = pd.DatetimeIndex(df.index).tz_localize(None).normalize()
+    df.index.name = "Date"
+    return df[~df.index.duplicated(keep="last")].sort_index()
+
+
+def bar_path(ticker, store_dir=BAR_DIR):
+    return os.path.join(store_dir, f"{ticker}.npz")
+
+
+def read_bars(ticker, store_dir=BAR_DIR):
+    # (bars, meta) — meta: requested_start (요청받은 가장 이른 시작일), fetched_on (마지막 갱신일)
+    path = bar_path(ticker, store_dir)
+    if not os.path.exists(path):
+        return None, None
+
+    with np.load(path) as f:
+        df = pd.DataFrame(
+            {field: f[field] for field in BAR_FIELDS},
+            index=pd.DatetimeIndex(f["Date"], name="Date"),
+        )
+        meta = {
+            "requested_start": pd.Timestamp(f["requested_start"][()]),
+            "fetched_on": pd.Timestamp(f["fetched_on"][()]),
+        }
+    return df, meta
+
+
+def write_bars(ticker, df, meta, store_dir=BAR_DIR):
+    os.makedirs(store_dir, exist_ok=True)
+    path = bar_path(ticker, store_dir)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(
+            f,
+            Date=df.index.values.astype("datetime64[ns]"),
+            requested_start=np.datetime64(meta["requested_start"], "ns"),
+            fetched_on=np.datetime64(meta["fetched_on"], "ns"),
+            **{field: df[field].to_numpy(np.float64) for field in BAR_FIELDS},
+        )
+    os.replace(tmp_path, path)
+
+
+# ===============================
+# 증분 갱신
+# ===============================
+def _fetch(source, ticker, start, end):
+    # 빈 응답 = 실패 (마지막 저장 봉부터 받는 뒤쪽 구간은 최소 1행은 있어야 한다)
+    df = source(ticker, start, end)
+    if df is None or not len(df):
+        raise EmptyFetchError(f"{ticker}: {start:%Y-%m-%d} 이후 데이터 없음")
+    return df
+
+
+def _overlap_ok(stored, fetched, final_before, start, end=None):
+    # [start, end) 안의 저장된 확정 봉 (final_before 이전) 이 새로 받은 값과 같은지
+    expected = _slice(stored[stored.index < final_before], start, end)
+    if not len(expected):
+        return True
+    if not expected.index.isin(fetched.index).all():
+        return False
+    return np.allclose(
+        expected[OVERLAP_FIELDS].to_numpy(),
+        fetched.loc[expected.index, OVERLAP_FIELDS].to_numpy(),
+        rtol=OVERLAP_RTOL,
+        equal_nan=True,
+    )
+
+
+def update_bars(ticker, start, source=None, store_dir=BAR_DIR):
+    # 저장소를 [start, 오늘] 까지 채운다. 새로 받은 행 수 반환
+    source = source or default_source()
+    start = pd.Timestamp(start)
+    today = pd.Timestamp.today().normalize()
+    stored, meta = read_bars(ticker, store_dir)
+
+    parts = []
+    head = False
+    consistent = True
+    if stored is None:
+        parts.append(_fetch(source, ticker, start, None))
+        meta = {"requested_start": start, "fetched_on": today}
+    else:
+        final_before = meta["fetched_on"]
+        # 앞쪽: 이전보다 더 이른 시작일을 요청한 경우만, 저장된 첫 봉까지 겹치게
+        # (상장 전 구간처럼 비어 있을 수 있다)
+        if start < meta["requested_start"]:
+            head_end = stored.index[0] + pd.Timedelta(days=1) if len(stored) else meta["requested_start"]
+            try:
+                part = _normalize(_fetch(source, ticker, start, head_end))
+                consistent = _overlap_ok(stored, part, final_before, start, head_end)
+                parts.append(part)
+            except EmptyFetchError:
+                consistent = _overlap_ok(stored, stored.iloc[:0], final_before, start, head_end)
+            meta["requested_start"] = start
+            head = True
+        # 뒤쪽: 오늘 아직 안 받았거나 마지막 봉이 장중 봉일 수 있으면 마지막 확정 봉부터
+        # (그 뒤 봉은 덮어씀)
+        if consistent and (
+            not len(stored) or meta["fetched_on"] < today or stored.index[-1] >= meta["fetched_on"]
+        ):
+            final = stored.index[stored.index < final_before]
+            if len(final):
+                tail_start = final[-1]
+            elif len(stored):
+                tail_start = stored.index[-1]
+            else:
+                tail_start = meta["requested_start"]
+            part = _normalize(_fetch(source, ticker, tail_start, None))
+            consistent = _overlap_ok(stored, part, final_before, tail_start)
+            parts.append(part)
+            meta["fetched_on"] = today
+
+        if not consistent:
+            print(f"ℹ️ {ticker}: 겹치는 봉이 저장값과 다름 (분할 / 배당 조정) → {meta['requested_start']:%Y-%m-%d} 부터 전체 다시 받음")
+            parts = [_fetch(source, ticker, meta["requested_start"], None)]
+            meta["fetched_on"] = today
+
+    new = [_normalize(p) for p in parts if p is not None and len(p)]
+    if not new and not head:
+        return 0
+    frames = ([] if stored is None or not consistent else [stored]) + new
+    merged = pd.concat(frames) if frames else _normalize(pd.DataFrame(columns=BAR_FIELDS))
+    merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+    write_bars(ticker, merged, meta, store_dir)
+
+    return len(merged) - (0 if stored is None else len(stored))
+
+
+def load_bars(ticker, start, end=None, source=None, store_dir=BAR_DIR, update=True):
+    # yf.download(ticker, start, end) 대신 사용 (Date 인덱스, BAR_FIELDS 컬럼)
+    if update:
+        update_bars(ticker, start, source, store_dir)
+
+    df, _ = read_bars(ticker, store_dir)
+    if df is None:
+        return pd.DataFrame(columns=BAR_FIELDS, index=pd.DatetimeIndex([], name="Date"))
+    return _slice(df, start, end)
+
+
+def period_start(years):
+    # yf.download(period="Ny") 에 해당하는 시작일
+    return (pd.Timestamp.today().normalize() - pd.DateOffset(years=years)).strftime("%Y-%m-%d")
+
+
+# ===============================
+# 여러 종목 동시 갱신
+# ===============================
+def _retryable(e):
+    # 없는 종목은 다시 받아도 같다
+    if isinstance(e, FileNotFoundError):
+        return False
+    if isinstance(e, urllib.error.HTTPError):
+        return e.code >= 500 or e.code == 429
+    return True
+
+
+def _retry(fn, retries=FETCH_RETRIES, backoff=FETCH_BACKOFF):
+    for attempt in range(retries):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == retries - 1 or not _retryable(e):
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+def load_universe(
+    tickers,
+    start,
+    end=None,
+    source=None,
+    store_dir=BAR_DIR,
+    workers=FETCH_WORKERS,
+    retries=FETCH_RETRIES,
+    backoff=FETCH_BACKOFF,
+):
+    # 반환: ({ticker: bars}, {ticker: 오류}) — 갱신에 실패해도 저장된 데이터가 있으면 그걸 돌려준다
+    source = source or default_source()
+    unique = list(dict.fromkeys(tickers))
+    errors = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(unique)))) as executor:
+        futures = {
+            executor.submit(
+                _retry, lambda t=t: update_bars(t, start, source, store_dir), retries, backoff
+            ): t
+            for t in unique
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                errors[futures[future]] = f"{type(e).__name__}: {e}"
+
+    bars = {t: load_bars(t, start, end, store_dir=store_dir, update=False) for t in unique}
+
+    if errors:
+        print(f"⚠️ 갱신 실패 {len(errors)}/{len(unique)} 종목")
+        for t, err in errors.items():
+            stale = "저장된 데이터 사용" if len(bars[t]) else "데이터 없음"
+            print(f"  {t}: {err} ({stale})")
+    return bars, errors
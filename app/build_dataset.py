@@ -1,18 +1,33 @@
-import yfinance as yf
+import os
+import warnings
 import pandas as pd
+import numpy as np
 from config import *
 from universe import *
 from indicators import *
+from bar_store import load_universe, period_start
 
-rows = []
+# ============================================================
+# 분할매수 성공 데이터셋 (종목별 열 단위 계산)
+# ============================================================
+# 시작일 i 마다
+#   - 앞으로 DCA_DAYS 일 평균 / 최고가 : sliding window (연속 배열 행 평균 = Series.mean 과 동일)
+#   - 직전 60일 최고가               : rolling max 를 하루 밀어서
+# 종목 BATCH_SIZE 개씩 받아서 계산하고 바로 CSV 에 이어 쓴다 (종목 수와 무관한 메모리)
 
-for ticker in UNIVERSE:
+OUTPUT_PATH = "data/success_dataset.csv"
+BATCH_SIZE = 200
 
-    df = yf.download(ticker, period=f"{LOOKBACK_YEARS}y", progress=False)
+START = 200
+DRAWDOWN_WINDOW = 60
 
-    if len(df) < 300:
-        continue
+COLUMNS = [
+    "Date", "Ticker", "Close", "RSI", "Drawdown_60",
+    "MA20_above_MA60", "MA60_above_MA120", "ATR_ratio", "Success",
+]
 
+
+def ticker_rows(ticker, df):
     close = df["Close"]
     rsi = compute_rsi(close)
     atr = compute_atr(df)
@@ -21,28 +36,63 @@ for ticker in UNIVERSE:
     ma60 = close.rolling(60).mean()
     ma120 = close.rolling(120).mean()
 
-    for i in range(200, len(df) - DCA_DAYS):
-
-        buy_window = close.iloc[i:i+DCA_DAYS]
-        avg_price = buy_window.mean()
-        max_price = buy_window.max()
-
-        ret = max_price / avg_price - 1
-        success = int(ret >= TARGET)
-
-        rows.append({
-            "Date": df.index[i],
-            "Ticker": ticker,
-            "Close": close.iloc[i],
-            "RSI": rsi.iloc[i],
-            "Drawdown_60": close.iloc[i] / close.iloc[i-60:i].max() - 1,
-            "MA20_above_MA60": int(ma20.iloc[i] > ma60.iloc[i]),
-            "MA60_above_MA120": int(ma60.iloc[i] > ma120.iloc[i]),
-            "ATR_ratio": atr.iloc[i] / close.iloc[i],
-            "Success": success
-        })
-
-dataset = pd.DataFrame(rows).dropna()
-dataset.to_csv("data/success_dataset.csv", index=False)
+    idx = np.arange(START, len(df) - DCA_DAYS)
+    if not idx.size:
+        return None
+
+    values = close.to_numpy(np.float64)
+    windows = np.lib.stride_tricks.sliding_window_view(values, DCA_DAYS)[idx]
+
+    if not np.isnan(values).any():
+        avg_price = np.ascontiguousarray(windows).mean(axis=1)
+        max_price = windows.max(axis=1)
+        prev_max = shift(rolling_max(values, DRAWDOWN_WINDOW))[idx]
+    else:
+        # 결측 봉이 있으면 pandas 처럼 NaN 을 건너뛴다
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            avg_price = np.nanmean(np.ascontiguousarray(windows), axis=1)
+            max_price = np.nanmax(windows, axis=1)
+            back = np.lib.stride_tricks.sliding_window_view(values, DRAWDOWN_WINDOW)
+            prev_max = np.nanmax(back[idx - DRAWDOWN_WINDOW], axis=1)
+
+    success = (max_price / avg_price - 1 >= TARGET).astype(int)
+
+    return pd.DataFrame({
+        "Date": df.index[idx],
+        "Ticker": ticker,
+        "Close": values[idx],
+        "RSI": rsi.to_numpy()[idx],
+        "Drawdown_60": values[idx] / prev_max - 1,
+        "MA20_above_MA60": (ma20.to_numpy() > ma60.to_numpy())[idx].astype(int),
+        "MA60_above_MA120": (ma60.to_numpy() > ma120.to_numpy())[idx].astype(int),
+        "ATR_ratio": atr.to_numpy()[idx] / values[idx],
+        "Success": success,
+    })
+
+
+header_written = False
+tmp_path = OUTPUT_PATH + ".tmp"
+
+for b in range(0, len(UNIVERSE), BATCH_SIZE):
+    batch = UNIVERSE[b : b + BATCH_SIZE]
+    bars, _ = load_universe(batch, period_start(LOOKBACK_YEARS))
+
+    for ticker in batch:
+        df = bars[ticker]
+
+        if len(df) < 300:
+            continue
+
+        rows = ticker_rows(ticker, df)
+        if rows is None:
+            continue
+
+        rows.dropna().to_csv(tmp_path, mode="a" if header_written else "w", header=not header_written, index=False)
+        header_written = True
+
+if not header_written:
+    pd.DataFrame(columns=COLUMNS).to_csv(tmp_path, index=False)
+os.replace(tmp_path, OUTPUT_PATH)
 
 print("✅ dataset 생성 완료")
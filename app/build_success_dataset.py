@@ -1,27 +1,103 @@
+import argparse
 import pandas as pd
 import numpy as np
-import yfinance as yf
-import os   # 👈 이 줄 추가
 
+from bar_store import BAR_FIELDS, load_universe
+from indicators import rolling_max, rolling_min
 
-df = pd.read_csv("data/raw_data.csv")
-df = df.sort_values(["Ticker", "Date"])
-df["Date"] = pd.to_datetime(df["Date"])
+# ============================================================
+# 미래 구간 라벨 (여러 보유 기간 × 목표 수익률, 한 번에)
+# ============================================================
+# 종목 → 날짜 순으로 정렬한 연속 배열 하나에서 역순 rolling max / min 으로
+#   Future_Max_{h} = 다음 h 일 (오늘 제외) 최고 종가
+#   Future_Min_{h} = 다음 h 일 (오늘 제외) 최저 종가
+#   Target_{h}d_{목표%} = Future_Max_{h} ≥ Close × (1 + 목표)
+# 를 계산한다. 창이 종목 경계를 넘거나 h 일이 안 남으면 NaN (라벨도 빈 값).
+# 기간 하나 추가 = rolling 2번 + 비교 열 몇 개.
+# Target 은 기존 정의 (40일 안 +10%), 40일 뒤 데이터가 없는 행은 제거.
 
-def compute_success(group):
-    group = group.copy()
-    group["Future_Max"] = group["Close"].shift(-1).rolling(40).max()
-    group["Target"] = (group["Future_Max"] >= group["Close"] * 1.10).astype(int)
-    return group
+HORIZONS = [10, 20, 40, 60]
+TARGETS = [0.05, 0.10, 0.15]
 
-df = df.groupby("Ticker", group_keys=False).apply(compute_success)
+DEFAULT_HORIZON = 40
+DEFAULT_TARGET = 0.10
 
-# 40일 뒤 데이터 없는 부분 제거
-df = df.dropna(subset=["Future_Max"])
 
-# 필요한 컬럼만 유지
-df = df[["Date","Ticker","Open","High","Low","Close","Volume","Target"]]
+def target_col(horizon, target):
+    return f"Target_{horizon}d_{round(target * 100)}"
 
-df.to_csv("data/success_dataset.csv", index=False)
 
-print("✅ success_dataset.csv 생성 완료")
+def group_ends(tickers):
+    # 정렬된 Ticker 배열 → 행마다 같은 종목 마지막 행 위치
+    n = len(tickers)
+    starts = np.flatnonzero(tickers[1:] != tickers[:-1]) + 1
+    bounds = np.concatenate([[0], starts, [n]])
+    return np.repeat(bounds[1:] - 1, np.diff(bounds))
+
+
+def forward_extremes(close, ends, horizon):
+    # close[i + 1 : i + 1 + horizon] 최고 / 최저 (역순 rolling, 종목 경계를 넘으면 NaN)
+    fwd_max = np.full(len(close), np.nan)
+    fwd_min = np.full(len(close), np.nan)
+    fwd_max[:-1] = rolling_max(close[::-1], horizon)[::-1][1:]
+    fwd_min[:-1] = rolling_min(close[::-1], horizon)[::-1][1:]
+
+    valid = np.arange(len(close)) + horizon <= ends
+    return np.where(valid, fwd_max, np.nan), np.where(valid, fwd_min, np.nan)
+
+
+def build_labels(df, horizons=HORIZONS, targets=TARGETS):
+    # df: Ticker, Date 순 정렬 → 라벨 컬럼 DataFrame (같은 index)
+    close = df["Close"].to_numpy(np.float64)
+    ends = group_ends(df["Ticker"].to_numpy())
+
+    cols = {}
+    for h in horizons:
+        fwd_max, fwd_min = forward_extremes(close, ends, h)
+        cols[f"Future_Max_{h}"] = fwd_max
+        cols[f"Future_Min_{h}"] = fwd_min
+        for target in targets:
+            hit = pd.array((fwd_max >= close * (1 + target)).astype(np.int64), dtype="Int64")
+            hit[np.isnan(fwd_max)] = pd.NA
+            cols[target_col(h, target)] = hit
+    return pd.DataFrame(cols, index=df.index)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--horizons", type=int, nargs="+", default=HORIZONS, help="보유 기간 (거래일)")
+    parser.add_argument("--targets", type=float, nargs="+", default=TARGETS, help="목표 수익률")
+    args = parser.parse_args()
+
+    horizons = sorted(set(args.horizons) | {DEFAULT_HORIZON})
+    targets = sorted(set(args.targets) | {DEFAULT_TARGET})
+
+    df = pd.read_csv("data/raw_data.csv")
+    df["Date"] = pd.to_datetime(df["Date"])
+
+    # raw_data.csv 에는 OHLCV 가 없으므로 로컬 저장소에서 붙인다
+    start = df["Date"].min()
+    bars, _ = load_universe(list(df["Ticker"].unique()), start)
+    bars = pd.concat([b.assign(Ticker=t) for t, b in bars.items()]).reset_index()
+    df = df.drop(columns=[c for c in BAR_FIELDS if c in df.columns])
+    df = df.merge(bars, on=["Date", "Ticker"], how="left")
+
+    df = df.sort_values(["Ticker", "Date"]).reset_index(drop=True)
+
+    labels = build_labels(df, horizons, targets)
+    labels["Target"] = labels[target_col(DEFAULT_HORIZON, DEFAULT_TARGET)]
+
+    # 40일 뒤 데이터 없는 부분 제거
+    keep = labels[f"Future_Max_{DEFAULT_HORIZON}"].notna()
+
+    # 필요한 컬럼만 유지 (라벨 컬럼은 한 번에 붙인다)
+    out = pd.concat([df.loc[keep, ["Date", "Ticker"] + BAR_FIELDS], labels[keep]], axis=1)
+    out = out[["Date", "Ticker"] + BAR_FIELDS + ["Target"] + [c for c in labels.columns if c != "Target"]]
+
+    out.to_csv("data/success_dataset.csv", index=False)
+
+    print(f"✅ success_dataset.csv 생성 완료 (기간 {horizons} × 목표 {targets})")
+
+
+if __name__ == "__main__":
+    main()
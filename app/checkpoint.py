@@ -0,0 +1,122 @@
+import os
+import hashlib
+import numpy as np
+
+from panel_cube import cube_prefix_hash
+from backtest_engine import init_state
+
+# ============================================================
+# 백테스트 상태 체크포인트 (증분 실행용)
+# ============================================================
+# 마지막으로 처리한 날짜 + 그 날짜까지의 패널 해시 + 파라미터 그리드 해시로 키잉.
+# --resume 시 세 가지가 모두 맞으면 새 날짜만 처리하고,
+# EV_cut(분위수) / 그리드 / 과거 데이터가 바뀌었으면 전체 재실행으로 돌아간다.
+# EV_cut 은 전체 패널 EV 분위수라 하루치만 붙어도 대부분 바뀐다 → 거절 사유를 나눠서 출력
+# (EV_cut 변동 폭 / 그리드 자체 변경 / 과거 데이터 변경).
+# EV_cut 은 체크포인트 grid 에 같이 저장된다. frozen_ev_grid() 로 그 값을 다시 쓰면
+# (EV_cut 을 체크포인트를 만든 시점 패널 기준으로 고정) 새 날짜만 처리할 수 있다.
+
+CHECKPOINT_PATH = "data/checkpoints/parametric_state.npz"
+
+
+def grid_array(param_grid):
+    # (P, 5): EV_quantile, EV_cut, Profit_Target, Max_Holding_Days, Stop_Level
+    return np.array([p for p in param_grid], dtype=np.float64).reshape(-1, 5)
+
+
+def grid_hash(param_grid):
+    return hashlib.sha1(grid_array(param_grid).tobytes()).hexdigest()
+
+
+def run_hash(cube, param_grid):
+    # 결과 / trace 파일에 남기는 실행 키 (패널 전체 + 그리드) → 서로 다른 실행의 파일 섞임 감지
+    h = hashlib.sha1()
+    h.update(cube_prefix_hash(cube, len(cube["dates"])).encode())
+    h.update(grid_hash(param_grid).encode())
+    return h.hexdigest()[:16]
+
+
+def save_checkpoint(path, state, cube, param_grid):
+    n_dates = len(cube["dates"])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(
+            f,
+            n_dates=n_dates,
+            last_date=cube["dates"][n_dates - 1],
+            panel_hash=cube_prefix_hash(cube, n_dates),
+            grid_hash=grid_hash(param_grid),
+            grid=grid_array(param_grid),
+            **{f"state__{key}": arr for key, arr in state.items()},
+        )
+    os.replace(tmp_path, path)
+
+
+def _grid_change(saved, param_grid):
+    # 그리드 해시가 다를 때 사유: EV_cut 만 움직였는지, 그리드 구성이 바뀌었는지
+    grid = grid_array(param_grid)
+    if saved is None:
+        return "EV_cut / 파라미터 그리드 변경"
+    other = [0, 2, 3, 4]
+    if saved.shape != grid.shape or not np.array_equal(saved[:, other], grid[:, other]):
+        return "파라미터 그리드 변경"
+    drift = np.abs(saved[:, 1] - grid[:, 1])
+    return f"EV_cut 변동: {int((drift > 0).sum())}/{len(grid)}개, 최대 {drift.max():.3g}"
+
+
+def frozen_ev_grid(path, param_grid):
+    # 체크포인트에 저장된 EV_cut 으로 바꾼 그리드. 체크포인트가 없거나 그리드 구성이 다르면 None
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as ckpt:
+        saved = ckpt["grid"] if "grid" in ckpt.files else None
+
+    grid = grid_array(param_grid)
+    other = [0, 2, 3, 4]
+    if saved is None or saved.shape != grid.shape or not np.array_equal(saved[:, other], grid[:, other]):
+        return None
+
+    drift = np.abs(saved[:, 1] - grid[:, 1]).max()
+    print(f"ℹ️ 체크포인트 EV_cut 재사용 (현재 패널 분위수와 최대 차이 {drift:.3g})")
+    return [(q, float(cut), pt, days, stop) for (q, _, pt, days, stop), cut in zip(param_grid, saved[:, 1])]
+
+
+def load_checkpoint(path, cube, param_grid):
+    # (state, t_start) 반환. 사용할 수 없으면 (None, 0) → 전체 재실행
+    if not os.path.exists(path):
+        print("ℹ️ 체크포인트 없음 → 전체 재실행")
+        return None, 0
+
+    with np.load(path) as ckpt:
+        reasons = []
+        if str(ckpt["grid_hash"]) != grid_hash(param_grid):
+            reasons.append(_grid_change(ckpt["grid"] if "grid" in ckpt.files else None, param_grid))
+
+        n_dates = int(ckpt["n_dates"])
+        dates = cube["dates"]
+        if (
+            n_dates > len(dates)
+            or dates[n_dates - 1] != ckpt["last_date"]
+            or cube_prefix_hash(cube, n_dates) != str(ckpt["panel_hash"])
+        ):
+            reasons.append("과거 패널 데이터 변경")
+
+        if reasons:
+            print(f"⚠️ 체크포인트 사용 불가 ({' / '.join(reasons)}) → 전체 재실행")
+            return None, 0
+
+        state = {
+            key[len("state__"):]: ckpt[key]
+            for key in ckpt.files
+            if key.startswith("state__")
+        }
+
+    if set(state) != set(init_state(0, 0)):
+        print("⚠️ 체크포인트 상태 형식 변경 → 전체 재실행")
+        return None, 0
+
+    last_date = str(dates[n_dates - 1])[:10]
+    print(f"✅ 체크포인트 재개: {last_date} 이후 {len(dates) - n_dates}일 처리")
+    return state, n_dates
@@ -1,37 +1,91 @@
+import argparse
 import pandas as pd
 import numpy as np
 
+from threshold_scan import counts_at, scan_1d, scan_2d, grid_thresholds
+
 # ===============================
 # 파일 경로
 # ===============================
 DATA_PATH = "data/ev_top20_test_raw.csv"
+CURVE_PATH = "data/dd_threshold_curve.csv"
+SURFACE_PATH = "data/threshold_surface"   # .npz (행렬) + _rate.csv (성공률 행렬)
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--data", default=DATA_PATH, help="스캔할 CSV (Success 컬럼 필요)")
+parser.add_argument("--column", default="Max_Drawdown", help="1차원 스캔 컬럼 (조건: 컬럼 > threshold)")
+parser.add_argument(
+    "--surface",
+    nargs=2,
+    metavar=("X", "Y"),
+    help="2차원 성공률 표면 (예: Max_Drawdown EV, Drawdown_252 ATR_ratio)",
+)
+parser.add_argument("--ops", nargs=2, default=[">", ">"], metavar=("X_OP", "Y_OP"), help="축별 조건 (> >= < <=)")
+parser.add_argument("--bins", type=int, default=200, help="2차원 표면 축별 threshold 개수 (분위수 기준)")
+args = parser.parse_args()
 
 # ===============================
 # 데이터 로드
 # ===============================
-df = pd.read_csv(DATA_PATH)
+columns = ["Success", args.column] + (args.surface or [])
+df = pd.read_csv(args.data, usecols=lambda c: c in columns)
 
-if "Success" not in df.columns or "Max_Drawdown" not in df.columns:
+if any(c not in df.columns for c in columns):
     raise ValueError("필요한 컬럼이 없습니다.")
 
+success = df["Success"].to_numpy(np.float64)
+
 print("=" * 70)
-print("📊 Max_Drawdown Threshold Scan (-10% ~ -20%)")
+print(f"📊 {args.column} Threshold Scan (-10% ~ -20%)")
 print("=" * 70)
 print(f"{'Threshold':>12} | {'Count':>8} | {'Success Rate':>12}")
 print("-" * 70)
 
 # ===============================
-# -10% ~ -20% (1% 단위)
+# -10% ~ -20% (1% 단위) — 정렬 1번 + 누적합
 # ===============================
-for dd in np.arange(-0.10, -0.201, -0.01):
-    filtered = df[df["Max_Drawdown"] > dd]
-
-    count = len(filtered)
+dds = np.arange(-0.10, -0.201, -0.01)
+counts, succ = counts_at(df[args.column], success, dds, ">")
 
+for dd, count, s in zip(dds, counts, succ):
     if count > 0:
-        success_rate = filtered["Success"].mean()
+        success_rate = s / count
         print(f"{dd:>12.2%} | {count:>8} | {success_rate:>12.4f}")
     else:
         print(f"{dd:>12.2%} | {count:>8} | {'N/A':>12}")
 
 print("=" * 70)
+
+# ===============================
+# 모든 고유 threshold 곡선
+# ===============================
+curve = pd.DataFrame(scan_1d(df[args.column], success, ">"))
+curve.to_csv(CURVE_PATH, index=False)
+print(f"✅ 전체 threshold 곡선 저장: {CURVE_PATH} ({len(curve)}개)")
+
+# ===============================
+# 2차원 표면 (X op x & Y op y)
+# ===============================
+if args.surface:
+    xc, yc = args.surface
+    x_op, y_op = args.ops
+    surface = scan_2d(
+        df[xc], df[yc], success,
+        grid_thresholds(df[xc], args.bins), grid_thresholds(df[yc], args.bins),
+        x_op, y_op,
+    )
+
+    np.savez_compressed(
+        SURFACE_PATH + ".npz",
+        x_column=xc, y_column=yc, x_op=x_op, y_op=y_op,
+        x=surface["x"], y=surface["y"],
+        count=surface["count"].astype(np.int64), success=surface["success"].astype(np.int64),
+    )
+    pd.DataFrame(
+        surface["rate"],
+        index=pd.Index(surface["x"], name=f"{xc} {x_op} / {yc} {y_op}"),
+        columns=surface["y"],
+    ).to_csv(SURFACE_PATH + "_rate.csv", float_format="%.4f")
+
+    print(f"✅ 2차원 표면 저장: {SURFACE_PATH}.npz / {SURFACE_PATH}_rate.csv "
+          f"({len(surface['x'])} × {len(surface['y'])})")
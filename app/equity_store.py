@@ -0,0 +1,89 @@
+import os
+import json
+import pandas as pd
+import numpy as np
+
+# ============================================================
+# 파라미터별 일별 평가금액 저장소 ((P, T) float32 memmap)
+# ============================================================
+# equity.npy        : (P, T) float32, 행 = Param_Index, 열 = 날짜
+# equity_params.csv : Param_Index 별 파라미터
+# equity_dates.npy  : 열 날짜
+# 사후 분석은 np.load(mmap_mode="r") 로 필요한 행/열만 잘라 읽는다.
+
+EQUITY_DIR = "data/equity_store"
+
+PARAM_COLS = ["EV_quantile", "EV_cut", "Profit_Target", "Max_Holding_Days", "Stop_Level"]
+
+
+def create_equity_store(store_dir, param_grid, dates):
+    os.makedirs(store_dir, exist_ok=True)
+
+    params = pd.DataFrame(param_grid, columns=PARAM_COLS)
+    params.insert(0, "Param_Index", np.arange(len(params)))
+    params.to_csv(os.path.join(store_dir, "equity_params.csv"), index=False)
+
+    np.save(os.path.join(store_dir, "equity_dates.npy"), np.asarray(dates))
+
+    equity = np.lib.format.open_memmap(
+        os.path.join(store_dir, "equity.npy"),
+        mode="w+",
+        dtype=np.float32,
+        shape=(len(params), len(dates)),
+    )
+
+    with open(os.path.join(store_dir, "meta.json"), "w") as f:
+        json.dump({"shape": list(equity.shape), "dtype": "float32"}, f)
+    return equity
+
+
+def extend_equity_store(store_dir, param_grid, dates, t_start):
+    # --resume: 기존 저장소(앞 t_start 일)를 새 날짜 수만큼 늘린다. 맞지 않으면 None
+    equity_path = os.path.join(store_dir, "equity.npy")
+    if not os.path.exists(equity_path):
+        return None
+
+    old, params, old_dates = open_equity_store(store_dir)
+    grid = pd.DataFrame(param_grid, columns=PARAM_COLS)
+    if (
+        old.shape != (len(grid), t_start)
+        or not np.array_equal(old_dates, np.asarray(dates[:t_start]))
+        or not np.array_equal(params[PARAM_COLS].to_numpy(float), grid.to_numpy(float))
+    ):
+        return None
+
+    tmp_path = equity_path + ".tmp"
+    equity = np.lib.format.open_memmap(
+        tmp_path, mode="w+", dtype=np.float32, shape=(len(grid), len(dates))
+    )
+    for lo in range(0, len(grid), 4096):
+        equity[lo : lo + 4096, :t_start] = old[lo : lo + 4096]
+    equity.flush()
+    del old, equity
+
+    os.replace(tmp_path, equity_path)
+    np.save(os.path.join(store_dir, "equity_dates.npy"), np.asarray(dates))
+    with open(os.path.join(store_dir, "meta.json"), "w") as f:
+        json.dump({"shape": [len(grid), len(dates)], "dtype": "float32"}, f)
+    return np.load(equity_path, mmap_mode="r+")
+
+
+def open_equity_store(store_dir=EQUITY_DIR, mode="r"):
+    equity = np.load(os.path.join(store_dir, "equity.npy"), mmap_mode=mode)
+    params = pd.read_csv(os.path.join(store_dir, "equity_params.csv"), float_precision="round_trip")
+    dates = np.load(os.path.join(store_dir, "equity_dates.npy"))
+    return equity, params, dates
+
+
+def equity_frame(store_dir, param_index, start=None, end=None):
+    # 일부 파라미터 / 기간만 DataFrame 으로 (열 = Param_Index)
+    equity, params, dates = open_equity_store(store_dir)
+    dates = pd.to_datetime(dates)
+    cols = slice(
+        None if start is None else dates.searchsorted(pd.Timestamp(start)),
+        None if end is None else dates.searchsorted(pd.Timestamp(end), side="right"),
+    )
+    rows = np.asarray(param_index)
+    return pd.DataFrame(
+        np.asarray(equity[rows, cols]).T, index=dates[cols], columns=rows
+    )
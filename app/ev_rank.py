@@ -0,0 +1,42 @@
+import numpy as np
+
+# ============================================================
+# 날짜별 EV 순위 인덱스
+# ============================================================
+# 모든 ev_cut 은 "t일 EV 1위 종목의 EV ≥ cut ?" 한 번의 비교로 끝난다.
+#   top_ticker[t] : EV 1위 ticker_id (후보 없으면 -1)
+#   top_ev[t]     : 그 EV (후보 없으면 -inf)
+#   order[t]      : EV 내림차순 ticker_id (결측/NaN 은 뒤로, 동률은 Ticker 순)
+#   n_valid[t]    : EV 가 있는 종목 수
+# 동률일 때 Ticker 순서상 먼저인 종목이 1위 → 기존 sort_values(...).iloc[0] 과 동일
+
+
+def build_ev_rank(cube):
+    present = np.asarray(cube["present"])
+    ev = np.asarray(cube["EV"])
+
+    ev_valid = np.where(present & ~np.isnan(ev), ev, -np.inf)
+    order = np.argsort(-ev_valid, axis=1, kind="stable")
+
+    rows = np.arange(len(ev_valid))
+    top_ev = ev_valid[rows, order[:, 0]]
+    n_valid = np.isfinite(ev_valid).sum(axis=1)
+
+    return {
+        "top_ticker": np.where(n_valid > 0, order[:, 0], -1),
+        "top_ev": top_ev,
+        "order": order,
+        "n_valid": n_valid,
+        "present": present,
+    }
+
+
+def entry_ticker(rank, t, ev_cut):
+    # ev_cut 은 스칼라 또는 길이 P 배열 → 진입 종목 (없으면 -1)
+    return np.where(rank["top_ev"][t] >= ev_cut, rank["top_ticker"][t], -1)
+
+
+def held_present(rank, t, picked):
+    # 보유 종목(-1 = 미보유)이 t일 패널에 있는지
+    picked = np.asarray(picked)
+    return (picked >= 0) & rank["present"][t, np.maximum(picked, 0)]
@@ -2,6 +2,8 @@ import pandas as pd
 import numpy as np
 import joblib
 
+from features import MODEL_FEATURES, check_feature_meta
+
 # ===============================
 # 설정
 # ===============================
@@ -9,20 +11,13 @@ DATA_PATH = "data/raw_data.csv"
 MODEL_PATH = "app/model.pkl"
 SCALER_PATH = "app/scaler.pkl"
 
-FEATURES = [
-    "Drawdown_252",
-    "Drawdown_60",
-    "ATR_ratio",
-    "Z_score",
-    "MACD_hist",
-    "MA20_slope",
-    "Market_Drawdown",
-    "Market_ATR_ratio"
-]
+FEATURES = MODEL_FEATURES
 
 # ===============================
 # 데이터 로드
 # ===============================
+check_feature_meta(DATA_PATH)
+check_feature_meta(MODEL_PATH)
 df = pd.read_csv(DATA_PATH)
 df = df.sort_values("Date").reset_index(drop=True)
 
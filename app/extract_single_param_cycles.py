@@ -1,15 +1,26 @@
+import os
 import pandas as pd
 import numpy as np
 
+from panel_cube import load_panel_cube, cube_ev_values
+from backtest_engine import run_vector_engine, new_trace, trace_frames
+
 # ============================================================
 # 설정
 # ============================================================
 INPUT_PATH = "data/backtest_panel.csv"
 PARAM_PATH = "data/parametric_results_v2.csv"
+CYCLE_TRACE_PATH = "data/param_cycle_trace.csv"
 OUTPUT_PATH = "data/single_param_cycle_results.csv"
 
 INITIAL_SEED = 40_000_000
 
+PARAM_COLS = ["EV_quantile", "Profit_Target", "Max_Holding_Days", "Stop_Level"]
+CYCLE_COLS = [
+    "Start_Date", "End_Date", "Ticker", "Holding_Days",
+    "Start_Seed", "End_Seed", "Cycle_Return", "Exit_Type",
+]
+
 # ============================================================
 # 1️⃣ 최상위 파라미터 1개 선택
 # ============================================================
@@ -20,140 +31,47 @@ top = param_df.iloc[0]
 
 q = top["EV_quantile"]
 profit_target = top["Profit_Target"]
-max_days = top["Max_Holding_Days"]
+max_days = int(top["Max_Holding_Days"])
 stop_level = top["Stop_Level"]
 
 print("✅ Selected Parameter")
 print(top)
 
 # ============================================================
-# 2️⃣ 데이터 로드
+# 2️⃣ 그리드 실행 때 남긴 trace 재사용
+#    (run_parametric_backtest.py --trace-top K, 패널보다 최신이고 결과 파일과 Run_Id 가 같을 때만)
 # ============================================================
-df = pd.read_csv(INPUT_PATH, parse_dates=["Date"])
-df = df.sort_values(["Date", "Ticker"])
+cycles_df = None
+
+if os.path.exists(CYCLE_TRACE_PATH) and os.path.getmtime(CYCLE_TRACE_PATH) >= os.path.getmtime(INPUT_PATH):
+    trace_df = pd.read_csv(CYCLE_TRACE_PATH, float_precision="round_trip")
+    if "Run_Id" not in trace_df.columns or "Run_Id" not in top or (trace_df["Run_Id"] != top["Run_Id"]).any():
+        print("⚠️ Trace 가 결과 파일과 다른 실행 → 다시 계산")
+        trace_df = trace_df.iloc[:0]
+    match = np.ones(len(trace_df), dtype=bool)
+    for col, value in zip(PARAM_COLS, [q, profit_target, max_days, stop_level]):
+        match &= np.isclose(trace_df[col], value)
 
-ev_cut = df["EV"].quantile(q)
+    if match.any():
+        cycles_df = trace_df.loc[match, CYCLE_COLS]
+        print("✅ Grid trace 재사용:", CYCLE_TRACE_PATH)
 
 # ============================================================
-# 3️⃣ 사이클 재계산 (RAW 파일 없이 직접 계산)
+# 3️⃣ trace 가 없으면 같은 엔진으로 해당 파라미터만 실행
 # ============================================================
-seed = INITIAL_SEED
-in_position = False
-
-total_shares = 0
-total_invested = 0
-holding_day = 0
-extending = False
-picked_ticker = None
-
-cycle_start_seed = 0
-cycle_start_date = None
-
-cycles = []
-
-grouped = df.groupby("Date", sort=False)
-
-for date, day_data in grouped:
-
-    day_data = day_data.set_index("Ticker")
-
-    # =========================
-    # 진입 전
-    # =========================
-    if not in_position:
-        candidates = day_data[day_data["EV"] >= ev_cut]
-        if len(candidates) > 0:
-            pick = candidates.sort_values("EV", ascending=False).iloc[0]
-            ticker = pick.name
-            price = pick["Close"]
-
-            cycle_start_seed = seed
-            invest = seed / max_days
-            shares = invest / price
-
-            total_shares = shares
-            total_invested = invest
-            seed -= invest
-
-            holding_day = 1
-            extending = False
-            in_position = True
-            picked_ticker = ticker
-            cycle_start_date = date
-
-    # =========================
-    # 보유 중
-    # =========================
-    else:
-        if picked_ticker not in day_data.index:
-            continue
-
-        row = day_data.loc[picked_ticker]
-        holding_day += 1
-
-        avg_price = total_invested / total_shares
-
-        # ---------- 익절 ----------
-        if row["High"] >= avg_price * (1 + profit_target):
-
-            sell_price = avg_price * (1 + profit_target)
-            proceeds = total_shares * sell_price
-
-            cycle_return = (proceeds - total_invested) / total_invested
-
-            cycles.append({
-                "Start_Date": cycle_start_date,
-                "End_Date": date,
-                "Ticker": picked_ticker,
-                "Holding_Days": holding_day,
-                "Start_Seed": cycle_start_seed,
-                "End_Seed": seed + proceeds,
-                "Cycle_Return": cycle_return,
-                "Exit_Type": "PROFIT"
-            })
-
-            seed += proceeds
-            in_position = False
-
-        # ---------- 연장 시작 ----------
-        elif holding_day >= max_days:
-            extending = True
-
-        # ---------- 연장 손절 ----------
-        if extending and row["Low"] <= avg_price * (1 + stop_level):
-
-            sell_price = avg_price * (1 + stop_level)
-            proceeds = total_shares * sell_price
-
-            cycle_return = (proceeds - total_invested) / total_invested
-
-            cycles.append({
-                "Start_Date": cycle_start_date,
-                "End_Date": date,
-                "Ticker": picked_ticker,
-                "Holding_Days": holding_day,
-                "Start_Seed": cycle_start_seed,
-                "End_Seed": seed + proceeds,
-                "Cycle_Return": cycle_return,
-                "Exit_Type": "STOP"
-            })
-
-            seed += proceeds
-            in_position = False
-
-        # ---------- 추가매수 ----------
-        elif row["Close"] <= avg_price * 1.05:
-            invest = cycle_start_seed / max_days
-            shares = invest / row["Close"]
-            total_shares += shares
-            total_invested += invest
-            seed -= invest
+if cycles_df is None:
+    cube = load_panel_cube(INPUT_PATH)
+    ev_cut = cube_ev_values(cube).quantile(q)
+    param_grid = [(q, ev_cut, profit_target, max_days, stop_level)]
+
+    trace = new_trace(np.ones(1, dtype=bool))
+    run_vector_engine(cube, param_grid, INITIAL_SEED, trace=trace)
+    cycles_df, _ = trace_frames(trace, cube, param_grid)
+    cycles_df = cycles_df.reindex(columns=CYCLE_COLS)
 
 # ============================================================
 # 4️⃣ 저장
 # ============================================================
-cycles_df = pd.DataFrame(cycles)
-
 print("✅ Total Cycles:", len(cycles_df))
 print(cycles_df.head())
 
@@ -2,10 +2,12 @@ import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 
+from feature_store import load_training_frame
+
 # ===============================
-# 데이터 로드
+# 데이터 로드 (등록된 피처 중 없는 컬럼은 피처 저장소에서)
 # ===============================
-df = pd.read_csv("data/raw_data.csv")
+df = load_training_frame("data/raw_data.csv")
 
 # ===============================
 # 타겟 선택
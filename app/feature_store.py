@@ -0,0 +1,374 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import pandas as pd
+import numpy as np
+
+from bar_store import load_bars
+from features import (
+    FEATURE_SPEC,
+    FEATURE_COLS,
+    FeatureStream,
+    column_defs,
+    compute_features,
+    market_column_defs,
+    own_bars,
+    read_feature_meta,
+)
+
+# ============================================================
+# 피처 저장소 (종목 × 봉 버전 × 컬럼 정의 단위 캐시)
+# ============================================================
+# data/feature_store/<TICKER>/<봉 해시>/
+#   Date.npy                 : 그 봉 버전의 날짜
+#   <컬럼>-<정의 해시>.npy    : 컬럼 1개 (float64, Date 와 같은 길이)
+#
+# 봉 해시   = 종목 봉 (Date / High / Low / Close) 바이트 해시 → 봉이 바뀌면 새 버전
+# 정의 해시 = 컬럼 이름 + 함수 이름 + params + FEATURE_VERSION
+#   → 새 컬럼을 추가하면 그 컬럼만 계산, 나머지는 디스크에서 읽는다
+#
+# 종목별로 자기 봉 날짜 기준으로 계산한다 (다른 종목 구성과 무관하게 같은 키 → 같은 값).
+# 정리 (evict):
+#   - 등록된 컬럼의 예전 정의 버전 파일 삭제
+#   - 종목마다 최근 사용한 봉 버전 KEEP_BAR_VERSIONS 개만 유지
+#   - max_bytes 를 넘으면 오래 안 쓴 파일부터 삭제 (LRU, 파일 mtime = 마지막 사용)
+
+STORE_DIR = "data/feature_store"
+KEEP_BAR_VERSIONS = 2
+DATE_FILE = "Date.npy"
+
+
+def _hash(payload):
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def bars_hash(bars):
+    h = hashlib.sha1()
+    h.update(bars.index.values.astype("datetime64[ns]").tobytes())
+    for field in ["High", "Low", "Close"]:
+        h.update(bars[field].to_numpy(np.float64).tobytes())
+    return h.hexdigest()[:16]
+
+
+def definition_hash(name, fn, params, spec=FEATURE_SPEC):
+    return _hash({"name": name, "fn": fn.__name__, "params": params, "version": spec["version"]})
+
+
+def _save_npy(path, values):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, values)
+    os.replace(tmp_path, path)
+
+
+class FeatureStore:
+    def __init__(self, root=STORE_DIR, spec=FEATURE_SPEC):
+        self.root = root
+        self.spec = spec
+        self.defs = column_defs(spec)
+        self.market_defs = market_column_defs(spec)
+        self.stats = {"hits": 0, "misses": 0, "read_bytes": 0, "written_bytes": 0, "compute_s": 0.0}
+
+    def register(self, name, fn, params=None, market=False):
+        # 실험용 컬럼 추가: fn(high, low, close, **params) → (T, 1)
+        (self.market_defs if market else self.defs)[name] = (fn, params or {})
+
+    def _column_file(self, name, defs):
+        fn, params = defs[name]
+        return f"{name}-{definition_hash(name, fn, params, self.spec)}.npy"
+
+    # ===============================
+    # 종목 1개
+    # ===============================
+    def ticker_columns(self, ticker, bars, columns=None, market=False):
+        # bars: Date 인덱스 OHLC (결측 없음) → Date 인덱스 DataFrame (요청 컬럼)
+        defs = self.market_defs if market else self.defs
+        columns = list(defs) if columns is None else [c for c in columns if c in defs]
+
+        version_dir = os.path.join(self.root, ticker, bars_hash(bars))
+        os.makedirs(version_dir, exist_ok=True)
+        date_path = os.path.join(version_dir, DATE_FILE)
+        if not os.path.exists(date_path):
+            _save_npy(date_path, bars.index.values.astype("datetime64[ns]"))
+        os.utime(version_dir)
+
+        out, missing = {}, []
+        for name in columns:
+            path = os.path.join(version_dir, self._column_file(name, defs))
+            if os.path.exists(path):
+                out[name] = np.load(path)
+                os.utime(path)
+                self.stats["hits"] += 1
+                self.stats["read_bytes"] += os.path.getsize(path)
+            else:
+                missing.append(name)
+
+        if missing:
+            start = time.perf_counter()
+            high, low, close = (bars[c].to_numpy(np.float64)[:, None] for c in ["High", "Low", "Close"])
+            for name in missing:
+                fn, params = defs[name]
+                out[name] = np.asarray(fn(high, low, close, **params), dtype=np.float64)[:, 0]
+                path = os.path.join(version_dir, self._column_file(name, defs))
+                _save_npy(path, out[name])
+                self.stats["misses"] += 1
+                self.stats["written_bytes"] += os.path.getsize(path)
+            self.stats["compute_s"] += time.perf_counter() - start
+
+        return pd.DataFrame({name: out[name] for name in columns}, index=bars.index)
+
+    # ===============================
+    # 종목 전체 (compute_features 와 같은 long 형식)
+    # ===============================
+    def load_features(self, bars, tickers, market_ticker="SPY", columns=None):
+        # 반환: Date / Ticker / 컬럼 long DataFrame (종목 봉과 시장 기준 봉이 모두 있는 날만)
+        columns = FEATURE_COLS if columns is None else list(columns)
+        ticker_cols = [c for c in columns if c in self.defs]
+        market_cols = [c for c in columns if c in self.market_defs]
+
+        parts = []
+        for t in tickers:
+            if t not in bars or not len(bars[t]):
+                continue
+            part = self.ticker_columns(t, own_bars(bars[t]), ticker_cols)
+            part.insert(0, "Ticker", t)
+            parts.append(part)
+
+        if not parts:
+            return pd.DataFrame(columns=["Date", "Ticker"] + ticker_cols + market_cols)
+        out = pd.concat(parts).rename_axis("Date").reset_index()
+
+        market = self.ticker_columns(market_ticker, own_bars(bars[market_ticker]), market_cols, market=True)
+        out = out.merge(market, left_on="Date", right_index=True, how="inner")
+        return out[["Date", "Ticker"] + [c for c in columns if c in out.columns]]
+
+    # ===============================
+    # 통계 / 정리
+    # ===============================
+    def _files(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for fname in filenames:
+                if fname.endswith(".npy"):
+                    path = os.path.join(dirpath, fname)
+                    yield path, os.stat(path)
+
+    def disk_usage(self):
+        tickers = [d for d in os.listdir(self.root)] if os.path.isdir(self.root) else []
+        versions = sum(len(os.listdir(os.path.join(self.root, t))) for t in tickers)
+        files = list(self._files())
+        return {
+            "tickers": len(tickers),
+            "bar_versions": versions,
+            "files": len(files),
+            "bytes": sum(st.st_size for _, st in files),
+        }
+
+    def report(self):
+        s = self.stats
+        total = s["hits"] + s["misses"]
+        rate = s["hits"] / total if total else 0.0
+        usage = self.disk_usage()
+        print(
+            f"📦 피처 저장소: hit {s['hits']} / miss {s['misses']} (hit rate {rate:.1%}), "
+            f"읽기 {s['read_bytes'] / 1e6:.1f}MB / 쓰기 {s['written_bytes'] / 1e6:.1f}MB, "
+            f"계산 {s['compute_s']:.2f}s"
+        )
+        print(
+            f"   디스크: {usage['tickers']}종목 / 봉 버전 {usage['bar_versions']}개 / "
+            f"{usage['files']}파일 / {usage['bytes'] / 1e6:.1f}MB"
+        )
+
+    def evict(self, keep_bar_versions=KEEP_BAR_VERSIONS, max_bytes=None):
+        # 반환: {"files": 삭제 파일 수, "bytes": 삭제 용량}
+        removed = {"files": 0, "bytes": 0}
+        if not os.path.isdir(self.root):
+            return removed
+
+        def remove_file(path, size):
+            os.remove(path)
+            removed["files"] += 1
+            removed["bytes"] += size
+
+        # 1) 등록된 컬럼의 예전 정의 버전
+        current = {self._column_file(n, self.defs) for n in self.defs}
+        current |= {self._column_file(n, self.market_defs) for n in self.market_defs}
+        names = set(self.defs) | set(self.market_defs)
+        for path, st in list(self._files()):
+            fname = os.path.basename(path)
+            name = fname.rsplit("-", 1)[0]
+            if fname != DATE_FILE and name in names and fname not in current:
+                remove_file(path, st.st_size)
+
+        # 2) 종목별 오래된 봉 버전 (마지막 사용 순)
+        for ticker in os.listdir(self.root):
+            ticker_dir = os.path.join(self.root, ticker)
+            versions = sorted(
+                (os.path.join(ticker_dir, v) for v in os.listdir(ticker_dir)),
+                key=os.path.getmtime,
+                reverse=True,
+            )
+            for version_dir in versions[keep_bar_versions:]:
+                for fname in os.listdir(version_dir):
+                    path = os.path.join(version_dir, fname)
+                    removed["files"] += 1
+                    removed["bytes"] += os.path.getsize(path)
+                shutil.rmtree(version_dir)
+
+        # 3) 용량 제한 (LRU)
+        if max_bytes is not None:
+            files = sorted(self._files(), key=lambda f: f[1].st_mtime)
+            total = sum(st.st_size for _, st in files)
+            for path, st in files:
+                if total <= max_bytes:
+                    break
+                if os.path.basename(path) == DATE_FILE:
+                    continue
+                remove_file(path, st.st_size)
+                total -= st.st_size
+
+        # 빈 디렉터리 정리 (컬럼이 하나도 없는 봉 버전 포함)
+        for ticker in os.listdir(self.root):
+            ticker_dir = os.path.join(self.root, ticker)
+            for v in os.listdir(ticker_dir):
+                version_dir = os.path.join(ticker_dir, v)
+                if os.listdir(version_dir) == [DATE_FILE]:
+                    removed["files"] += 1
+                    removed["bytes"] += os.path.getsize(os.path.join(version_dir, DATE_FILE))
+                    shutil.rmtree(version_dir)
+            if not os.listdir(ticker_dir):
+                os.rmdir(ticker_dir)
+
+        return removed
+
+
+# ===============================
+# 학습 데이터 + 저장소 컬럼
+# ===============================
+def load_training_frame(path, columns=None, store=None, market_ticker="SPY"):
+    # path (raw_data.csv) 를 읽고, 없는 피처 컬럼만 저장소에서 붙인다 (columns=None → 등록된 전체)
+    # 봉은 데이터셋 메타의 bars_range 구간을 로컬 봉 저장소에서 읽는다 (다운로드 없음)
+    store = store or FeatureStore()
+    df = pd.read_csv(path, parse_dates=["Date"])
+
+    wanted = list(store.defs) + list(store.market_defs) if columns is None else list(columns)
+    missing = [c for c in wanted if c not in df.columns and (c in store.defs or c in store.market_defs)]
+    if not missing:
+        return df
+
+    meta = read_feature_meta(path)
+    if meta is None or "bars_range" not in meta:
+        print(f"⚠️ 봉 구간 정보 없음: {path} → 저장소 컬럼 생략 {missing}")
+        return df
+
+    start, end = meta["bars_range"]
+    tickers = list(df["Ticker"].unique())
+    bars = {
+        t: load_bars(t, start, end, update=False).dropna()
+        for t in dict.fromkeys(tickers + [market_ticker])
+    }
+
+    feats = store.load_features(bars, tickers, market_ticker, missing)
+    store.report()
+    return df.merge(feats, on=["Date", "Ticker"], how="left")
+
+
+# ===============================
+# 일관성 점검 (compute_features / FeatureStore / FeatureStream)
+# ===============================
+# 종목마다 날짜 일부를 빼낸 랜덤워크 패널로 세 경로가 같은 값을 내는지 확인.
+# (T, N) 한 번에 / 종목 1개 (T, 1) / 봉 단위 스트리밍은 합산 순서만 달라 허용 오차로 비교.
+CHECK_TOL = 1e-9
+
+
+def gapped_panel(days=600, tickers=4, gaps=5, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2015-01-01", periods=days)
+    bars = {}
+    for k, t in enumerate(["SPY"] + [f"T{i}" for i in range(tickers)]):
+        close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+        spread = np.abs(rng.normal(0, 0.01, days))
+        df = pd.DataFrame(
+            {"Open": close, "High": close * (1 + spread), "Low": close * (1 - spread), "Close": close},
+            index=pd.DatetimeIndex(dates, name="Date"),
+        )
+        drop = rng.choice(np.arange(1, days - 1), gaps * k, replace=False) if k else []
+        bars[t] = df.drop(df.index[drop])
+    return bars
+
+
+def stream_features(bars, tickers, market_ticker="SPY", spec=FEATURE_SPEC):
+    # 봉 단위 FeatureStream 값 → compute_features 와 같은 long 형식
+    def history(b, market):
+        stream = FeatureStream(spec, market)
+        return pd.DataFrame(
+            [stream.update(d, h, l, c) for d, h, l, c in zip(b.index, b["High"], b["Low"], b["Close"])],
+            index=b.index,
+        )
+
+    parts = [history(bars[t], False).assign(Ticker=t) for t in tickers]
+    out = pd.concat(parts).rename_axis("Date").reset_index()
+    out = out.merge(history(bars[market_ticker], True), left_on="Date", right_index=True, how="inner")
+    return out[["Date", "Ticker"] + FEATURE_COLS]
+
+
+def check_consistency(bars, tickers, market_ticker="SPY", tol=CHECK_TOL):
+    # 반환: 통과 여부 (컬럼별 최대 오차 / NaN 위치 일치 출력)
+    ref = compute_features(bars, tickers, market_ticker)
+    with tempfile.TemporaryDirectory() as root:
+        others = {
+            "FeatureStore": FeatureStore(root).load_features(bars, tickers, market_ticker),
+            "FeatureStream": stream_features(bars, tickers, market_ticker),
+        }
+
+    key = ["Date", "Ticker"]
+    ref = ref.sort_values(key).reset_index(drop=True)
+    ok = True
+    for name, other in others.items():
+        other = other.sort_values(key).reset_index(drop=True)
+        if not ref[key].equals(other[key]):
+            print(f"⚠️ {name}: 행 (Date, Ticker) 불일치 {len(ref)} vs {len(other)}")
+            ok = False
+            continue
+        for col in FEATURE_COLS:
+            a = ref[col].to_numpy(np.float64)
+            b = other[col].to_numpy(np.float64)
+            same_nan = bool((np.isnan(a) == np.isnan(b)).all())
+            both = ~np.isnan(a) & ~np.isnan(b)
+            err = float((np.abs(a[both] - b[both]) / np.maximum(np.abs(a[both]), 1.0)).max()) if both.any() else 0.0
+            passed = same_nan and err <= tol
+            ok &= passed
+            print(f"{name:<14}{col:<20}{err:>12.2e}  {'✅' if passed else '⚠️'}{'' if same_nan else ' NaN 위치 불일치'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--evict", action="store_true", help="예전 정의 / 오래된 봉 버전 정리")
+    parser.add_argument("--keep-versions", type=int, default=KEEP_BAR_VERSIONS, help="종목별로 남길 봉 버전 수")
+    parser.add_argument("--max-mb", type=float, default=None, help="정리 후 최대 용량 (MB, 오래 안 쓴 파일부터 삭제)")
+    parser.add_argument("--check", action="store_true", help="결측일 있는 랜덤 패널로 compute_features / 저장소 / 스트리밍 값 비교")
+    args = parser.parse_args()
+
+    if args.check:
+        bars = gapped_panel()
+        tickers = [t for t in bars if t != "SPY"]
+        ok = check_consistency(bars, tickers)
+        print("✅ 세 경로 일치" if ok else "⚠️ 피처 경로 불일치")
+        if not ok:
+            raise SystemExit(1)
+        return
+
+    store = FeatureStore()
+    if args.evict:
+        max_bytes = None if args.max_mb is None else int(args.max_mb * 1e6)
+        removed = store.evict(args.keep_versions, max_bytes)
+        print(f"🧹 정리: {removed['files']}파일 / {removed['bytes'] / 1e6:.1f}MB 삭제")
+    store.report()
+
+
+if __name__ == "__main__":
+    main()
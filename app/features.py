@@ -0,0 +1,358 @@
+import os
+import json
+import pandas as pd
+import numpy as np
+from collections import deque
+
+from indicators import (
+    rolling_max,
+    rolling_mean,
+    rolling_std,
+    shift,
+    ewm_mean,
+    average_true_range,
+    RollingMax,
+    RollingMeanStd,
+    EWM,
+    StreamingATR,
+)
+
+# ============================================================
+# 피처 엔진 (학습 / 백테스트 / 라이브 스캔 공용)
+# ============================================================
+# 종목 전체를 (T, N) 배열로 펼쳐 한 번에 계산한다 (열 = 종목, 행 = 날짜).
+# 정의는 FEATURE_SPEC 하나로 고정하고 버전을 붙인다.
+#   - 모델이 학습된 make_raw_data.py 정의 기준:
+#     Z_score 60일, MACD_hist = EMA12 - EMA26 (signal 없음),
+#     ATR = True Range 14일 평균, MA20_slope = MA20.diff(5)
+# 정의를 바꾸면 FEATURE_VERSION 을 올린다. 데이터셋 / 모델 옆에
+# <경로>.features.json 으로 버전을 남기고, 읽는 쪽에서 check_feature_meta 로 확인.
+#
+# 종목마다 자기 봉 날짜 기준으로 계산한다 (feature_store / FeatureStream 과 같은 값).
+# 다른 종목에만 있는 날짜는 창에 들어가지 않는다 → 날짜 구성이 같은 종목끼리 묶어 (T, N) 계산.
+
+FEATURE_VERSION = 1
+
+FEATURE_SPEC = {
+    "version": FEATURE_VERSION,
+    "drawdown_windows": [60, 252],
+    "zscore_window": 60,
+    "atr_period": 14,
+    "atr_mode": "true_range",
+    "macd_spans": [12, 26],
+    "macd_signal": None,
+    "ma_window": 20,
+    "ma_slope_lag": 5,
+    "market_drawdown_window": 252,
+    "market_ma_window": 200,
+}
+
+# 모델 입력 (순서 고정)
+MODEL_FEATURES = [
+    "Drawdown_252",
+    "Drawdown_60",
+    "ATR_ratio",
+    "Z_score",
+    "MACD_hist",
+    "MA20_slope",
+    "Market_Drawdown",
+    "Market_ATR_ratio",
+]
+
+FEATURE_COLS = [
+    "Drawdown_60",
+    "Drawdown_252",
+    "Z_score",
+    "ATR_ratio",
+    "MACD_hist",
+    "MA20_slope",
+    "Market_Drawdown",
+    "Market_ATR_ratio",
+    "Market_above_MA200",
+]
+
+META_SUFFIX = ".features.json"
+
+
+# ===============================
+# 컬럼 단위 정의 (feature_store.py 캐시 단위)
+# ===============================
+# 컬럼 함수: fn(high, low, close, **params) → (T, N)
+# params 에 쓰는 spec 값을 모두 적는다 (feature_store 가 이름 + 함수 + params + 버전으로 해시)
+
+def drawdown(high, low, close, window):
+    return close / rolling_max(close, window) - 1
+
+
+def zscore(high, low, close, window):
+    return (close - rolling_mean(close, window)) / rolling_std(close, window)
+
+
+def atr_ratio(high, low, close, period, mode):
+    return average_true_range(high, low, close, period, mode) / close
+
+
+def macd_hist(high, low, close, spans, signal):
+    fast, slow = spans
+    macd = ewm_mean(close, fast) - ewm_mean(close, slow)
+    if signal:
+        macd = macd - ewm_mean(macd, signal)
+    return macd
+
+
+def ma_slope(high, low, close, window, lag):
+    ma = rolling_mean(close, window)
+    return ma - shift(ma, lag)
+
+
+def above_ma(high, low, close, window):
+    return (close > rolling_mean(close, window)).astype(int)
+
+
+def column_defs(spec=FEATURE_SPEC):
+    # 종목 피처 {이름: (함수, params)}
+    defs = {f"Drawdown_{w}": (drawdown, {"window": w}) for w in spec["drawdown_windows"]}
+    defs["Z_score"] = (zscore, {"window": spec["zscore_window"]})
+    defs["ATR_ratio"] = (atr_ratio, {"period": spec["atr_period"], "mode": spec["atr_mode"]})
+    defs["MACD_hist"] = (macd_hist, {"spans": spec["macd_spans"], "signal": spec["macd_signal"]})
+    defs["MA20_slope"] = (ma_slope, {"window": spec["ma_window"], "lag": spec["ma_slope_lag"]})
+    return defs
+
+
+def market_column_defs(spec=FEATURE_SPEC):
+    # 시장 기준 (SPY) 피처 {이름: (함수, params)}
+    return {
+        "Market_Drawdown": (drawdown, {"window": spec["market_drawdown_window"]}),
+        "Market_ATR_ratio": (atr_ratio, {"period": spec["atr_period"], "mode": spec["atr_mode"]}),
+        "Market_above_MA200": (above_ma, {"window": spec["market_ma_window"]}),
+    }
+
+
+# ===============================
+# 피처 계산
+# ===============================
+def ticker_features(high, low, close, spec=FEATURE_SPEC):
+    return {name: fn(high, low, close, **params) for name, (fn, params) in column_defs(spec).items()}
+
+
+def market_features(market, spec=FEATURE_SPEC):
+    # 시장 기준 (SPY) 1개 → Date 인덱스 DataFrame
+    high, low, close = (market[c].to_numpy(np.float64)[:, None] for c in ["High", "Low", "Close"])
+    return pd.DataFrame({
+        name: fn(high, low, close, **params)[:, 0]
+        for name, (fn, params) in market_column_defs(spec).items()
+    }, index=market.index)
+
+
+def panel_arrays(bars, tickers=None, fields=("High", "Low", "Close")):
+    # {ticker: Date 인덱스 OHLC} → (dates, tickers, {field: (T, N)})
+    tickers = [t for t in (tickers or list(bars)) if t in bars and len(bars[t])]
+    dates = pd.DatetimeIndex(sorted(set().union(*[bars[t].index for t in tickers]))) if tickers else pd.DatetimeIndex([])
+    arrays = {
+        f: np.column_stack([bars[t][f].reindex(dates).to_numpy(np.float64) for t in tickers])
+        if tickers else np.empty((0, 0))
+        for f in fields
+    }
+    return dates, tickers, arrays
+
+
+def own_bars(bars):
+    # High / Low / Close 가 모두 있는 봉만 (종목 자기 날짜)
+    return bars.dropna(subset=["High", "Low", "Close"])
+
+
+def compute_features(bars, tickers, market_ticker="SPY", spec=FEATURE_SPEC):
+    # 반환: Date / Ticker / FEATURE_COLS long DataFrame (종목 봉과 시장 기준 봉이 모두 있는 날만)
+    groups = {}
+    for t in tickers:
+        if t not in bars:
+            continue
+        b = own_bars(bars[t])
+        if len(b):
+            groups.setdefault(b.index.values.tobytes(), []).append((t, b))
+
+    parts = []
+    for members in groups.values():
+        names = [t for t, _ in members]
+        dates, _, arr = panel_arrays(dict(members), names)
+        feats = ticker_features(arr["High"], arr["Low"], arr["Close"], spec)
+        parts.append(pd.DataFrame({
+            "Date": np.repeat(dates.values, len(names)),
+            "Ticker": np.tile(np.asarray(names, dtype=object), len(dates)),
+            **{name: values.ravel() for name, values in feats.items()},
+        }))
+
+    if not parts:
+        return pd.DataFrame(columns=["Date", "Ticker"] + FEATURE_COLS)
+
+    # 날짜 → tickers 순서 (예전 union 패널과 같은 행 순서)
+    order = {t: i for i, t in enumerate(tickers)}
+    out = pd.concat(parts, ignore_index=True)
+    out = out.iloc[np.lexsort([out["Ticker"].map(order).to_numpy(), out["Date"].to_numpy()])]
+
+    market = market_features(own_bars(bars[market_ticker]), spec)
+    out = out.merge(market, left_on="Date", right_index=True, how="inner")
+    return out[["Date", "Ticker"] + FEATURE_COLS].reset_index(drop=True)
+
+
+# ===============================
+# 버전 메타 (데이터셋 / 모델 옆 .features.json)
+# ===============================
+def write_feature_meta(path, spec=FEATURE_SPEC, bars_range=None):
+    # bars_range: 피처를 계산한 봉 구간 [start, end) (feature_store 가 같은 봉으로 컬럼을 붙일 때 사용)
+    meta = {"version": spec["version"], "spec": spec}
+    if bars_range is not None:
+        meta["bars_range"] = [None if d is None else str(d) for d in bars_range]
+    with open(path + META_SUFFIX, "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def read_feature_meta(path):
+    meta_path = path + META_SUFFIX
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        return json.load(f)
+
+
+def check_feature_meta(path, spec=FEATURE_SPEC):
+    meta = read_feature_meta(path)
+    if meta is None:
+        print(f"⚠️ 피처 버전 정보 없음: {path} (현재 v{spec['version']})")
+        return False
+
+    if meta["spec"] != spec:
+        print(f"⚠️ 피처 정의 불일치: {path} v{meta['version']} ≠ 현재 v{spec['version']}")
+        return False
+    return True
+
+
+# ===============================
+# 스트리밍 (라이브 스캔: 새 봉만 O(1) 갱신)
+# ===============================
+STREAM_TYPES = {cls.__name__: cls for cls in [RollingMax, RollingMeanStd, EWM, StreamingATR]}
+
+
+class FeatureStream:
+    # 종목 1개의 FEATURE_SPEC 피처를 봉 단위로 유지 (market=True 면 Market_* 피처)
+    def __init__(self, spec=FEATURE_SPEC, market=False):
+        self.spec = spec
+        self.market = market
+        self.last_date = None
+        self.last_close = None
+        self.values = {}
+
+        if market:
+            self.ind = {
+                "drawdown": RollingMax(spec["market_drawdown_window"]),
+                "atr": StreamingATR(spec["atr_period"], spec["atr_mode"]),
+                "ma": RollingMeanStd(spec["market_ma_window"]),
+            }
+        else:
+            self.ind = {f"drawdown_{w}": RollingMax(w) for w in spec["drawdown_windows"]}
+            self.ind["z"] = RollingMeanStd(spec["zscore_window"])
+            self.ind["atr"] = StreamingATR(spec["atr_period"], spec["atr_mode"])
+            fast, slow = spec["macd_spans"]
+            self.ind["ema_fast"] = EWM(fast)
+            self.ind["ema_slow"] = EWM(slow)
+            if spec["macd_signal"]:
+                self.ind["signal"] = EWM(spec["macd_signal"])
+            self.ind["ma"] = RollingMeanStd(spec["ma_window"])
+            self.ma_hist = deque(maxlen=spec["ma_slope_lag"] + 1)
+
+    def update(self, date, high, low, close):
+        ind = self.ind
+        if self.market:
+            self.values = {
+                "Market_Drawdown": close / ind["drawdown"].update(close) - 1,
+                "Market_ATR_ratio": ind["atr"].update(high, low, close) / close,
+                "Market_above_MA200": int(close > ind["ma"].update(close)),
+            }
+        else:
+            values = {}
+            for w in self.spec["drawdown_windows"]:
+                values[f"Drawdown_{w}"] = close / ind[f"drawdown_{w}"].update(close) - 1
+
+            ind["z"].update(close)
+            values["Z_score"] = (close - ind["z"].mean) / ind["z"].std
+            values["ATR_ratio"] = ind["atr"].update(high, low, close) / close
+
+            macd = ind["ema_fast"].update(close) - ind["ema_slow"].update(close)
+            if "signal" in ind:
+                macd = macd - ind["signal"].update(macd)
+            values["MACD_hist"] = macd
+
+            self.ma_hist.append(ind["ma"].update(close))
+            full = len(self.ma_hist) == self.ma_hist.maxlen
+            values["MA20_slope"] = self.ma_hist[-1] - self.ma_hist[0] if full else np.nan
+            self.values = values
+
+        self.last_date = pd.Timestamp(date)
+        self.last_close = float(close)
+        return self.values
+
+    def advance(self, bars):
+        # bars (Date 인덱스 OHLC) 중 last_date 이후 봉만 반영, 반영한 봉 수 반환
+        new = bars if self.last_date is None else bars[bars.index > self.last_date]
+        for date, high, low, close in zip(
+            new.index, new["High"].to_numpy(float), new["Low"].to_numpy(float), new["Close"].to_numpy(float)
+        ):
+            self.update(date, high, low, close)
+        return len(new)
+
+    def to_dict(self):
+        return {
+            "market": self.market,
+            "last_date": None if self.last_date is None else str(self.last_date.date()),
+            "last_close": self.last_close,
+            "values": self.values,
+            "ma_hist": list(getattr(self, "ma_hist", [])),
+            "ind": {k: {"type": type(v).__name__, **v.to_dict()} for k, v in self.ind.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, d, spec=FEATURE_SPEC):
+        obj = cls(spec, d["market"])
+        obj.last_date = None if d["last_date"] is None else pd.Timestamp(d["last_date"])
+        obj.last_close = d["last_close"]
+        obj.values = d["values"]
+        if not obj.market:
+            obj.ma_hist.extend(d["ma_hist"])
+        obj.ind = {
+            k: STREAM_TYPES[v["type"]].from_dict({kk: vv for kk, vv in v.items() if kk != "type"})
+            for k, v in d["ind"].items()
+        }
+        return obj
+
+
+def advance_stream(stream, bars, market=False, spec=FEATURE_SPEC):
+    # 저장된 상태를 이어서 갱신. 마지막 봉이 바뀌었거나 없으면 전체 이력으로 다시 만든다
+    if stream is not None and stream.last_date is not None:
+        if (
+            stream.last_date not in bars.index
+            or float(bars.loc[stream.last_date, "Close"]) != stream.last_close
+        ):
+            stream = None
+    if stream is None:
+        stream = FeatureStream(spec, market)
+    stream.advance(bars)
+    return stream
+
+
+def save_feature_streams(path, streams, spec=FEATURE_SPEC):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"spec": spec, "streams": {t: s.to_dict() for t, s in streams.items()}}, f)
+    os.replace(tmp_path, path)
+
+
+def load_feature_streams(path, spec=FEATURE_SPEC):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        state = json.load(f)
+    if state["spec"] != spec:
+        print("⚠️ 피처 정의 변경 → 스트리밍 상태 새로 생성")
+        return {}
+    return {t: FeatureStream.from_dict(d, spec) for t, d in state["streams"].items()}
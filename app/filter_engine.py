@@ -0,0 +1,223 @@
+import heapq
+import itertools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# ============================================================
+# 비트셋 필터 엔진 (선언형 조건 → packed bitset → AND + popcount)
+# ============================================================
+# 조건 1개 = {"feature", "op", "value"} 또는 {"feature", "op", "quantile"}
+#   (quantile 은 그 컬럼 분위수로 한 번만 threshold 를 정한다, 0.5 는 median)
+# 조건마다 전체 행을 한 번만 평가해서 np.packbits 로 압축 (행 8개 = 1바이트).
+# 조합 = 비트셋 AND, 표본 수 / 성공 수 = popcount (성공 비트셋과 AND).
+#
+# 조합 탐색 (search_filters):
+#   - 앞 조건부터 깊이 우선으로 AND, 노드마다 자식 (조건 1개 추가) 전체를 한 번에
+#     AND → 표본 수 popcount → 성공 수 popcount (모두 (자식 수, nbytes) 배열 한 번)
+#   - 표본 수가 min_samples 미만이면 그 아래 조합은 더 줄어들 뿐이라 잘라낸다
+#   - 같은 feature 의 조건끼리는 조합하지 않는다
+#   - 병렬: 깊이 2 (조건 쌍) 단위 작업으로 나눠 ProcessPoolExecutor 로 실행
+#     (첫 조건 단위로 나누면 앞 index 가 트리 대부분을 가져가 작업이 한쪽으로 몰린다)
+# NaN 행은 어떤 조건도 만족하지 않는다 (pandas 필터와 동일).
+
+OPS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    "==": np.equal,
+}
+
+SEARCH_QUANTILES = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
+MIN_SAMPLES = 200
+MAX_SIZE = 3
+TOP_N = 20
+
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(bits, axis=-1):
+    # packed uint8 비트셋의 1 개수 (numpy 2 는 np.bitwise_count)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bits).sum(axis=axis, dtype=np.int64)
+    return _POPCOUNT_TABLE[bits].sum(axis=axis, dtype=np.int64)
+
+
+def predicate(feature, op, value=None, quantile=None):
+    if op not in OPS:
+        raise ValueError(f"지원하지 않는 op: {op}")
+    if (value is None) == (quantile is None):
+        raise ValueError("value 와 quantile 중 하나만 지정")
+    return {"feature": feature, "op": op, "value": value, "quantile": quantile}
+
+
+def predicate_label(pred, threshold):
+    if pred["quantile"] is None:
+        return f"{pred['feature']} {pred['op']} {threshold:g}"
+    return f"{pred['feature']} {pred['op']} q{pred['quantile']:.2f} ({threshold:.4g})"
+
+
+def compile_predicates(df, predicates, target):
+    # 반환: {"labels", "features", "thresholds", "bits": (P, nbytes) uint8, "success": (nbytes,), "n"}
+    # 분위수는 컬럼별로 한 번만 계산
+    quantiles = {}
+    labels, features, thresholds, rows = [], [], [], []
+
+    for pred in predicates:
+        col = df[pred["feature"]]
+        if pred["quantile"] is None:
+            threshold = pred["value"]
+        else:
+            key = (pred["feature"], pred["quantile"])
+            if key not in quantiles:
+                q = pred["quantile"]
+                quantiles[key] = col.median() if q == 0.5 else col.quantile(q)
+            threshold = quantiles[key]
+
+        mask = OPS[pred["op"]](col.to_numpy(np.float64), threshold)
+        rows.append(np.packbits(mask))
+        labels.append(predicate_label(pred, threshold))
+        features.append(pred["feature"])
+        thresholds.append(threshold)
+
+    n = len(df)
+    return {
+        "labels": labels,
+        "features": features,
+        "thresholds": thresholds,
+        "bits": np.vstack(rows) if rows else np.empty((0, (n + 7) // 8), dtype=np.uint8),
+        "success": np.packbits(df[target].to_numpy() == 1),
+        "n": n,
+    }
+
+
+def evaluate(compiled, combo):
+    # combo (조건 index 목록) 의 AND → (표본 수, 성공 수)
+    mask = np.bitwise_and.reduce(compiled["bits"][list(combo)], axis=0)
+    return int(popcount(mask)), int(popcount(mask & compiled["success"]))
+
+
+def search_predicates(features, quantiles=SEARCH_QUANTILES, ops=("<", ">")):
+    return [predicate(f, op, quantile=q) for f in features for q in quantiles for op in ops]
+
+
+def dedupe(compiled):
+    # 비트셋이 같은 조건 (예: 0/1 컬럼의 여러 분위수) 은 하나만 남긴다
+    seen = {}
+    keep = []
+    for i, row in enumerate(compiled["bits"]):
+        key = (compiled["features"][i], row.tobytes())
+        if key not in seen:
+            seen[key] = i
+            keep.append(i)
+    return {
+        **compiled,
+        "labels": [compiled["labels"][i] for i in keep],
+        "features": [compiled["features"][i] for i in keep],
+        "thresholds": [compiled["thresholds"][i] for i in keep],
+        "bits": compiled["bits"][keep],
+    }
+
+
+# ===============================
+# 조합 탐색 (접두 조합 단위 작업)
+# ===============================
+_WORKER = {}
+
+
+def _init_worker(bits, success, features, max_size, min_samples, top):
+    _WORKER.update(
+        bits=bits, success=success, features=np.asarray(features),
+        max_size=max_size, min_samples=min_samples, top=top,
+    )
+
+
+def _search_from(prefix, subtree=True):
+    # prefix 조합 (+ subtree 면 그 아래 전체) 중 상위 top 개 (성공률 기준) → [(성공률, 표본 수, 성공 수, 조합)]
+    w = _WORKER
+    bits, success, features = w["bits"], w["success"], w["features"]
+    min_samples, max_size = w["min_samples"], w["max_size"]
+    best = []
+
+    def push(rate, count, succ, combo):
+        item = (rate, count, succ, combo)
+        if len(best) < w["top"]:
+            heapq.heappush(best, item)
+        elif item > best[0]:
+            heapq.heapreplace(best, item)
+
+    def expand(mask, combo):
+        # 자식 후보 전체를 한 번에 AND / 표본 수 / 성공 수
+        cand = np.arange(combo[-1] + 1, len(bits))
+        cand = cand[~np.isin(features[cand], features[list(combo)])]
+        if not cand.size:
+            return
+        masks = bits[cand] & mask
+        counts = popcount(masks, axis=1)
+        keep = counts >= min_samples
+        if not keep.any():
+            return
+        cand, masks, counts = cand[keep], masks[keep], counts[keep]
+        succs = popcount(masks & success, axis=1)
+
+        for j, m, count, succ in zip(cand, masks, counts, succs):
+            child = combo + (int(j),)
+            push(int(succ) / int(count), int(count), int(succ), child)
+            if len(child) < max_size:
+                expand(m, child)
+
+    prefix = tuple(prefix)
+    if len(set(features[list(prefix)])) < len(prefix):
+        return best
+    mask = np.bitwise_and.reduce(bits[list(prefix)], axis=0)
+    count = int(popcount(mask))
+    if count < min_samples:
+        return best
+    succ = int(popcount(mask & success))
+    push(succ / count, count, succ, prefix)
+    if subtree and len(prefix) < max_size:
+        expand(mask, prefix)
+    return best
+
+
+def _search_group(tasks):
+    # 작업 묶음 → 묶음 안 상위 top 개만 돌려준다 (프로세스 간 전송량 축소)
+    return heapq.nlargest(_WORKER["top"], itertools.chain.from_iterable(_search_from(*t) for t in tasks))
+
+
+def search_filters(
+    compiled, max_size=MAX_SIZE, min_samples=MIN_SAMPLES, top=TOP_N, workers=1
+):
+    # 반환: 상위 필터 목록 (lift 내림차순) — dict(Filter, Size, Samples, Success_rate, Lift, Combo)
+    n_pred = len(compiled["bits"])
+    base_rate = popcount(compiled["success"]) / compiled["n"] if compiled["n"] else np.nan
+    init_args = (compiled["bits"], compiled["success"], compiled["features"], max_size, min_samples, top)
+
+    if workers > 1:
+        # 단독 조건 (하위 트리 없이) + 모든 조건 쌍 (하위 트리 포함) 을 번갈아 묶는다
+        # → 묶음마다 앞 / 뒤 index 작업이 섞여 크기가 고르다
+        tasks = [((i,), max_size < 2) for i in range(n_pred)]
+        if max_size >= 2:
+            tasks += [((i, j), True) for i in range(n_pred) for j in range(i + 1, n_pred)]
+        n_groups = min(len(tasks), workers * 16)
+        groups = [tasks[g::n_groups] for g in range(n_groups)]
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=init_args
+        ) as executor:
+            parts = list(executor.map(_search_group, groups))
+    else:
+        _init_worker(*init_args)
+        parts = [_search_from((i,)) for i in range(n_pred)]
+
+    merged = heapq.nlargest(top, itertools.chain.from_iterable(parts))
+    return [
+        {
+            "Filter": " & ".join(compiled["labels"][i] for i in combo),
+            "Size": len(combo),
+            "Samples": count,
+            "Success_rate": rate,
+            "Lift": rate / base_rate if base_rate else np.nan,
+            "Combo": combo,
+        }
+        for rate, count, succ, combo in merged
+    ]
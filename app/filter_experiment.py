@@ -1,74 +1,122 @@
+import argparse
 import pandas as pd
 import numpy as np
 
+from feature_store import load_training_frame
+from features import FEATURE_COLS
+from filter_engine import (
+    MAX_SIZE,
+    MIN_SAMPLES,
+    TOP_N,
+    predicate,
+    compile_predicates,
+    evaluate,
+    search_predicates,
+    dedupe,
+    search_filters,
+)
+
+RESULT_PATH = "data/filter_experiment_results.csv"
+SEARCH_PATH = "data/filter_search_results.csv"
+
 # ===============================
-# 데이터 로드
+# 고정 필터 (선언형: feature, op, value / quantile)
 # ===============================
-df = pd.read_csv("data/raw_data.csv")
+FILTERS = {
+    "Drawdown_252 < -0.25": [
+        predicate("Drawdown_252", "<", -0.25),
+    ],
+    "Drawdown_252 < -0.25 & ATR_ratio > median": [
+        predicate("Drawdown_252", "<", -0.25),
+        predicate("ATR_ratio", ">", quantile=0.5),
+    ],
+    "DD252<-0.25 & ATR>med & DD60<-0.15": [
+        predicate("Drawdown_252", "<", -0.25),
+        predicate("ATR_ratio", ">", quantile=0.5),
+        predicate("Drawdown_60", "<", -0.15),
+    ],
+}
 
-base_success_rate = df["Success_1st"].mean()
-base_count = len(df)
 
-print("\n📊 전체 데이터")
-print("Samples:", base_count)
-print("Base Success Rate:", round(base_success_rate, 4))
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--search", action="store_true", help="전체 feature 분위수 조건의 조합 탐색")
+    parser.add_argument("--max-size", type=int, default=MAX_SIZE, help="조합 최대 조건 수")
+    parser.add_argument("--min-samples", type=int, default=MIN_SAMPLES, help="최소 표본 수")
+    parser.add_argument("--top", type=int, default=TOP_N, help="저장할 상위 필터 수")
+    parser.add_argument("--workers", type=int, default=1, help="첫 조건 단위로 N개 프로세스 병렬 탐색")
+    args = parser.parse_args()
 
-results = []
+    # ===============================
+    # 데이터 로드 (없는 피처 컬럼은 피처 저장소에서)
+    # ===============================
+    df = load_training_frame("data/raw_data.csv", FEATURE_COLS)
 
-# ===============================
-# 1️⃣ Drawdown_252 단독 필터
-# ===============================
-df_f1 = df[df["Drawdown_252"] < -0.25]
+    target = "Success_1st" if "Success_1st" in df.columns else "Success"
+    base_success_rate = df[target].mean()
+    base_count = len(df)
 
-results.append({
-    "Filter": "Drawdown_252 < -0.25",
-    "Samples": len(df_f1),
-    "Success_rate": df_f1["Success_1st"].mean()
-})
+    print("\n📊 전체 데이터")
+    print("Samples:", base_count)
+    print("Base Success Rate:", round(base_success_rate, 4))
 
-# ===============================
-# 2️⃣ Drawdown_252 + ATR_ratio
-# ===============================
-df_f2 = df[
-    (df["Drawdown_252"] < -0.25) &
-    (df["ATR_ratio"] > df["ATR_ratio"].median())
-]
+    # ===============================
+    # 1️⃣ ~ 3️⃣ 고정 필터 (조건마다 비트셋 1번, 조합은 AND)
+    # ===============================
+    preds = []
+    for conds in FILTERS.values():
+        preds += [p for p in conds if p not in preds]
+    compiled = compile_predicates(df, preds, target)
 
-results.append({
-    "Filter": "Drawdown_252 < -0.25 & ATR_ratio > median",
-    "Samples": len(df_f2),
-    "Success_rate": df_f2["Success_1st"].mean()
-})
+    results = []
+    for name, conds in FILTERS.items():
+        count, succ = evaluate(compiled, [preds.index(p) for p in conds])
+        results.append({
+            "Filter": name,
+            "Samples": count,
+            "Success_rate": succ / count if count else np.nan,
+        })
 
-# ===============================
-# 3️⃣ Drawdown_252 + ATR_ratio + Drawdown_60
-# ===============================
-df_f3 = df[
-    (df["Drawdown_252"] < -0.25) &
-    (df["ATR_ratio"] > df["ATR_ratio"].median()) &
-    (df["Drawdown_60"] < -0.15)
-]
-
-results.append({
-    "Filter": "DD252<-0.25 & ATR>med & DD60<-0.15",
-    "Samples": len(df_f3),
-    "Success_rate": df_f3["Success_1st"].mean()
-})
+    # ===============================
+    # 결과 정리
+    # ===============================
+    result_df = pd.DataFrame(results)
 
-# ===============================
-# 결과 정리
-# ===============================
-result_df = pd.DataFrame(results)
+    result_df["Base_success_rate"] = base_success_rate
+    result_df["Improvement"] = result_df["Success_rate"] - base_success_rate
 
-result_df["Base_success_rate"] = base_success_rate
-result_df["Improvement"] = result_df["Success_rate"] - base_success_rate
+    print("\n🔥 필터 실험 결과\n")
+    print(result_df)
 
-print("\n🔥 필터 실험 결과\n")
-print(result_df)
+    # ===============================
+    # 저장
+    # ===============================
+    result_df.to_csv(RESULT_PATH, index=False)
+
+    print(f"\n✅ 저장 완료 → {RESULT_PATH}")
+
+    # ===============================
+    # 4️⃣ 조합 탐색 (lift 상위, 최소 표본 수)
+    # ===============================
+    if not args.search:
+        return
+
+    features = [c for c in FEATURE_COLS if c in df.columns]
+    search = dedupe(compile_predicates(df, search_predicates(features), target))
+    print(f"\n🔎 조합 탐색: 조건 {len(search['labels'])}개, 최대 {args.max_size}개 조합, "
+          f"표본 ≥ {args.min_samples}, workers={args.workers}")
+
+    top = pd.DataFrame(
+        search_filters(search, args.max_size, args.min_samples, args.top, args.workers),
+        columns=["Filter", "Size", "Samples", "Success_rate", "Lift", "Combo"],
+    ).drop(columns="Combo")
+    top["Base_success_rate"] = base_success_rate
+    top["Improvement"] = top["Success_rate"] - base_success_rate
+
+    print(top[["Filter", "Samples", "Success_rate", "Lift"]].to_string(index=False))
+    top.to_csv(SEARCH_PATH, index=False)
+    print(f"\n✅ 저장 완료 → {SEARCH_PATH}")
 
-# ===============================
-# 저장
-# ===============================
-result_df.to_csv("data/filter_experiment_results.csv", index=False)
 
-print("\n✅ 저장 완료 → data/filter_experiment_results.csv")
+if __name__ == "__main__":
+    main()
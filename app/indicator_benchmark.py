@@ -0,0 +1,126 @@
+import argparse
+import time
+import pandas as pd
+import numpy as np
+
+from indicators import (
+    compute_rsi,
+    compute_atr,
+    rsi,
+    average_true_range,
+    rolling_max,
+    rolling_min,
+    rolling_mean,
+    rolling_std,
+)
+from bar_store import read_bars
+from features import panel_arrays
+from universe import UNIVERSE
+
+# ============================================================
+# 지표 커널 벤치마크 (종목별 pandas vs (T, N) 배열 한 번에)
+# ============================================================
+# pandas 쪽은 지금 데이터셋 빌드와 같은 방식 (종목마다 Series / DataFrame 로 계산).
+# 결과 차이(최대 절대 오차)와 NaN 위치 일치 여부도 같이 출력한다.
+# 기본은 랜덤워크 패널, --from-store 면 data/bars 에 저장된 UNIVERSE 봉 사용.
+
+PERIOD = 14
+WINDOWS = [20, 60, 252]
+
+
+def synthetic_panel(days, tickers, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.03, (days, tickers)), axis=0))
+    spread = np.abs(rng.normal(0, 0.02, (days, tickers)))
+    return close * (1 + spread), close * (1 - spread), close
+
+
+def store_panel():
+    bars = {}
+    for t in UNIVERSE:
+        df, _ = read_bars(t)
+        if df is not None and len(df):
+            bars[t] = df
+    _, _, arr = panel_arrays(bars)
+    return arr["High"], arr["Low"], arr["Close"]
+
+
+def timed(fn, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return out, best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=2500, help="랜덤 패널 길이 (거래일)")
+    parser.add_argument("--tickers", type=int, default=100, help="랜덤 패널 종목 수")
+    parser.add_argument("--repeat", type=int, default=3, help="측정 반복 (최솟값 사용)")
+    parser.add_argument("--from-store", action="store_true", help="data/bars 저장소의 UNIVERSE 봉 사용")
+    args = parser.parse_args()
+
+    high, low, close = store_panel() if args.from_store else synthetic_panel(args.days, args.tickers)
+    T, N = close.shape
+    cols = range(N)
+    frames = [pd.DataFrame({"High": high[:, c], "Low": low[:, c], "Close": close[:, c]}) for c in cols]
+    series = [f["Close"] for f in frames]
+
+    cases = [
+        ("RSI (simple)",
+         lambda: np.column_stack([compute_rsi(s, PERIOD) for s in series]),
+         lambda: rsi(close, PERIOD)),
+        ("ATR (true range)",
+         lambda: np.column_stack([compute_atr(f, PERIOD) for f in frames]),
+         lambda: average_true_range(high, low, close, PERIOD)),
+    ]
+    for w in WINDOWS:
+        cases += [
+            (f"rolling max {w}",
+             lambda w=w: np.column_stack([s.rolling(w).max() for s in series]),
+             lambda w=w: rolling_max(close, w)),
+            (f"rolling min {w}",
+             lambda w=w: np.column_stack([s.rolling(w).min() for s in series]),
+             lambda w=w: rolling_min(close, w)),
+            (f"rolling mean {w}",
+             lambda w=w: np.column_stack([s.rolling(w).mean() for s in series]),
+             lambda w=w: rolling_mean(close, w)),
+            (f"rolling std {w}",
+             lambda w=w: np.column_stack([s.rolling(w).std() for s in series]),
+             lambda w=w: rolling_std(close, w)),
+        ]
+
+    # 비교 대상 없는 변형 (시간만)
+    extra = [
+        ("RSI (wilder)", lambda: rsi(close, PERIOD, "wilder")),
+        ("ATR (high-low)", lambda: average_true_range(high, low, close, PERIOD, "high_low")),
+        ("ATR (wilder)", lambda: average_true_range(high, low, close, PERIOD, smoothing="wilder")),
+    ]
+
+    print(f"⏱ 지표 벤치마크: {T}일 × {N}종목 (반복 {args.repeat}회 중 최솟값)")
+    print(f"{'지표':<20}{'pandas(s)':>12}{'kernel(s)':>12}{'배속':>8}{'최대오차':>12}  NaN 일치")
+
+    total_pd = total_np = 0.0
+    for name, pandas_fn, kernel_fn in cases:
+        ref, t_pd = timed(pandas_fn, args.repeat)
+        out, t_np = timed(kernel_fn, args.repeat)
+        total_pd += t_pd
+        total_np += t_np
+
+        same_nan = bool((np.isnan(ref) == np.isnan(out)).all())
+        both = ~np.isnan(ref) & ~np.isnan(out)
+        err = float(np.abs(ref[both] - out[both]).max()) if both.any() else 0.0
+        print(f"{name:<20}{t_pd:>12.4f}{t_np:>12.4f}{t_pd / t_np:>8.1f}{err:>12.2e}  {'✅' if same_nan else '⚠️'}")
+
+    for name, kernel_fn in extra:
+        _, t_np = timed(kernel_fn, args.repeat)
+        print(f"{name:<20}{'-':>12}{t_np:>12.4f}")
+
+    print("=" * 60)
+    print(f"📊 합계 pandas {total_pd:.3f}s / kernel {total_np:.3f}s → {total_pd / total_np:.1f}배")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from collections import deque
 
 def compute_rsi(series, period=14):
     delta = series.diff()
@@ -21,3 +22,353 @@ def compute_atr(df, period=14):
 
     tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
     return tr.rolling(period).mean()
+
+
+# ============================================================
+# (T, N) 배열 커널 (axis=0 = 시간, 열 = 종목) — 전 종목 한 번에, O(T·N)
+# ============================================================
+# 창 크기와 무관하게 원소당 상수 연산:
+#   - 롤링 max / min: 창 크기 블록별 prefix / suffix 누적 (van Herk / Gil-Werman)
+#   - 롤링 mean / std: 같은 블록 분할 + 블록 평균 기준 중심화 합 / 제곱합
+#     (전체 누적합 차이보다 상쇄 오차가 작다)
+# 창 안에 NaN 이 하나라도 있으면 NaN, 창이 다 차기 전도 NaN (pandas rolling 기본값과 동일).
+# 1차원 배열도 그대로 받는다.
+
+def _as_2d(x):
+    x = np.asarray(x, dtype=np.float64)
+    return x.reshape(len(x), -1)
+
+
+def _window_nans(nan, window):
+    # 창 [t - w + 1, t] 안의 NaN 개수 (t ≥ w - 1), NaN 이 없으면 None
+    if not nan.any():
+        return None
+    csum = np.concatenate([np.zeros((1, nan.shape[1]), dtype=np.int64), np.cumsum(nan, axis=0)])
+    return csum[window:] - csum[:-window]
+
+
+def _mask_nans(values, nans):
+    return values if nans is None else np.where(nans > 0, np.nan, values)
+
+
+def _blocks(x, window, fill):
+    # (T, N) → (블록 수, window, N), 끝은 fill 로 채움
+    nb = -(-len(x) // window)
+    pad = np.full((nb * window - len(x), x.shape[1]), fill, dtype=x.dtype)
+    return np.concatenate([x, pad]).reshape(nb, window, x.shape[1])
+
+
+def _block_scan(b, op):
+    # 블록 안 prefix (g) / suffix (h) 누적 → (블록 수 × window, N)
+    g = op.accumulate(b, axis=1)
+    h = op.accumulate(b[:, ::-1], axis=1)[:, ::-1]
+    return g.reshape(-1, b.shape[2]), h.reshape(-1, b.shape[2])
+
+
+def _rolling_extreme(x, window, op, fill):
+    shape = np.shape(x)
+    x = _as_2d(x)
+    T = len(x)
+    out = np.full(x.shape, np.nan)
+    if T >= window:
+        # 창 [s, t] = [s, s 가 속한 블록 끝] (h) ∪ [다음 블록 시작, t] (g)
+        nan = np.isnan(x)
+        nans = _window_nans(nan, window)
+        g, h = _block_scan(_blocks(x if nans is None else np.where(nan, fill, x), window, fill), op)
+        out[window - 1 :] = _mask_nans(op(h[: T - window + 1], g[window - 1 : T]), nans)
+    return out.reshape(shape)
+
+
+def rolling_max(x, window):
+    return _rolling_extreme(x, window, np.maximum, -np.inf)
+
+
+def rolling_min(x, window):
+    return _rolling_extreme(x, window, np.minimum, np.inf)
+
+
+def _rolling_moments(x, window, second=True):
+    # 반환 (t ≥ w - 1 구간): 기준값 ref, Σ(x - ref), Σ(x - ref)² (second=False 면 None), 창 안 NaN 개수
+    T = len(x)
+    nan = np.isnan(x)
+    nans = _window_nans(nan, window)
+    if nans is None:
+        xb = _blocks(x, window, 0.0)
+        cnt = np.minimum(window, T - np.arange(len(xb)) * window)[:, None]
+    else:
+        xb = _blocks(np.where(nan, 0.0, x), window, 0.0)
+        cnt = window - _blocks(nan, window, True).sum(axis=1)
+
+    ref = np.where(cnt > 0, xb.sum(axis=1) / np.maximum(cnt, 1), 0.0)
+    ref = np.concatenate([ref, ref[-1:]])
+    c = xb - ref[:-1, None]
+    c = c.reshape(-1, x.shape[1])
+    c[T:] = 0.0
+    if nans is not None:
+        c[:T][nan] = 0.0
+    c = c.reshape(xb.shape)
+
+    # 창 시작 s 가 블록 k 에 있으면 [s, 블록 k 끝] (h) + [블록 k+1 시작, t] (g, 기준값을 ref[k] 로 옮김),
+    # s 가 블록 시작이면 창 = 블록 k 전체 (h 만)
+    s = np.arange(T - window + 1)
+    k = s // window
+    split = (s % window != 0)[:, None]
+    d = np.where(split, ref[k + 1] - ref[k], 0.0)
+    n_g = np.where(split, s[:, None] - k[:, None] * window, 0)
+
+    g1, h1 = _block_scan(c, np.add)
+    g1 = np.where(split, g1[window - 1 : T], 0.0)
+    s1 = h1[: T - window + 1] + g1 + n_g * d
+
+    s2 = None
+    if second:
+        g2, h2 = _block_scan(c * c, np.add)
+        g2 = np.where(split, g2[window - 1 : T], 0.0)
+        s2 = h2[: T - window + 1] + g2 + 2 * d * g1 + n_g * d * d
+    return ref[k], s1, s2, nans
+
+
+def rolling_mean(x, window):
+    shape = np.shape(x)
+    x = _as_2d(x)
+    out = np.full(x.shape, np.nan)
+    if len(x) >= window:
+        ref, s1, _, nans = _rolling_moments(x, window, second=False)
+        out[window - 1 :] = _mask_nans(ref + s1 / window, nans)
+    return out.reshape(shape)
+
+
+def rolling_std(x, window, ddof=1):
+    shape = np.shape(x)
+    x = _as_2d(x)
+    out = np.full(x.shape, np.nan)
+    if len(x) >= window and window > ddof:
+        _, s1, s2, nans = _rolling_moments(x, window)
+        var = np.maximum(s2 - s1 * s1 / window, 0.0) / (window - ddof)
+        out[window - 1 :] = _mask_nans(np.sqrt(var), nans)
+    return out.reshape(shape)
+
+
+def shift(x, n=1):
+    out = np.full(np.shape(x), np.nan)
+    out[n:] = x[:-n]
+    return out
+
+
+def ewm_mean(x, span):
+    # pandas ewm(span, adjust=True).mean() 과 같은 가중 평균, NaN 인 날은 건너뜀
+    decay = 1 - 2 / (span + 1)
+    num = np.zeros(x.shape[1:])
+    den = np.zeros(x.shape[1:])
+    out = np.full(x.shape, np.nan)
+    for t in range(len(x)):
+        valid = ~np.isnan(x[t])
+        num = np.where(valid, x[t] + decay * num, num)
+        den = np.where(valid, 1 + decay * den, den)
+        out[t] = np.where(valid, num / np.where(den > 0, den, 1), np.nan)
+    return out
+
+
+def wilder_mean(x, period):
+    # Wilder 평활: 첫 period 개 유효값의 단순 평균으로 시작, 이후 avg = (avg·(p-1) + x) / p
+    # (NaN 인 날은 상태를 유지하고 NaN, 종목마다 첫 유효값부터 따로 워밍업)
+    x = np.asarray(x, dtype=np.float64)
+    count = np.zeros(x.shape[1:], dtype=np.int64)
+    total = np.zeros(x.shape[1:])
+    avg = np.full(x.shape[1:], np.nan)
+    out = np.full(x.shape, np.nan)
+    for t in range(len(x)):
+        valid = ~np.isnan(x[t])
+        xt = np.where(valid, x[t], 0.0)
+        warm = valid & (count < period)
+        step = valid & ~warm
+        total = total + np.where(warm, xt, 0.0)
+        count = count + valid
+        avg = np.where(warm & (count == period), total / period, avg)
+        avg = np.where(step, (avg * (period - 1) + xt) / period, avg)
+        out[t] = np.where(valid & (count >= period), avg, np.nan)
+    return out
+
+
+def _smooth(x, period, smoothing):
+    if smoothing == "wilder":
+        return wilder_mean(x, period)
+    return rolling_mean(x, period)
+
+
+def rsi(close, period=14, smoothing="simple"):
+    # smoothing="simple": compute_rsi 와 같은 롤링 평균, "wilder": Wilder 평활
+    delta = close - shift(close)
+    gain = np.maximum(delta, 0.0)
+    loss = np.maximum(-delta, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = _smooth(gain, period, smoothing) / _smooth(loss, period, smoothing)
+        return 100 - 100 / (1 + rs)
+
+
+def true_range(high, low, close):
+    prev = shift(close)
+    return np.fmax(np.fmax(high - low, np.abs(high - prev)), np.abs(low - prev))
+
+
+def average_true_range(high, low, close, period=14, mode="true_range", smoothing="simple"):
+    # mode="true_range": compute_atr 와 같은 True Range, "high_low": High - Low
+    tr = true_range(high, low, close) if mode == "true_range" else high - low
+    return _smooth(tr, period, smoothing)
+
+
+# ============================================================
+# 스트리밍 지표 (봉 1개당 O(1) 갱신, 고정 크기 ring buffer)
+# ============================================================
+# 배치 계산(rolling / ewm)과 같은 값을 마지막 봉 기준으로 유지한다.
+# 창이 다 차기 전에는 NaN (pandas rolling 기본값과 동일).
+# to_dict() / from_dict() 로 JSON 직렬화해서 다음 실행에 이어 쓴다.
+
+class RollingMax:
+    # 단조 감소 deque (seq, value), 길이 ≤ window
+    def __init__(self, window):
+        self.window = window
+        self.seq = 0
+        self.deque = deque()
+
+    def update(self, x):
+        while self.deque and self.deque[-1][1] <= x:
+            self.deque.pop()
+        self.deque.append((self.seq, x))
+        if self.deque[0][0] <= self.seq - self.window:
+            self.deque.popleft()
+        self.seq += 1
+        return self.value
+
+    @property
+    def value(self):
+        return self.deque[0][1] if self.seq >= self.window else np.nan
+
+    def to_dict(self):
+        return {"window": self.window, "seq": self.seq, "deque": list(self.deque)}
+
+    @classmethod
+    def from_dict(cls, d):
+        obj = cls(d["window"])
+        obj.seq = d["seq"]
+        obj.deque = deque(tuple(item) for item in d["deque"])
+        return obj
+
+
+class RollingMeanStd:
+    # ring buffer + 기준값(첫 값) 대비 합 / 제곱합, window 번마다 버퍼로 다시 합산 (오차 누적 방지)
+    def __init__(self, window):
+        self.window = window
+        self.buf = [0.0] * window
+        self.pos = 0
+        self.count = 0
+        self.ref = None
+        self.s = 0.0
+        self.ss = 0.0
+
+    def update(self, x):
+        if self.ref is None:
+            self.ref = x
+
+        if self.count >= self.window:
+            old = self.buf[self.pos] - self.ref
+            self.s -= old
+            self.ss -= old * old
+
+        self.buf[self.pos] = x
+        self.pos = (self.pos + 1) % self.window
+        self.count += 1
+
+        d = x - self.ref
+        self.s += d
+        self.ss += d * d
+
+        if self.count % self.window == 0:
+            diffs = [v - self.ref for v in self.buf]
+            self.s = sum(diffs)
+            self.ss = sum(v * v for v in diffs)
+        return self.mean
+
+    @property
+    def mean(self):
+        if self.count < self.window:
+            return np.nan
+        return self.ref + self.s / self.window
+
+    @property
+    def std(self):
+        if self.count < self.window or self.window < 2:
+            return np.nan
+        var = (self.ss - self.s * self.s / self.window) / (self.window - 1)
+        return np.sqrt(max(var, 0.0))
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, d):
+        obj = cls(d["window"])
+        obj.__dict__.update(d)
+        return obj
+
+
+class EWM:
+    # pandas ewm(span, adjust=True).mean()
+    def __init__(self, span):
+        self.span = span
+        self.num = 0.0
+        self.den = 0.0
+
+    def update(self, x):
+        decay = 1 - 2 / (self.span + 1)
+        self.num = x + decay * self.num
+        self.den = 1 + decay * self.den
+        return self.value
+
+    @property
+    def value(self):
+        return self.num / self.den if self.den > 0 else np.nan
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, d):
+        obj = cls(d["span"])
+        obj.__dict__.update(d)
+        return obj
+
+
+class StreamingATR:
+    # compute_atr 와 같은 True Range 평균 (mode="high_low" 면 High - Low)
+    def __init__(self, period=14, mode="true_range"):
+        self.period = period
+        self.mode = mode
+        self.prev_close = None
+        self.mean = RollingMeanStd(period)
+
+    def update(self, high, low, close):
+        tr = high - low
+        if self.mode == "true_range" and self.prev_close is not None:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        return self.mean.update(tr)
+
+    @property
+    def value(self):
+        return self.mean.mean
+
+    def to_dict(self):
+        return {
+            "period": self.period,
+            "mode": self.mode,
+            "prev_close": self.prev_close,
+            "mean": self.mean.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        obj = cls(d["period"], d["mode"])
+        obj.prev_close = d["prev_close"]
+        obj.mean = RollingMeanStd.from_dict(d["mean"])
+        return obj
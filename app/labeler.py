@@ -0,0 +1,281 @@
+import pandas as pd
+import numpy as np
+
+from config import DCA_DAYS, TARGET, STOP_LOSS
+
+# ============================================================
+# 라벨 엔진 (모든 시작일의 simulate_strategy 를 한 번에)
+# ============================================================
+# make_raw_data.py 는 시작일 i 마다 simulate_strategy(close[i:]) 를 불러
+# 성장하는 리스트의 np.mean 을 다시 계산했다 (종목당 O(N²) 이상).
+#
+# - 1차 분할매수 구간 (DCA_DAYS 일): 길이별 행 평균을 한 번에 계산
+#   (연속 배열 행 평균 = 1차원 np.mean 과 비트 단위로 동일)
+# - 확장 구간: 가격 누적합으로 평균을 근사해 BLOCK 일씩 first-passage 탐색
+#   → 찾은 청산일 / 최저점만 np.mean 으로 다시 계산해 원래 값과 동일하게 맞춘다
+# - 근사 오차(EPS) 안에서 판정이 갈리는 시작일은 simulate_strategy 로 직접 계산
+
+# 기본 라벨 정의는 config.py (40일 분할매수 / +10% 목표 / -10% 확장 청산)
+EXT_STOP = STOP_LOSS
+
+# 라벨 변형 그리드 (make_raw_data.py --label-grid)
+LABEL_DCA_DAYS = [20, 30, 40, 50, 60]
+LABEL_TARGETS = [0.05, 0.08, 0.10, 0.15, 0.20]
+LABEL_EXT_STOPS = [-0.05, -0.10]
+
+EPS = 1e-9
+BLOCK = 64
+
+LABEL_COLS = ["Success", "Return_Fail1", "Return_Fail2", "Holding_Period", "Max_Drawdown"]
+
+
+# ===============================
+# 🔥 전략 시뮬레이션 (기준 구현, 시작일 1개)
+# ===============================
+def simulate_strategy(prices, dca_days=DCA_DAYS, target=TARGET, ext_stop=EXT_STOP):
+
+    invested = []
+    mdd = 0
+
+    # -------------------------
+    # 1차 분할매수
+    # -------------------------
+    success = 0
+    exit_day = dca_days - 1
+
+    for d in range(min(dca_days, len(prices))):
+        invested.append(prices[d])
+        avg_price = np.mean(invested)
+        ret = prices[d] / avg_price - 1
+        mdd = min(mdd, ret)
+
+        if ret >= target:
+            success = 1
+            exit_day = d
+            break
+
+    if len(prices) < dca_days:
+        return None
+
+    # =========================
+    # 실패1 (분할매수 마지막 날 정리)
+    # =========================
+    avg_40 = np.mean(prices[:dca_days])
+    ret_40 = prices[dca_days - 1] / avg_40 - 1
+    return_fail1 = ret_40
+
+    # =========================
+    # 실패2 (확장형)
+    # =========================
+    if success == 1:
+        return_fail2 = target
+        holding = exit_day + 1
+    else:
+        if ret_40 >= ext_stop:
+            return_fail2 = ret_40
+            holding = dca_days
+        else:
+            extended_exit = False
+
+            for d2 in range(dca_days, len(prices)):
+                invested.append(prices[d2])
+                avg_ext = np.mean(invested)
+                ret_ext = prices[d2] / avg_ext - 1
+                mdd = min(mdd, ret_ext)
+
+                if ret_ext >= ext_stop:
+                    return_fail2 = ret_ext
+                    holding = d2 + 1
+                    extended_exit = True
+                    break
+
+            if not extended_exit:
+                avg_ext = np.mean(invested)
+                return_fail2 = prices[-1] / avg_ext - 1
+                holding = len(prices)
+
+    return {
+        "Success": success,
+        "Return_Fail1": return_fail1,
+        "Return_Fail2": return_fail2,
+        "Holding_Period": holding,
+        "Max_Drawdown": mdd
+    }
+
+
+# ===============================
+# 1차 구간 수익률 행렬
+# ===============================
+def dca_returns(prices, n_starts, dca_days=DCA_DAYS):
+    # rets[i, d] = prices[i + d] / mean(prices[i : i + d + 1]) - 1
+    windows = np.lib.stride_tricks.sliding_window_view(prices, dca_days)[:n_starts]
+    rets = np.empty((n_starts, dca_days))
+    for d in range(dca_days):
+        avg = np.ascontiguousarray(windows[:, : d + 1]).mean(axis=1)
+        rets[:, d] = windows[:, d] / avg - 1
+    return rets
+
+
+# ===============================
+# 확장 구간 first-passage (근사 평균, BLOCK 일씩)
+# ===============================
+def _extension_exits(prices, csum, starts, dca_days, ext_stop):
+    # 반환: 청산일 (없으면 마지막 날), 판정이 EPS 안에서 갈리는지 여부,
+    #       청산일까지 확장 구간 근사 최저 수익률
+    N = len(prices)
+    exit_j = np.full(len(starts), N - 1)
+    ambiguous = np.zeros(len(starts), dtype=bool)
+    ext_min = np.full(len(starts), np.inf)
+
+    active = np.arange(len(starts))
+    offset = dca_days
+    while active.size:
+        i = starts[active][:, None]
+        j = i + offset + np.arange(BLOCK)
+        valid = j < N
+        j = np.minimum(j, N - 1)
+
+        approx = prices[j] * (j - i + 1) / (csum[j + 1] - csum[i]) - 1
+        loose = valid & (approx >= ext_stop - EPS)
+        tight = valid & (approx >= ext_stop + EPS)
+
+        done = loose.any(axis=1)
+        first = np.where(done, loose.argmax(axis=1), BLOCK - 1)
+        rows = np.arange(len(active))
+
+        upto = valid & (np.arange(BLOCK) <= first[:, None])
+        ext_min[active] = np.minimum(ext_min[active], np.where(upto, approx, np.inf).min(axis=1))
+
+        exit_j[active[done]] = j[rows, first][done]
+        ambiguous[active[done & ~tight[rows, first]]] = True
+
+        active = active[~done & valid[:, -1]]
+        offset += BLOCK
+
+    return exit_j, ambiguous, ext_min
+
+
+def _exact_ret(prices, i, j, cache):
+    # prices[j] / np.mean(prices[i : j + 1]) - 1 (설정이 달라도 같은 (i, j) 는 재사용)
+    key = (i, j)
+    if key not in cache:
+        cache[key] = prices[j] / np.mean(prices[i : j + 1]) - 1
+    return cache[key]
+
+
+def _label_arrays(prices, csum, rets, n_starts, dca_days, target, ext_stop, cache, exact=True):
+    # -------------------------
+    # 1차 분할매수 (rets 는 더 긴 dca_days 로 만든 행렬이어도 된다)
+    # -------------------------
+    rets = rets[:n_starts, :dca_days]
+    hit = rets >= target
+    success = hit.any(axis=1)
+    exit_day = np.where(success, hit.argmax(axis=1), dca_days - 1)
+
+    upto = np.arange(dca_days) <= exit_day[:, None]
+    mdd = np.where(upto, rets, 0).min(axis=1)
+
+    return_fail1 = rets[:, -1]
+    return_fail2 = np.where(success, target, return_fail1)
+    holding = np.where(success, exit_day + 1, dca_days)
+
+    # -------------------------
+    # 확장 구간
+    # -------------------------
+    starts = np.flatnonzero(~success & (return_fail1 < ext_stop))
+    if starts.size:
+        exit_j, ambiguous, ext_min = _extension_exits(prices, csum, starts, dca_days, ext_stop)
+
+        # 근사값 (누적합 기준, 판정은 같고 수익률 값만 ulp 수준 차이)
+        dca_mdd = mdd[starts]
+        return_fail2[starts] = (
+            prices[exit_j] * (exit_j - starts + 1) / (csum[exit_j + 1] - csum[starts]) - 1
+        )
+        holding[starts] = exit_j - starts + 1
+        mdd[starts] = np.minimum(dca_mdd, ext_min)
+
+        # exact=True 면 청산일 / 최저점 후보만 np.mean 으로 다시 계산해 원래 값과 맞추고,
+        # 판정이 EPS 안에서 갈리는 시작일은 항상 simulate_strategy 로 직접 계산
+        redo = np.ones(len(starts), dtype=bool) if exact else ambiguous
+
+        for r in np.flatnonzero(redo):
+            i, e = starts[r], exit_j[r]
+            if ambiguous[r]:
+                sim = simulate_strategy(prices[i:], dca_days, target, ext_stop)
+                return_fail2[i] = sim["Return_Fail2"]
+                holding[i] = sim["Holding_Period"]
+                mdd[i] = sim["Max_Drawdown"]
+                continue
+
+            return_fail2[i] = _exact_ret(prices, i, e, cache)
+
+            js = np.arange(i + dca_days, e + 1)
+            if js.size:
+                approx = prices[js] * (js - i + 1) / (csum[js + 1] - csum[i]) - 1
+                candidates = js[approx <= ext_min[r] + EPS]
+                ext_mdd = min(_exact_ret(prices, i, j, cache) for j in candidates)
+                mdd[i] = min(dca_mdd[r], ext_mdd)
+
+    return {
+        "Success": success.astype(int),
+        "Return_Fail1": return_fail1,
+        "Return_Fail2": return_fail2,
+        "Holding_Period": holding,
+        "Max_Drawdown": mdd,
+    }
+
+
+def label_series(prices, dca_days=DCA_DAYS, target=TARGET, ext_stop=EXT_STOP):
+    # 시작일 i (남은 기간 ≥ dca_days) 별 라벨, index = i
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    n_starts = len(prices) - dca_days + 1
+    if n_starts <= 0:
+        return pd.DataFrame(columns=LABEL_COLS)
+
+    rets = dca_returns(prices, n_starts, dca_days)
+    csum = np.concatenate([[0.0], np.cumsum(prices)])
+    return pd.DataFrame(
+        _label_arrays(prices, csum, rets, n_starts, dca_days, target, ext_stop, {})
+    )
+
+
+# ===============================
+# 라벨 변형 그리드 → (configs, samples) 텐서
+# ===============================
+def build_label_configs(dca_days_list, targets, ext_stops):
+    configs = []
+    for dca_days in dca_days_list:
+        for target in targets:
+            for ext_stop in ext_stops:
+                configs.append((dca_days, target, ext_stop))
+    return configs
+
+
+def label_grid(prices, configs, exact=False):
+    # 반환: {라벨 컬럼: (C, N) float 배열}, 시작일 i 의 남은 기간이 dca_days 미만이면 NaN
+    # 1차 구간 수익률 행렬은 가장 긴 dca_days 로 한 번만 만들고 모든 설정이 잘라 쓴다
+    # exact=False: 확장 구간 수익률은 누적합 근사값 (Success / Holding_Period 는 동일)
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    N = len(prices)
+    C = len(configs)
+
+    out = {col: np.full((C, N), np.nan) for col in LABEL_COLS}
+    if N == 0 or C == 0:
+        return out
+
+    max_days = max(int(c[0]) for c in configs)
+    padded = np.concatenate([prices, np.full(max_days - 1, np.nan)])
+    rets = dca_returns(padded, N, max_days)
+    csum = np.concatenate([[0.0], np.cumsum(prices)])
+    cache = {}
+
+    for c, (dca_days, target, ext_stop) in enumerate(configs):
+        n_starts = N - int(dca_days) + 1
+        if n_starts <= 0:
+            continue
+        labels = _label_arrays(
+            prices, csum, rets, n_starts, int(dca_days), target, ext_stop, cache, exact
+        )
+        for col in LABEL_COLS:
+            out[col][c, :n_starts] = labels[col]
+    return out
@@ -1,8 +1,10 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import joblib
 
+from bar_store import load_universe, period_start
+from features import MODEL_FEATURES, check_feature_meta, advance_stream, load_feature_streams, save_feature_streams
+
 # ===============================
 # 설정
 # ===============================
@@ -17,16 +19,10 @@ TICKERS = [
 MODEL_PATH = "app/model.pkl"
 SCALER_PATH = "app/scaler.pkl"
 
-FEATURES = [
-    "Drawdown_252",
-    "Drawdown_60",
-    "ATR_ratio",
-    "Z_score",
-    "MACD_hist",
-    "MA20_slope",
-    "Market_Drawdown",
-    "Market_ATR_ratio"
-]
+FEATURES = MODEL_FEATURES
+
+# 종목별 스트리밍 피처 상태 (다음 실행은 새 봉만 반영)
+STATE_PATH = "data/live_feature_state.json"
 
 SUCCESS_RETURN = 0.10
 FAIL_MEAN = -0.0179   # 테스트에서 계산한 실패 평균
@@ -37,75 +33,53 @@ FAIL_MEAN = -0.0179   # 테스트에서 계산한 실패 평균
 model = joblib.load(MODEL_PATH)
 scaler = joblib.load(SCALER_PATH)
 
+# ===============================
+# 시세 (전체 종목 + SPY 를 한 번에 동시 갱신)
+# ===============================
+bars, _ = load_universe(TICKERS + ["SPY"], period_start(2))
+
+# ===============================
+# 피처 (features.py, 학습과 같은 정의) → 종목별 마지막 날
+# ===============================
+# 저장된 상태에 마지막 봉 이후만 O(1) 갱신 (상태가 없거나 과거 봉이 바뀌면 전체 이력으로 새로)
+check_feature_meta(MODEL_PATH)
+streams = load_feature_streams(STATE_PATH)
+for t in TICKERS + ["SPY"]:
+    if len(bars[t]):
+        streams[t] = advance_stream(streams.get(t), bars[t].dropna(), market=(t == "SPY"))
+save_feature_streams(STATE_PATH, streams)
+
+market = streams.get("SPY")
+
 results = []
 
 for ticker in TICKERS:
-    try:
-        df = yf.download(ticker, period="2y", interval="1d", progress=False)
-
-        if len(df) < 260:
-            continue
-
-        close = df["Close"]
-
-        # ===============================
-        # Feature 계산
-        # ===============================
-        drawdown_252 = close.iloc[-1] / close.rolling(252).max().iloc[-1] - 1
-        drawdown_60 = close.iloc[-1] / close.rolling(60).max().iloc[-1] - 1
-
-        atr = (df["High"] - df["Low"]).rolling(14).mean().iloc[-1]
-        atr_ratio = atr / close.iloc[-1]
-
-        z_score = (
-            close.iloc[-1]
-            - close.rolling(20).mean().iloc[-1]
-        ) / close.rolling(20).std().iloc[-1]
-
-        ema12 = close.ewm(span=12).mean()
-        ema26 = close.ewm(span=26).mean()
-        macd_hist = (ema12 - ema26).iloc[-1]
-
-        ma20_slope = (
-            close.rolling(20).mean().iloc[-1]
-            - close.rolling(20).mean().iloc[-5]
-        )
-
-        # 시장 기준은 SPY로 가정
-        spy = yf.download("SPY", period="2y", interval="1d", progress=False)
-        spy_close = spy["Close"]
-
-        market_dd = spy_close.iloc[-1] / spy_close.rolling(252).max().iloc[-1] - 1
-        market_atr = (spy["High"] - spy["Low"]).rolling(14).mean().iloc[-1]
-        market_atr_ratio = market_atr / spy_close.iloc[-1]
-
-        feature_row = pd.DataFrame([[
-            drawdown_252,
-            drawdown_60,
-            atr_ratio,
-            z_score,
-            macd_hist,
-            ma20_slope,
-            market_dd,
-            market_atr_ratio
-        ]], columns=FEATURES)
-
-        # ===============================
-        # 예측
-        # ===============================
-        X_scaled = scaler.transform(feature_row)
-        prob = model.predict_proba(X_scaled)[0, 1]
-
-        ev = prob * SUCCESS_RETURN + (1 - prob) * FAIL_MEAN
-
-        results.append({
-            "Ticker": ticker,
-            "Prob": round(prob, 4),
-            "EV": round(ev, 4)
-        })
-
-    except Exception as e:
-        print(f"{ticker} error:", e)
+    if len(bars[ticker]) < 260 or ticker not in streams or market is None:
+        continue
+
+    # 학습 데이터와 같이 시장과 같은 날짜 기준
+    if streams[ticker].last_date != market.last_date:
+        print(f"{ticker} error: 마지막 봉 날짜 불일치", streams[ticker].last_date.date(), market.last_date.date())
+        continue
+
+    feature_row = pd.DataFrame([{**streams[ticker].values, **market.values}])[FEATURES]
+    if feature_row.isna().any(axis=None):
+        print(f"{ticker} error: 피처 결측", list(feature_row.columns[feature_row.isna().iloc[0]]))
+        continue
+
+    # ===============================
+    # 예측
+    # ===============================
+    X_scaled = scaler.transform(feature_row)
+    prob = model.predict_proba(X_scaled)[0, 1]
+
+    ev = prob * SUCCESS_RETURN + (1 - prob) * FAIL_MEAN
+
+    results.append({
+        "Ticker": ticker,
+        "Prob": round(prob, 4),
+        "EV": round(ev, 4)
+    })
 
 # ===============================
 # 결과 출력
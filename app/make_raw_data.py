@@ -1,9 +1,30 @@
+import argparse
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import os
 from datetime import datetime
 
+from bar_store import load_universe
+from features import FEATURE_COLS, write_feature_meta
+from feature_store import FeatureStore
+from labeler import (
+    LABEL_COLS,
+    LABEL_DCA_DAYS,
+    LABEL_TARGETS,
+    LABEL_EXT_STOPS,
+    label_series,
+    label_grid,
+    build_label_configs,
+)
+
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--label-grid",
+    action="store_true",
+    help="라벨 변형 그리드 (DCA 일수 × 목표 × 확장 청산) 를 (configs, samples) 텐서로 함께 저장",
+)
+args = parser.parse_args()
+
 # ===============================
 # 기본 설정
 # ===============================
@@ -18,134 +39,47 @@ MARKET_TICKER = "SPY"
 START_DATE = "2015-01-01"
 END = datetime.today().strftime("%Y-%m-%d")
 
+LABEL_VARIANT_PATH = "data/label_variants.npz"
+
 os.makedirs("data", exist_ok=True)
 
 # ===============================
-# 보조지표
+# Market 데이터
 # ===============================
-def zscore(series, window=60):
-    mean = series.rolling(window).mean()
-    std = series.rolling(window).std()
-    return (series - mean) / std
-
-def atr(df, period=14):
-    high_low = df["High"] - df["Low"]
-    high_close = np.abs(df["High"] - df["Close"].shift())
-    low_close = np.abs(df["Low"] - df["Close"].shift())
-    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    return tr.rolling(period).mean()
+# 전체 종목 + 시장 기준을 한 번에 동시 갱신
+bars, _ = load_universe([MARKET_TICKER] + TICKERS, START_DATE, END)
 
-# ===============================
-# 🔥 전략 시뮬레이션 (용어 변경 반영)
-# ===============================
-def simulate_strategy(prices):
-
-    invested = []
-    mdd = 0
-
-    # -------------------------
-    # 1차 40일 분할매수
-    # -------------------------
-    success = 0   # 🔥 수정: Success 단일 정의
-    exit_day = 39
-
-    for d in range(min(40, len(prices))):
-        invested.append(prices[d])
-        avg_price = np.mean(invested)
-        ret = prices[d] / avg_price - 1
-        mdd = min(mdd, ret)
-
-        if ret >= 0.10:
-            success = 1   # 🔥 수정
-            exit_day = d
-            break
-
-    if len(prices) < 40:
-        return None
-
-    # =========================
-    # 🔥 수정: 실패1 (40일차 정리)
-    # =========================
-    avg_40 = np.mean(prices[:40])
-    ret_40 = prices[39] / avg_40 - 1
-    return_fail1 = ret_40   # 🔥 수정: Return_Fail1
-
-    # =========================
-    # 🔥 수정: 실패2 (확장형)
-    # =========================
-    if success == 1:
-        return_fail2 = 0.10  # 성공 시 동일하게 10%
-        holding = exit_day + 1
-    else:
-        if ret_40 >= -0.10:
-            return_fail2 = ret_40
-            holding = 40
-        else:
-            extended_exit = False
-
-            for d2 in range(40, len(prices)):
-                invested.append(prices[d2])
-                avg_ext = np.mean(invested)
-                ret_ext = prices[d2] / avg_ext - 1
-                mdd = min(mdd, ret_ext)
-
-                if ret_ext >= -0.10:
-                    return_fail2 = ret_ext
-                    holding = d2 + 1
-                    extended_exit = True
-                    break
-
-            if not extended_exit:
-                avg_ext = np.mean(invested)
-                return_fail2 = prices[-1] / avg_ext - 1
-                holding = len(prices)
-
-    return {
-        "Success": success,                 # 🔥 수정
-        "Return_Fail1": return_fail1,       # 🔥 수정
-        "Return_Fail2": return_fail2,       # 🔥 수정
-        "Holding_Period": holding,
-        "Max_Drawdown": mdd
-    }
+bars = {t: b.dropna() for t, b in bars.items()}
+market_df = bars[MARKET_TICKER]
 
 # ===============================
-# Market 데이터
+# 피처 (features.py 정의, 피처 저장소 → 바뀐 종목 / 컬럼만 계산)
 # ===============================
-market_df = yf.download(MARKET_TICKER, start=START_DATE, end=END)
-market_df.columns = market_df.columns.get_level_values(0)
-market_df = market_df.dropna()
-
-market_drawdown = market_df["Close"] / market_df["Close"].rolling(252).max() - 1
-market_atr_ratio = atr(market_df) / market_df["Close"]
-market_ma200 = market_df["Close"].rolling(200).mean()
+store = FeatureStore()
+features = store.load_features(bars, TICKERS, MARKET_TICKER).set_index(["Ticker", "Date"])
+store.report()
 
 # ===============================
 # 데이터 생성
 # ===============================
 rows = []
 
+label_configs = build_label_configs(LABEL_DCA_DAYS, LABEL_TARGETS, LABEL_EXT_STOPS)
+variant_parts = {col: [] for col in LABEL_COLS}
+
 for ticker in TICKERS:
 
-    df = yf.download(ticker, start=START_DATE, end=END)
-    df.columns = df.columns.get_level_values(0)
-    df = df.dropna()
+    df = bars[ticker]
 
     if len(df) < 400:
         continue
 
     close = df["Close"]
+    feats = features.loc[ticker].reindex(df.index)[FEATURE_COLS].to_dict("records")
 
-    drawdown_60 = close / close.rolling(60).max() - 1
-    drawdown_252 = close / close.rolling(252).max() - 1
-    z_score = zscore(close, 60)
-    atr_ratio = atr(df) / close
-
-    ema12 = close.ewm(span=12).mean()
-    ema26 = close.ewm(span=26).mean()
-    macd_hist = ema12 - ema26
-
-    ma20 = close.rolling(20).mean()
-    ma20_slope = ma20.diff(5)
+    # 모든 시작일 라벨을 한 번에 (남은 기간 40일 미만은 없음)
+    labels = label_series(close.values).to_dict("records")
+    kept = []
 
     for i in range(252, len(df) - 1):
 
@@ -153,13 +87,11 @@ for ticker in TICKERS:
         if date not in market_df.index:
             continue
 
-        prices = close.iloc[i:].values
-        sim = simulate_strategy(prices)
-
-        if sim is None:
+        if i >= len(labels):
             continue
+        sim = labels[i]
 
-        m_idx = market_df.index.get_loc(date)
+        kept.append(i)
 
         rows.append({
             "Date": date,
@@ -167,23 +99,35 @@ for ticker in TICKERS:
             **sim,
 
             # 학습용 피처
-            "Drawdown_60": drawdown_60.iloc[i],
-            "Drawdown_252": drawdown_252.iloc[i],
-            "Z_score": z_score.iloc[i],
-            "ATR_ratio": atr_ratio.iloc[i],
-            "MACD_hist": macd_hist.iloc[i],
-            "MA20_slope": ma20_slope.iloc[i],
-            "Market_Drawdown": market_drawdown.iloc[m_idx],
-            "Market_ATR_ratio": market_atr_ratio.iloc[m_idx],
-            "Market_above_MA200": int(
-                market_df["Close"].iloc[m_idx] > market_ma200.iloc[m_idx]
-            ),
+            **feats[i],
         })
 
+    # 변형 라벨: 같은 가격 배열 한 번으로 모든 설정 (rows 와 같은 순서로 열을 쌓는다)
+    if args.label_grid:
+        grid = label_grid(close.values, label_configs)
+        for col in LABEL_COLS:
+            variant_parts[col].append(grid[col][:, kept])
+
 raw_df = pd.DataFrame(rows)
 raw_df = raw_df.dropna()
 raw_df = raw_df.sort_values("Date")
 
 raw_df.to_csv("data/raw_data.csv", index=False)
+write_feature_meta("data/raw_data.csv", bars_range=(START_DATE, END))
 
 print("✅ raw_data.csv 생성 완료 (Success / Fail1 / Fail2 구조 적용)")
+
+# ===============================
+# 라벨 변형 텐서 (raw_data.csv 행 순서와 동일)
+# ===============================
+if args.label_grid:
+    sample_idx = raw_df.index.to_numpy()
+    np.savez(
+        LABEL_VARIANT_PATH,
+        configs=np.array(label_configs, dtype=np.float64),
+        config_cols=np.array(["DCA_Days", "Target", "Ext_Stop"]),
+        Date=raw_df["Date"].to_numpy(dtype="datetime64[ns]"),
+        Ticker=raw_df["Ticker"].to_numpy(dtype=str),
+        **{col: np.concatenate(variant_parts[col], axis=1)[:, sample_idx] for col in LABEL_COLS},
+    )
+    print(f"✅ 라벨 변형 텐서 저장: {LABEL_VARIANT_PATH} ({len(label_configs)} configs × {len(raw_df)} samples)")
@@ -1,4 +1,3 @@
-import pandas as pd
 import numpy as np
 import joblib
 
@@ -8,6 +7,9 @@ from sklearn.calibration import CalibratedClassifierCV
 from sklearn.metrics import roc_auc_score
 from sklearn.model_selection import TimeSeriesSplit
 
+from features import MODEL_FEATURES, check_feature_meta, write_feature_meta
+from feature_store import load_training_frame
+
 # ===============================
 # 설정
 # ===============================
@@ -15,21 +17,14 @@ DATA_PATH = "data/raw_data.csv"
 MODEL_PATH = "app/model.pkl"
 SCALER_PATH = "app/scaler.pkl"
 
-FEATURES = [
-    "Drawdown_252",
-    "Drawdown_60",
-    "ATR_ratio",
-    "Z_score",
-    "MACD_hist",
-    "MA20_slope",
-    "Market_Drawdown",
-    "Market_ATR_ratio"
-]
+FEATURES = MODEL_FEATURES
 
 # ===============================
 # 데이터 로드
 # ===============================
-df = pd.read_csv(DATA_PATH)
+# raw_data.csv 에 없는 모델 피처는 피처 저장소에서 붙인다 (raw_data 재생성 불필요)
+check_feature_meta(DATA_PATH)
+df = load_training_frame(DATA_PATH, FEATURES)
 
 # 🔥 날짜 기준 정렬 (시계열 누수 방지)
 df = df.sort_values("Date")
@@ -94,5 +89,6 @@ print("=" * 60)
 # ===============================
 joblib.dump(model, MODEL_PATH)
 joblib.dump(scaler, SCALER_PATH)
+write_feature_meta(MODEL_PATH)
 
 print("✅ model.pkl / scaler.pkl 생성 완료")
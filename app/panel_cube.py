@@ -0,0 +1,95 @@
+import os
+import json
+import hashlib
+import pandas as pd
+import numpy as np
+
+# ============================================================
+# Panel Cube: long-format 패널 → dense (T, N) 배열 캐시
+# ============================================================
+# backtest_panel.csv 를 한 번만 파싱해서
+#   dates.npy / tickers.npy / Open·High·Low·Close·EV.npy / present.npy
+# 로 저장하고, 이후에는 np.load(mmap_mode="r") 로 바로 연다.
+# 엔진은 (t, ticker_id) 정수 인덱스로 접근한다.
+
+PANEL_PATH = "data/backtest_panel.csv"
+CUBE_DIR = "data/panel_cube"
+
+CUBE_FIELDS = ["Open", "High", "Low", "Close", "EV"]
+
+
+def source_fingerprint(csv_path):
+    st = os.stat(csv_path)
+    return {"path": os.path.abspath(csv_path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def compile_panel(df):
+    dates = np.sort(df["Date"].unique()).astype("datetime64[ns]")
+    tickers = np.sort(df["Ticker"].unique()).astype(str)
+
+    t_idx = np.searchsorted(dates, df["Date"].values.astype("datetime64[ns]"))
+    n_idx = np.searchsorted(tickers, df["Ticker"].values.astype(str))
+
+    cube = {"dates": dates, "tickers": tickers}
+    for col in CUBE_FIELDS:
+        arr = np.full((len(dates), len(tickers)), np.nan)
+        arr[t_idx, n_idx] = df[col].values
+        cube[col] = arr
+
+    present = np.zeros((len(dates), len(tickers)), dtype=bool)
+    present[t_idx, n_idx] = True
+    cube["present"] = present
+    return cube
+
+
+def save_cube(cube, cube_dir, fingerprint=None):
+    os.makedirs(cube_dir, exist_ok=True)
+    for key, arr in cube.items():
+        np.save(os.path.join(cube_dir, f"{key}.npy"), arr)
+
+    # meta.json 은 마지막에 기록 → 중간에 끊긴 캐시는 무효 처리됨
+    with open(os.path.join(cube_dir, "meta.json"), "w") as f:
+        json.dump({"source": fingerprint, "shape": list(cube["present"].shape)}, f)
+
+
+def open_cube(cube_dir):
+    cube = {}
+    for key in ["dates", "tickers", "present"] + CUBE_FIELDS:
+        cube[key] = np.load(os.path.join(cube_dir, f"{key}.npy"), mmap_mode="r")
+    return cube
+
+
+def cube_is_fresh(cube_dir, csv_path):
+    meta_path = os.path.join(cube_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path) as f:
+        meta = json.load(f)
+    return meta.get("source") == source_fingerprint(csv_path)
+
+
+def load_panel_cube(csv_path=PANEL_PATH, cube_dir=CUBE_DIR, rebuild=False):
+    if rebuild or not cube_is_fresh(cube_dir, csv_path):
+        df = pd.read_csv(csv_path, parse_dates=["Date"])
+        save_cube(compile_panel(df), cube_dir, source_fingerprint(csv_path))
+        print(f"✅ Panel cube 컴파일 완료 → {cube_dir}")
+
+    return open_cube(cube_dir)
+
+
+def cube_ev_values(cube, t_start=0, t_end=None):
+    # long-format df["EV"] 와 동일한 표본 (행 순서만 다름)
+    # t_start / t_end 로 날짜 구간을 자르면 그 구간 EV 만 (walk-forward 학습 구간 분위수용)
+    rows = slice(t_start, t_end)
+    return pd.Series(np.asarray(cube["EV"][rows])[np.asarray(cube["present"][rows])])
+
+
+
+def cube_prefix_hash(cube, n):
+    # 앞 n일(0..n-1) 구간의 패널 내용 해시 → 과거 데이터 변경 감지용
+    h = hashlib.sha1()
+    h.update(np.asarray(cube["tickers"]).astype(str).tobytes())
+    h.update(np.ascontiguousarray(cube["dates"][:n]).tobytes())
+    for key in ["present"] + CUBE_FIELDS:
+        h.update(np.ascontiguousarray(cube[key][:n]).tobytes())
+    return h.hexdigest()
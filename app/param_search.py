@@ -0,0 +1,217 @@
+import argparse
+import pandas as pd
+import numpy as np
+
+from panel_cube import load_panel_cube, cube_ev_values
+from backtest_engine import (
+    build_param_grid,
+    run_vector_engine,
+    mark_to_market,
+    equity_value,
+    build_results,
+    slice_state,
+)
+from run_parametric_backtest import (
+    INPUT_PATH,
+    INITIAL_SEED,
+    profit_targets,
+    ev_quantiles,
+    holding_days_list,
+    stop_levels,
+    scenario,
+)
+
+# ============================================================
+# Successive halving + coarse-to-fine 파라미터 탐색
+# ============================================================
+# 1) 전체 그리드를 앞 구간(RUNGS)만 돌려 평가금액 하위를 잘라내고,
+#    살아남은 파라미터는 저장된 상태에서 이어서 다음 구간을 진행 (재계산 없음)
+# 2) 끝까지 살아남은 상위 파라미터 주변을 profit_target / stop_level / max_days
+#    연속 구간에서 절반 간격으로 좁혀가며 추가 평가
+# 비용 단위는 "파라미터 × 일" (전체 그리드 = P × T)
+#
+# ⚠️ 중간 단계 평가금액으로 잘라내므로 전체 기간 최적 파라미터가 앞 구간에서 부진하면
+#    탈락할 수 있다 (근사 탐색, 그리드 최적 재현은 보장되지 않음).
+#    --verify: 전체 그리드도 돌려 halving 최적과 비교, 다르면 전체 그리드 결과로 대체한 뒤
+#    refine 을 진행 → 그리드 최적 재현 보장 (비용은 전체 그리드 1회 추가).
+
+OUTPUT_PATH = "data/param_search_results.csv"
+
+RUNGS = [0.25, 0.5, 1.0]     # 각 단계가 끝나는 시점 (전체 기간 대비)
+KEEP_RATIO = 1 / 3           # 단계마다 남길 비율
+MIN_KEEP = 32
+
+REFINE_TOP = 5
+REFINE_ROUNDS = 2
+REFINE_STEPS = {"profit_target": 0.025, "stop_level": 0.025, "max_days": 2}
+BOUNDS = {"profit_target": (0.01, 0.50), "stop_level": (-0.99, 0.0), "max_days": (5, 120)}
+
+
+def successive_halving(cube, param_grid, rungs=RUNGS, keep_ratio=KEEP_RATIO, min_keep=MIN_KEEP):
+    # 반환: (생존 index, 상태, 비용, 파라미터별 탈락 단계 날짜 — 생존은 None)
+    T = len(cube["dates"])
+    alive = np.arange(len(param_grid))
+    pruned_at = [None] * len(param_grid)
+    state, t, cost = None, 0, 0
+
+    for frac in rungs:
+        t_next = T if frac >= 1 else max(int(T * frac), t + 1)
+        grid = [param_grid[i] for i in alive]
+        state = run_vector_engine(cube, grid, INITIAL_SEED, state, t, t_end=t_next)
+        cost += len(alive) * (t_next - t)
+        t = t_next
+
+        if t >= T:
+            break
+
+        # 평가금액 기준 상위만 유지 (경계 동률은 모두 남긴다)
+        n_keep = max(int(np.ceil(len(alive) * keep_ratio)), min_keep)
+        if n_keep < len(alive):
+            score = equity_value(state)
+            cut = np.sort(score)[::-1][n_keep - 1]
+            keep = np.flatnonzero(score >= cut)
+            rung_date = str(cube["dates"][t - 1])[:10]
+            for i in np.delete(alive, keep):
+                pruned_at[i] = rung_date
+            alive = alive[keep]
+            state = slice_state(state, keep)
+            print(f"  rung {rung_date}: {len(alive)}개 생존")
+
+    return alive, state, cost, pruned_at
+
+
+def evaluate_full(cube, param_grid):
+    state = run_vector_engine(cube, param_grid, INITIAL_SEED)
+    results = build_results(param_grid, state, mark_to_market(cube, state), scenario, INITIAL_SEED)
+    return results, len(param_grid) * len(cube["dates"])
+
+
+def refine_candidates(top_rows, scale, seen):
+    candidates = []
+    for q, ev_cut, profit_target, max_days, stop_level in top_rows:
+        for d_pt in (-1, 0, 1):
+            for d_md in (-1, 0, 1):
+                for d_sl in (-1, 0, 1):
+                    pt = np.clip(profit_target + d_pt * REFINE_STEPS["profit_target"] * scale, *BOUNDS["profit_target"])
+                    md = np.clip(max_days + d_md * max(int(REFINE_STEPS["max_days"] * scale), 1), *BOUNDS["max_days"])
+                    sl = np.clip(stop_level + d_sl * REFINE_STEPS["stop_level"] * scale, *BOUNDS["stop_level"])
+
+                    param = (q, ev_cut, round(float(pt), 4), int(md), round(float(sl), 4))
+                    key = (param[0], param[2], param[3], param[4])
+                    if key not in seen:
+                        seen.add(key)
+                        candidates.append(param)
+    return candidates
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="전체 그리드도 돌려서 halving 최적과 비교, 다르면 전체 그리드 결과로 대체 (그리드 최적 재현 보장)",
+    )
+    args = parser.parse_args()
+
+    cube = load_panel_cube(INPUT_PATH)
+    T = len(cube["dates"])
+    param_grid = build_param_grid(
+        cube_ev_values(cube), ev_quantiles, holding_days_list, stop_levels, profit_targets
+    )
+    full_cost = len(param_grid) * T
+
+    # ============================================================
+    # 1️⃣ Successive halving (그리드)
+    # ============================================================
+    print(f"🔎 Successive halving: {len(param_grid)}개 × {T}일")
+    if not args.verify:
+        print("⚠️ 근사 탐색: 단계마다 중간 평가금액으로 잘라내므로 그리드 최적 재현은 보장되지 않음 "
+              "(--verify 면 전체 그리드와 비교 후 다르면 대체)")
+    alive, state, cost, pruned_at = successive_halving(cube, param_grid)
+
+    survivors = [param_grid[i] for i in alive]
+    results = build_results(survivors, state, mark_to_market(cube, state), scenario, INITIAL_SEED)
+    results["Stage"] = "grid"
+    grid_best = results.sort_values("Seed_Multiple", ascending=False).iloc[0]
+
+    # ============================================================
+    # 1️⃣-b 검증 (--verify): 전체 그리드 최적과 비교, 다르면 전체 그리드 결과로 대체
+    # ============================================================
+    verify_cost = 0
+    verify_msg = None
+    if args.verify:
+        full_results, verify_cost = evaluate_full(cube, param_grid)
+        full_best = full_results.sort_values("Seed_Multiple", ascending=False).iloc[0]
+        key = ["EV_quantile", "Profit_Target", "Max_Holding_Days", "Stop_Level"]
+
+        # 동률 최적이 여러 개면 그중 하나와 같으면 일치
+        winners = full_results[full_results["Seed_Multiple"] == full_best["Seed_Multiple"]]
+        if (winners[key] == grid_best[key]).all(axis=1).any():
+            verify_msg = "✅ Halving 최적 = 전체 그리드 최적 (같은 파라미터)"
+        else:
+            dropped = pruned_at[int(full_best.name)]
+            where = f"{dropped} 단계에서 탈락" if dropped else "생존했지만 순위 밀림"
+            verify_msg = (
+                f"⚠️ Halving 최적 ≠ 전체 그리드 최적: 전체 최적 파라미터 {where}, "
+                f"Seed_Multiple {grid_best['Seed_Multiple']} vs {full_best['Seed_Multiple']} "
+                f"→ 전체 그리드 결과로 대체"
+            )
+            results = full_results.assign(Stage="grid")
+            grid_best = full_best
+
+    # ============================================================
+    # 2️⃣ Coarse-to-fine (연속 구간)
+    # ============================================================
+    seen = {(p[0], p[2], p[3], p[4]) for p in param_grid}
+    all_results = [results]
+    refine_cost = 0
+
+    for r in range(REFINE_ROUNDS):
+        pool = pd.concat(all_results).sort_values("Seed_Multiple", ascending=False)
+        top_rows = pool.head(REFINE_TOP)[
+            ["EV_quantile", "EV_cut", "Profit_Target", "Max_Holding_Days", "Stop_Level"]
+        ].itertuples(index=False)
+
+        candidates = refine_candidates(top_rows, 0.5 ** r, seen)
+        if not candidates:
+            break
+
+        refined, c = evaluate_full(cube, candidates)
+        refined["Stage"] = f"refine_{r + 1}"
+        all_results.append(refined)
+        refine_cost += c
+        print(f"  refine {r + 1}: {len(candidates)}개 추가 평가")
+
+    search_df = pd.concat(all_results, ignore_index=True)
+    search_df = search_df.sort_values("Seed_Multiple", ascending=False)
+    search_df.to_csv(OUTPUT_PATH, index=False)
+
+    # ============================================================
+    # 결과
+    # ============================================================
+    total_cost = cost + verify_cost + refine_cost
+    print("=" * 60)
+    print(f"전체 그리드 비용 : {full_cost:,} (파라미터×일)")
+    print(f"Halving 비용     : {cost:,}")
+    if args.verify:
+        print(f"Verify 비용      : {verify_cost:,}")
+    print(f"Refine 비용      : {refine_cost:,}")
+    print(f"절감             : {full_cost - total_cost:,} ({1 - total_cost / full_cost:.1%})")
+    print("-" * 60)
+    print("그리드 최적:")
+    print(grid_best[["EV_quantile", "Profit_Target", "Max_Holding_Days", "Stop_Level", "Seed_Multiple"]])
+    print("탐색 최적:")
+    print(search_df.iloc[0][["EV_quantile", "Profit_Target", "Max_Holding_Days", "Stop_Level", "Seed_Multiple", "Stage"]])
+
+    if verify_msg:
+        print("-" * 60)
+        print(verify_msg)
+    else:
+        print("⚠️ 그리드 최적은 halving 근사 결과 (--verify 로 전체 그리드 확인)")
+
+    print("=" * 60)
+    print(f"✅ 저장 완료 → {OUTPUT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import numpy as np
+
+from config import INITIAL_CAPITAL, DCA_DAYS, TARGET, STOP_LOSS
+
+# ============================================================
+# backtest_real_market 배열 엔진 (모든 threshold × 모드 한 번에)
+# ============================================================
+# 원래 run_backtest 는 df.iloc 로 한 행씩 걸으면서 매 거래마다 평균단가를 다시 쌓았다.
+#
+# - 신호 점프 테이블: next_signal[i] = i 이상에서 Probability ≥ threshold 인 첫 행
+#   → 신호 없는 구간은 한 번에 건너뛴다
+# - 1차 분할매수 구간: 1/가격 누적합으로 모든 시작일의 DCA_DAYS 일 수익률을 한 번에 근사,
+#   목표 도달일을 찾는다 (시작일별, threshold / 모드 / 자본과 무관 → 모든 조합이 공유)
+# - 확장 매수 구간 (모드 B): 같은 근사로 BLOCK 일씩 탐색, 시작일별로 memo
+# - 근사 오차(EPS) 안에서 판정이 갈리면 그 거래만 원래 방식 그대로 (순차 누적합) 다시 계산
+# - 수익률 값이 자본에 곱해지는 경우(40일 종료 정리)는 원래와 같은 순차 누적합으로 계산
+#   → 결과가 원래 run_backtest 와 동일
+
+MODES = ["A", "B"]
+
+EPS = 1e-9
+BLOCK = 256
+
+
+def exact_returns(close, start, length, capital, dca_days=DCA_DAYS):
+    # 원래 루프와 같은 순서의 누적합 (np.cumsum 은 순차 합) → 같은 비트의 ret 배열
+    invest = capital / dca_days
+    prices = close[start : start + length]
+    total_invest = np.cumsum(np.full(len(prices), invest))
+    total_shares = np.cumsum(invest / prices)
+    return prices / (total_invest / total_shares) - 1
+
+
+def _approx_returns(close, inv_csum, start, js):
+    # prices[j] / (j + 1 일 평균단가) - 1, 평균단가 = (j + 1) / Σ(1 / price) (매일 같은 금액 매수)
+    return close[start + js] * (inv_csum[start + js + 1] - inv_csum[start]) / (js + 1) - 1
+
+
+def build_trade_table(close, dca_days=DCA_DAYS, target=TARGET):
+    # 모든 시작일 i (< n - dca_days) 의 1차 구간 결과 (근사 판정)
+    #   dca_exit[i] : 목표 도달 offset (없으면 -1), dca_ambiguous[i] : EPS 안에서 갈림
+    close = np.asarray(close, dtype=np.float64)
+    n_starts = max(len(close) - dca_days, 0)
+    inv_csum = np.concatenate([[0.0], np.cumsum(1 / close)])
+
+    js = np.arange(dca_days)
+    starts = np.arange(n_starts)[:, None]
+    approx = _approx_returns(close, inv_csum, starts, js)
+
+    loose = approx >= target - EPS
+    tight = approx >= target + EPS
+    found = loose.any(axis=1)
+    first = loose.argmax(axis=1)
+    rows = np.arange(n_starts)
+
+    return {
+        "close": close,
+        "inv_csum": inv_csum,
+        "dca_days": dca_days,
+        "target": target,
+        "dca_exit": np.where(found, first, -1),
+        "dca_ambiguous": found & ~tight[rows, first],
+        "extension": {},
+    }
+
+
+def next_signal_table(prob, threshold):
+    # next_signal[i] = i 이상에서 prob ≥ threshold 인 첫 위치 (없으면 n)
+    n = len(prob)
+    idx = np.where(np.asarray(prob) >= threshold, np.arange(n), n)
+    return np.append(np.minimum.accumulate(idx[::-1])[::-1], n)
+
+
+def _extension_exit(table, start, stop_loss):
+    # 모드 B 확장 매수: ret ≥ stop_loss 가 되는 첫 offset (≥ dca_days), 없으면 None
+    key = (start, stop_loss)
+    if key in table["extension"]:
+        return table["extension"][key]
+
+    close, inv_csum, n = table["close"], table["inv_csum"], len(table["close"])
+    result = (None, False)
+    j0 = table["dca_days"]
+    while start + j0 < n:
+        js = np.arange(j0, min(j0 + BLOCK, n - start))
+        approx = _approx_returns(close, inv_csum, start, js)
+        loose = approx >= stop_loss - EPS
+        if loose.any():
+            k = loose.argmax()
+            result = (int(js[k]), not approx[k] >= stop_loss + EPS)
+            break
+        j0 += BLOCK
+
+    table["extension"][key] = result
+    return result
+
+
+def simulate(table, next_signal, mode="A", stop_loss=STOP_LOSS, initial_capital=INITIAL_CAPITAL):
+    close = table["close"]
+    dca_days, target = table["dca_days"], table["target"]
+    n = len(close)
+
+    capital = initial_capital
+    trades = 0
+    wins = 0
+    holding_days = []
+
+    i = next_signal[0]
+    while i < n - dca_days:
+        trades += 1
+
+        # -----------------------
+        # 1차 분할매수
+        # -----------------------
+        exit_j = table["dca_exit"][i]
+        if table["dca_ambiguous"][i]:
+            hit = np.flatnonzero(exact_returns(close, i, dca_days, capital, dca_days) >= target)
+            exit_j = hit[0] if hit.size else -1
+
+        if exit_j >= 0:
+            capital *= (1 + target)
+            wins += 1
+            holding_days.append(int(exit_j) + 1)
+            i = next_signal[i + exit_j + 1]
+            continue
+
+        # -----------------------
+        # 40일 종료 시점
+        # -----------------------
+        ret = exact_returns(close, i, dca_days, capital, dca_days)[-1]
+
+        if mode == "A" or ret >= stop_loss:
+            capital *= (1 + ret)
+            holding_days.append(dca_days)
+            i = next_signal[i + dca_days]
+            continue
+
+        # -----------------------
+        # 모드 B: 손실 회복(ret ≥ stop_loss)까지 무한 추가매수
+        # -----------------------
+        j, ambiguous = _extension_exit(table, i, stop_loss)
+        if ambiguous:
+            rets = exact_returns(close, i, n - i, capital, dca_days)
+            hit = np.flatnonzero(rets[dca_days:] >= stop_loss)
+            j = int(hit[0]) + dca_days if hit.size else None
+
+        if j is None:
+            break
+
+        capital *= (1 + stop_loss)
+        holding_days.append(j + 1)
+        i = next_signal[min(i + j + 1, n)]
+
+    return {
+        "Mode": mode,
+        "Trades": trades,
+        "WinRate": round(wins / trades, 4) if trades else 0,
+        "FinalCapital": int(capital),
+        "TotalMultiple": round(capital / initial_capital, 2),
+        "AvgHoldingDays": round(np.mean(holding_days), 2) if holding_days else 0,
+        "MaxHoldingDays": max(holding_days) if holding_days else 0,
+    }
+
+
+def run_sweep(close, prob, thresholds, modes=MODES, stop_loss=STOP_LOSS, initial_capital=INITIAL_CAPITAL):
+    # 반환: {(threshold, mode): 결과} — 1차 구간 테이블 / 확장 구간 memo 를 모든 조합이 공유
+    table = build_trade_table(close)
+    results = {}
+    for th in thresholds:
+        next_signal = next_signal_table(prob, th)
+        for mode in modes:
+            res = simulate(table, next_signal, mode, stop_loss, initial_capital)
+            results[(th, mode)] = {"Threshold": th, **res}
+    return results
+
+
+# ============================================================
+# 연속 threshold 곡선 (수백 개 threshold)
+# ============================================================
+# 거래 1건의 결과(청산 위치 / 자본 배수 / 승패 / 보유일)는 시작일과 모드로만 정해진다.
+# → 시작일별로 한 번만 계산해 memo, threshold 마다 점프 테이블을 따라 거래 수만큼만 걷는다.
+# 신호 집합이 같은 threshold (두 Probability 값 사이) 는 경로가 같으므로 한 번만 계산.
+# 곡선용 거래 결과는 초기 자본 기준 평균단가로 계산한다
+# (simulate 와는 평균단가 부동소수점 반올림 수준의 차이만 있다).
+
+CURVE_COLUMNS = [
+    "Threshold", "Mode", "Signals", "Trades", "WinRate",
+    "FinalCapital", "TotalMultiple", "AvgHoldingDays", "MaxHoldingDays",
+]
+
+
+def _trade_outcome(table, start, mode, stop_loss, capital, memo):
+    # 반환: (다음 탐색 위치, 자본 배수, 승리 여부, 보유일) — 확장 매수가 끝나지 않으면 None
+    key = (start, mode)
+    if key in memo:
+        return memo[key]
+
+    close = table["close"]
+    dca_days, target = table["dca_days"], table["target"]
+    n = len(close)
+
+    exit_j = table["dca_exit"][start]
+    if table["dca_ambiguous"][start]:
+        hit = np.flatnonzero(exact_returns(close, start, dca_days, capital, dca_days) >= target)
+        exit_j = hit[0] if hit.size else -1
+
+    if exit_j >= 0:
+        out = (start + int(exit_j) + 1, 1 + target, True, int(exit_j) + 1)
+    else:
+        ret = exact_returns(close, start, dca_days, capital, dca_days)[-1]
+        if mode == "A" or ret >= stop_loss:
+            out = (start + dca_days, 1 + ret, False, dca_days)
+        else:
+            j, ambiguous = _extension_exit(table, start, stop_loss)
+            if ambiguous:
+                rets = exact_returns(close, start, n - start, capital, dca_days)
+                hit = np.flatnonzero(rets[dca_days:] >= stop_loss)
+                j = int(hit[0]) + dca_days if hit.size else None
+            out = None if j is None else (min(start + j + 1, n), 1 + stop_loss, False, j + 1)
+
+    memo[key] = out
+    return out
+
+
+def threshold_curve(
+    close, prob, thresholds, modes=MODES, stop_loss=STOP_LOSS, initial_capital=INITIAL_CAPITAL
+):
+    # 반환: CURVE_COLUMNS 리스트 (threshold 오름차순 × 모드)
+    table = build_trade_table(close)
+    prob = np.asarray(prob, dtype=np.float64)
+    n = len(close)
+    # NaN 확률은 신호가 아니다 (next_signal_table 의 prob ≥ threshold 와 같은 기준)
+    sorted_prob = np.sort(prob[~np.isnan(prob)])
+
+    memo = {}
+    paths = {}
+    rows = []
+    for th in sorted(thresholds):
+        # 신호 개수가 같으면 신호 집합도 같다 (threshold 가 클수록 부분집합)
+        signals = len(sorted_prob) - int(np.searchsorted(sorted_prob, th, side="left"))
+        next_signal = None
+
+        for mode in modes:
+            key = (signals, mode)
+            if key not in paths:
+                if next_signal is None:
+                    next_signal = next_signal_table(prob, th)
+
+                capital = initial_capital
+                trades = wins = 0
+                holding_days = []
+                i = next_signal[0]
+                while i < n - table["dca_days"]:
+                    trades += 1
+                    out = _trade_outcome(table, i, mode, stop_loss, initial_capital, memo)
+                    if out is None:
+                        break
+                    nxt, factor, win, hold = out
+                    capital *= factor
+                    wins += win
+                    holding_days.append(hold)
+                    i = next_signal[nxt]
+
+                paths[key] = {
+                    "Trades": trades,
+                    "WinRate": round(wins / trades, 4) if trades else 0,
+                    "FinalCapital": int(capital),
+                    "TotalMultiple": round(capital / initial_capital, 4),
+                    "AvgHoldingDays": round(np.mean(holding_days), 2) if holding_days else 0,
+                    "MaxHoldingDays": max(holding_days) if holding_days else 0,
+                }
+            rows.append({"Threshold": th, "Mode": mode, "Signals": signals, **paths[key]})
+    return rows
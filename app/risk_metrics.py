@@ -0,0 +1,86 @@
+import pandas as pd
+import numpy as np
+
+# ============================================================
+# (P, T) 평가금액 행렬 → 파라미터별 리스크 지표 (행렬 단위 일괄 계산)
+# ============================================================
+# CAGR / Sharpe / Sortino / Calmar / 최장 DD 기간 / Time under water /
+# Exposure / 롤링 수익률(min·median·max)
+# memmap 도 ROW_CHUNK 행씩 잘라서 처리하므로 메모리 사용량이 고정된다.
+
+TRADING_DAYS = 252
+ROLLING_WINDOW = 252
+ROW_CHUNK = 4096
+
+
+def _metrics_chunk(equity, initial_seed, years, rolling_window):
+    P, T = equity.shape
+    start = np.full((P, 1), float(initial_seed))
+    curve = np.concatenate([start, equity], axis=1)
+
+    # 일별 수익률
+    ret = curve[:, 1:] / curve[:, :-1] - 1
+    mean_ret = ret.mean(axis=1)
+    std_ret = ret.std(axis=1, ddof=1) if T > 1 else np.zeros(P)
+    downside = np.sqrt(np.mean(np.minimum(ret, 0) ** 2, axis=1))
+
+    # 드로다운 / 수면 아래 구간
+    peak = np.maximum.accumulate(curve, axis=1)
+    drawdown = curve / peak - 1
+    max_dd = drawdown.min(axis=1)
+
+    multiple = curve[:, -1] / curve[:, 0]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std_ret > 0, mean_ret / std_ret * np.sqrt(TRADING_DAYS), 0.0)
+        sortino = np.where(downside > 0, mean_ret / downside * np.sqrt(TRADING_DAYS), 0.0)
+
+        if years > 0:
+            cagr = np.where(multiple > 0, multiple ** (1 / years), 0.0) - 1
+        else:
+            cagr = multiple - 1
+        calmar = np.where(max_dd < 0, cagr / -max_dd, 0.0)
+
+    under = drawdown[:, 1:] < 0
+    idx = np.arange(T)
+    last_peak = np.maximum.accumulate(np.where(under, -1, idx), axis=1)
+    run_length = np.where(under, idx - last_peak, 0)
+
+    out = {
+        "CAGR": cagr,
+        "Sharpe": sharpe,
+        "Sortino": sortino,
+        "Calmar": calmar,
+        "Max_DD_Duration": run_length.max(axis=1),
+        "Time_Under_Water": under.mean(axis=1),
+    }
+
+    # 롤링 수익률 (window 일 전 대비)
+    key = f"Rolling_{rolling_window}"
+    if T > rolling_window:
+        rolling = equity[:, rolling_window:] / equity[:, :-rolling_window] - 1
+        out[f"{key}_Min"] = rolling.min(axis=1)
+        out[f"{key}_Median"] = np.median(rolling, axis=1)
+        out[f"{key}_Max"] = rolling.max(axis=1)
+    else:
+        for stat in ["Min", "Median", "Max"]:
+            out[f"{key}_{stat}"] = np.full(P, np.nan)
+    return out
+
+
+def compute_metrics(
+    equity, dates, initial_seed, exposure_days=None, rolling_window=ROLLING_WINDOW
+):
+    dates = pd.to_datetime(np.asarray(dates))
+    years = (dates[-1] - dates[0]).days / 365.25
+
+    parts = []
+    for lo in range(0, equity.shape[0], ROW_CHUNK):
+        chunk = np.asarray(equity[lo : lo + ROW_CHUNK], dtype=np.float64)
+        parts.append(pd.DataFrame(_metrics_chunk(chunk, initial_seed, years, rolling_window)))
+
+    metrics = pd.concat(parts, ignore_index=True)
+
+    if exposure_days is not None:
+        metrics["Exposure_Ratio"] = np.asarray(exposure_days) / len(dates)
+    return metrics
@@ -1,302 +1,167 @@
+import argparse
 import pandas as pd
 import numpy as np
 
+from panel_cube import load_panel_cube, cube_ev_values, CUBE_DIR
+from checkpoint import CHECKPOINT_PATH, save_checkpoint, load_checkpoint, frozen_ev_grid, run_hash
+from equity_store import EQUITY_DIR, create_equity_store, extend_equity_store
+from risk_metrics import compute_metrics
+from backtest_engine import (
+    build_param_grid,
+    new_trace,
+    trace_frames,
+    run_vector_engine,
+    run_vector_engine_parallel,
+    run_loop_engine,
+    mark_to_market,
+    build_results,
+)
+
 INPUT_PATH = "data/backtest_panel.csv"
 OUTPUT_PATH = "data/parametric_results_v2.csv"
+CYCLE_TRACE_PATH = "data/param_cycle_trace.csv"
+FILL_TRACE_PATH = "data/param_fill_trace.csv"
 INITIAL_SEED = 40_000_000
 
-df = pd.read_csv(INPUT_PATH, parse_dates=["Date"])
-df = df.sort_values(["Date", "Ticker"])
-
 profit_targets = [0.05, 0.10, 0.15, 0.20]
 ev_quantiles = [0.60, 0.64, 0.68, 0.72, 0.76, 0.80, 0.84, 0.90]
 holding_days_list = [30, 35, 40, 45, 50]
 stop_levels = [-0.05, -0.10, -0.15, -0.20, -0.25, -0.30, -0.99]
 scenario = 2
 
-# ============================================================
-# 🔥 Numpy Engine (물타기 모드 반영)
-# ============================================================
-
-param_grid = []
-for q in ev_quantiles:
-    ev_cut = df["EV"].quantile(q)
-    for max_days in holding_days_list:
-        for stop_level in stop_levels:
-            for profit_target in profit_targets:
-                param_grid.append((q, ev_cut, profit_target, max_days, stop_level))
-
-P = len(param_grid)
-
-seed = np.full(P, INITIAL_SEED, dtype=np.float64)
-in_position = np.zeros(P, dtype=bool)
-idle_days = np.zeros(P)
-total_trades = np.zeros(P)
-win_trades = np.zeros(P)
-total_shares = np.zeros(P)
-total_invested = np.zeros(P)
-holding_day = np.zeros(P)
-extending = np.zeros(P, dtype=bool)
-actual_max_holding_days = np.zeros(P)
-max_equity = np.full(P, INITIAL_SEED)
-max_dd = np.zeros(P)
-picked_ticker = np.array([None] * P, dtype=object)
-cycle_unit = np.zeros(P)
-cycle_start_seed = np.zeros(P)
-cycle_max_loss = np.zeros(P)
-
-# 🔥🔥🔥 추가: max_days 초과 카운트 & 총 홀딩일 합계
-exceeded_max_days_count = np.zeros(P)      # 🔥 추가
-exceeded_flag = np.zeros(P, dtype=bool)   # 🔥 추가
-total_holding_days_sum = np.zeros(P)      # 🔥 추가
-
-grouped = df.groupby("Date", sort=False)
-
-for date, day_data in grouped:
-    day_data = day_data.set_index("Ticker")
-    daily_buy_done = np.zeros(P, dtype=bool)
-
-    for i, (q, ev_cut, profit_target, max_days, stop_level) in enumerate(param_grid):
 
-        # =========================
-        # 진입 전
-        # =========================
-        if not in_position[i]:
-            candidates = day_data[day_data["EV"] >= ev_cut]
-
-            if len(candidates) > 0 and not daily_buy_done[i]:
-                pick = candidates.sort_values("EV", ascending=False).iloc[0]
-                ticker = pick.name
-                price = pick["Close"]
-
-                cycle_start_seed[i] = seed[i]
-                cycle_unit[i] = cycle_start_seed[i] / max_days
-
-                invest = cycle_unit[i]
-                shares = invest / price
-
-                total_shares[i] = shares
-                total_invested[i] = invest
-                seed[i] -= invest
-
-                holding_day[i] = 1
-                extending[i] = False
-                exceeded_flag[i] = False   # 🔥 추가 (새 사이클 초기화)
-
-                in_position[i] = True
-                picked_ticker[i] = ticker
-                daily_buy_done[i] = True
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--engine",
+        choices=["vector", "loop"],
+        default="vector",
+        help="vector: 날짜마다 전체 파라미터를 마스크 연산으로 전진 / loop: 기존 파라미터별 루프",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="vector 엔진 파라미터 그리드를 N개 프로세스로 샤딩",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="체크포인트 이후 새 날짜만 처리 (EV_cut / 과거 데이터 변경 시 자동 전체 재실행)",
+    )
+    parser.add_argument(
+        "--reuse-ev-cut",
+        action="store_true",
+        help="--resume 시 EV_cut 을 새로 계산하지 않고 체크포인트 값 사용 (--resume 포함). "
+        "새 날짜가 붙어도 증분 실행 가능, 과거 데이터가 바뀌면 현재 패널 EV_cut 으로 전체 재실행",
+    )
+    parser.add_argument(
+        "--trace-top",
+        type=int,
+        default=0,
+        help="Seed_Multiple 상위 K개 파라미터의 사이클 / 체결 로그 저장 (끝난 뒤 K개만 다시 실행, 메모리 O(K))",
+    )
+    parser.add_argument(
+        "--equity-store",
+        action="store_true",
+        help=f"파라미터별 일별 평가금액을 (P, T) float32 memmap 으로 저장 ({EQUITY_DIR})",
+    )
+    args = parser.parse_args()
+    args.resume = args.resume or args.reuse_ev_cut
+
+    # ============================================================
+    # 🔥 Numpy Engine (물타기 모드 반영)
+    # ============================================================
+
+    if args.engine == "vector":
+        cube = load_panel_cube(INPUT_PATH, CUBE_DIR)
+        param_grid = build_param_grid(
+            cube_ev_values(cube), ev_quantiles, holding_days_list, stop_levels, profit_targets
+        )
+
+        # 리스크 지표용 일별 평가금액: 워커 / resume 은 디스크 저장소, 그 외에는 메모리
+        equity = None
+        state, t_start = None, 0
+        if args.resume:
+            # 전체 재실행으로 돌아가면 EV_cut 은 현재 패널 분위수
+            fresh_grid = param_grid
+            if args.reuse_ev_cut:
+                param_grid = frozen_ev_grid(CHECKPOINT_PATH, param_grid) or param_grid
+            state, t_start = load_checkpoint(CHECKPOINT_PATH, cube, param_grid)
+            if state is not None:
+                equity = extend_equity_store(EQUITY_DIR, param_grid, cube["dates"], t_start)
+                if equity is None:
+                    print("⚠️ Equity store 불일치 → 전체 재실행")
+                    state, t_start = None, 0
+            if state is None:
+                param_grid = fresh_grid
+
+        if equity is None:
+            if args.equity_store or args.resume or args.workers > 1:
+                equity = create_equity_store(EQUITY_DIR, param_grid, cube["dates"])
             else:
-                idle_days[i] += 1
+                equity = np.zeros((len(param_grid), len(cube["dates"])), dtype=np.float32)
 
-        # =========================
-        # 보유 중
-        # =========================
-        else:
-            if picked_ticker[i] not in day_data.index:
-                continue
-
-            row = day_data.loc[picked_ticker[i]]
-
-            holding_day[i] += 1
-
-            actual_max_holding_days[i] = max(
-                actual_max_holding_days[i], holding_day[i]
+        if args.workers > 1:
+            state, final_value = run_vector_engine_parallel(
+                CUBE_DIR, param_grid, INITIAL_SEED, args.workers, state, t_start, None,
+                equity.filename,
             )
-
-            # 🔥🔥🔥 max_days 초과 카운트 (사이클당 1회)
-            if holding_day[i] > max_days and not exceeded_flag[i]:
-                exceeded_max_days_count[i] += 1
-                exceeded_flag[i] = True
-
-            avg_price = total_invested[i] / total_shares[i]
-
-            # =====================================================
-            # max_days 도달 시 분기
-            # =====================================================
-            if holding_day[i] >= max_days and not extending[i]:
-
-                current_return = (row["Close"] - avg_price) / avg_price
-
-                if current_return >= stop_level:
-                    sell_price = row["Close"]
-                    proceeds = total_shares[i] * sell_price
-                    cycle_return = (proceeds - total_invested[i]) / total_invested[i]
-
-                    cycle_max_loss[i] = min(cycle_max_loss[i], cycle_return)
-
-                    seed[i] += proceeds
-                    total_trades[i] += 1
-
-                    if cycle_return > 0:
-                        win_trades[i] += 1
-
-                    total_holding_days_sum[i] += holding_day[i]   # 🔥 추가
-
-                    in_position[i] = False
-                    total_shares[i] = 0
-                    total_invested[i] = 0
-                    holding_day[i] = 0
-                    extending[i] = False
-                    cycle_unit[i] = 0
-                    cycle_start_seed[i] = 0
-                    picked_ticker[i] = None
-                    continue
-                else:
-                    extending[i] = True
-
-            # =====================================================
-            # 물타기 모드
-            # =====================================================
-            if extending[i]:
-
-                if row["High"] >= avg_price * (1 + stop_level):
-                    sell_price = avg_price * (1 + stop_level)
-                    proceeds = total_shares[i] * sell_price
-                    cycle_return = (proceeds - total_invested[i]) / total_invested[i]
-
-                    cycle_max_loss[i] = min(cycle_max_loss[i], cycle_return)
-
-                    seed[i] += proceeds
-                    total_trades[i] += 1
-
-                    total_holding_days_sum[i] += holding_day[i]   # 🔥 추가
-
-                    in_position[i] = False
-                    total_shares[i] = 0
-                    total_invested[i] = 0
-                    holding_day[i] = 0
-                    extending[i] = False
-                    cycle_unit[i] = 0
-                    cycle_start_seed[i] = 0
-                    picked_ticker[i] = None
-                    continue
-
-                if not daily_buy_done[i]:
-                    close_price = row["Close"]
-                    invest = cycle_unit[i]
-                    shares = invest / close_price
-                    total_shares[i] += shares
-                    total_invested[i] += invest
-                    seed[i] -= invest
-                    daily_buy_done[i] = True
-
-            # =====================================================
-            # 일반 구간
-            # =====================================================
-            if not extending[i]:
-
-                if row["High"] >= avg_price * (1 + profit_target):
-                    sell_price = avg_price * (1 + profit_target)
-                    proceeds = total_shares[i] * sell_price
-                    cycle_return = (proceeds - total_invested[i]) / total_invested[i]
-
-                    cycle_max_loss[i] = min(cycle_max_loss[i], cycle_return)
-
-                    seed[i] += proceeds
-                    total_trades[i] += 1
-                    win_trades[i] += 1
-
-                    total_holding_days_sum[i] += holding_day[i]   # 🔥 추가
-
-                    in_position[i] = False
-                    total_shares[i] = 0
-                    total_invested[i] = 0
-                    holding_day[i] = 0
-                    extending[i] = False
-                    cycle_unit[i] = 0
-                    cycle_start_seed[i] = 0
-                    picked_ticker[i] = None
-                    continue
-
-                close_price = row["Close"]
-
-                if not daily_buy_done[i]:
-                    if close_price <= avg_price:
-                        invest = cycle_unit[i]
-                    elif close_price <= avg_price * 1.05:
-                        invest = cycle_unit[i] / 2
-                    else:
-                        invest = 0
-
-                    if invest > 0:
-                        shares = invest / close_price
-                        total_shares[i] += shares
-                        total_invested[i] += invest
-                        seed[i] -= invest
-                        daily_buy_done[i] = True
-
-        # =========================
-        # MDD 계산 (기존 유지)
-        # =========================
-        if in_position[i] and picked_ticker[i] in day_data.index:
-            current_price = day_data.loc[picked_ticker[i]]["Close"]
-            current_value = total_shares[i] * current_price
         else:
-            current_value = 0
-
-        equity = seed[i] + current_value
-
-        if equity > max_equity[i]:
-            max_equity[i] = equity
-
-        dd = (equity - max_equity[i]) / max_equity[i]
-
-        if dd < max_dd[i]:
-            max_dd[i] = dd
-
-
-# ============================================================
-# 결과 생성
-# ============================================================
+            state = run_vector_engine(
+                cube, param_grid, INITIAL_SEED, state, t_start, None, equity
+            )
+            final_value = mark_to_market(cube, state)
 
-results = []
+        if isinstance(equity, np.memmap):
+            equity.flush()
+            print(f"✅ Equity store 저장: {EQUITY_DIR} {equity.shape}")
 
-for i, (q, ev_cut, profit_target, max_days, stop_level) in enumerate(param_grid):
+        metrics = compute_metrics(equity, cube["dates"], INITIAL_SEED, state["in_position_days"])
 
-    if in_position[i]:
-        last_date = df["Date"].max()
-        last_day = df[df["Date"] == last_date].set_index("Ticker")
-        if picked_ticker[i] in last_day.index:
-            current_value = total_shares[i] * last_day.loc[picked_ticker[i]]["Close"]
-        else:
-            current_value = 0
+        save_checkpoint(CHECKPOINT_PATH, state, cube, param_grid)
     else:
-        current_value = 0
-
-    final_equity = seed[i] + current_value
-
-    success_rate = (
-        win_trades[i] / total_trades[i] if total_trades[i] > 0 else 0
-    )
-
-    avg_holding = (
-        total_holding_days_sum[i] / total_trades[i]
-        if total_trades[i] > 0 else 0
-    )  # 🔥 추가
-
-    results.append({
-        "Scenario": scenario,
-        "EV_quantile": q,
-        "EV_cut": ev_cut,
-        "Profit_Target": profit_target,
-        "Max_Holding_Days": max_days,
-        "Actual_Max_Holding_Days": actual_max_holding_days[i],
-        "Exceeded_Max_Days_Count": exceeded_max_days_count[i],  # 🔥 추가
-        "Avg_Holding_Days": avg_holding,                        # 🔥 추가
-        "Stop_Level": stop_level,
-        "Total_Return": (final_equity / INITIAL_SEED) - 1,
-        "Seed_Multiple": final_equity / INITIAL_SEED,
-        "Max_Drawdown": max_dd[i],
-        "Max_Loss_Rate": cycle_max_loss[i],
-        "Idle_Days": idle_days[i],
-        "Success_Rate": success_rate,
-        "Cycle_Count": total_trades[i],
-    })
-
-results_df = pd.DataFrame(results)
-results_df = results_df.sort_values("Seed_Multiple", ascending=False)
-results_df.to_csv(OUTPUT_PATH, index=False)
-
-print("✅ Numpy Engine Complete (Exceeded Count + Avg Holding Added)")
-print(results_df.head(10))
+        df = pd.read_csv(INPUT_PATH, parse_dates=["Date"])
+        df = df.sort_values(["Date", "Ticker"])
+        param_grid = build_param_grid(
+            df["EV"], ev_quantiles, holding_days_list, stop_levels, profit_targets
+        )
+        state, final_value = run_loop_engine(df, param_grid, INITIAL_SEED)
+
+    # ============================================================
+    # 결과 생성
+    # ============================================================
+
+    results_df = build_results(param_grid, state, final_value, scenario, INITIAL_SEED)
+    if args.engine == "vector":
+        results_df = pd.concat([results_df, metrics], axis=1)
+        # trace 파일과 같은 실행인지 확인하는 키 (패널 + 그리드 해시)
+        results_df["Run_Id"] = run_hash(cube, param_grid)
+    results_df = results_df.sort_values("Seed_Multiple", ascending=False)
+    results_df.to_csv(OUTPUT_PATH, index=False)
+
+    # ============================================================
+    # 상위 K개 trace: 파라미터끼리 독립이므로 K개만 처음부터 다시 돌려 기록
+    # (그리드 전체를 기록하지 않는다 → 추가 시간 / 메모리는 K / P 수준)
+    # ============================================================
+    if args.engine == "vector" and args.trace_top > 0:
+        top_index = results_df.index[: args.trace_top].to_numpy()
+        top_grid = [param_grid[i] for i in top_index]
+
+        trace = new_trace(np.ones(len(top_grid), dtype=bool))
+        run_vector_engine(cube, top_grid, INITIAL_SEED, trace=trace)
+
+        for frame, path in zip(trace_frames(trace, cube, top_grid), [CYCLE_TRACE_PATH, FILL_TRACE_PATH]):
+            if len(frame):
+                frame.insert(0, "Rank", frame["Param_Index"].to_numpy() + 1)
+                frame["Param_Index"] = top_index[frame["Param_Index"].to_numpy()]
+            frame["Run_Id"] = results_df["Run_Id"].iloc[0]
+            frame.to_csv(path, index=False)
+            print(f"✅ Trace 저장: {path} ({len(frame)} rows)")
+
+    print(f"✅ Numpy Engine Complete ({args.engine}, workers={args.workers})")
+    print(results_df.head(10))
+
+
+if __name__ == "__main__":
+    main()
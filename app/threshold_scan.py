@@ -0,0 +1,101 @@
+import numpy as np
+
+# ============================================================
+# Threshold 스캐너 (정렬 1번 + 누적합)
+# ============================================================
+# "컬럼 op threshold" 조건을 만족하는 행 수 / 성공 수 / 성공률을
+#   - 1차원: 값을 한 번 정렬하고 누적합 → 모든 고유 threshold 를 O(n log n) 에
+#   - 2차원: threshold 축마다 searchsorted 로 칸 번호 → 2차원 히스토그램 (bincount)
+#            → op 방향으로 누적합 → 모든 (x, y) threshold 쌍을 O(n log m + m²) 에
+# op 는 ">", ">=", "<", "<=" (pandas 필터와 같이 NaN 행은 어떤 조건도 만족하지 않음)
+
+OPS = [">", ">=", "<", "<="]
+
+
+def _valid(values, success):
+    values = np.asarray(values, dtype=np.float64)
+    success = np.asarray(success, dtype=np.float64)
+    keep = ~np.isnan(values) & ~np.isnan(success)
+    return values[keep], success[keep]
+
+
+def _pass_index(sorted_values, thresholds, op):
+    # 정렬된 값에서 조건을 만족하는 구간 경계 (">" 계열은 [k, n), "<" 계열은 [0, k))
+    side = {">": "right", ">=": "left", "<": "left", "<=": "right"}[op]
+    return np.searchsorted(sorted_values, thresholds, side=side)
+
+
+def counts_at(values, success, thresholds, op=">"):
+    # 반환: (count, success_count) — thresholds 와 같은 길이
+    if op not in OPS:
+        raise ValueError(f"지원하지 않는 op: {op}")
+    values, success = _valid(values, success)
+    order = np.argsort(values, kind="stable")
+    sorted_values = values[order]
+    csum = np.concatenate([[0.0], np.cumsum(success[order])])
+
+    k = _pass_index(sorted_values, np.asarray(thresholds, dtype=np.float64), op)
+    n = len(sorted_values)
+    if op in (">", ">="):
+        return n - k, csum[n] - csum[k]
+    return k, csum[k]
+
+
+def scan_1d(values, success, op=">"):
+    # 모든 고유값을 threshold 로 → {"Threshold", "Count", "Success", "Success_Rate"}
+    clean, _ = _valid(values, success)
+    thresholds = np.unique(clean)
+    count, succ = counts_at(values, success, thresholds, op)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rate = np.where(count > 0, succ / count, np.nan)
+    return {"Threshold": thresholds, "Count": count, "Success": succ, "Success_Rate": rate}
+
+
+def grid_thresholds(values, bins):
+    # 분위수 기준 threshold (표본이 몰린 구간을 더 촘촘하게), 중복 제거
+    clean = np.asarray(values, dtype=np.float64)
+    clean = clean[~np.isnan(clean)]
+    if not len(clean):
+        return np.array([])
+    return np.unique(np.quantile(clean, np.linspace(0, 1, bins + 1)))
+
+
+def _axis_bins(values, thresholds, op):
+    # 칸 번호 b ∈ [0, m]: 조건 "값 op thresholds[i]" 가 성립하는 i 가 누적합 방향으로 한 덩어리가 되게
+    side = {">": "left", ">=": "right", "<": "right", "<=": "left"}[op]
+    return np.searchsorted(thresholds, values, side=side)
+
+
+def _cumulate(h, axis, op):
+    # ">" 계열: 칸 b 가 i < b 인 threshold 를 만족 → 뒤쪽 누적 / "<" 계열: i ≥ b → 앞쪽 누적
+    if op in (">", ">="):
+        return np.flip(np.cumsum(np.flip(h, axis), axis=axis), axis).take(np.arange(1, h.shape[axis]), axis=axis)
+    return np.cumsum(h, axis=axis).take(np.arange(h.shape[axis] - 1), axis=axis)
+
+
+def scan_2d(x, y, success, x_thresholds, y_thresholds, x_op=">", y_op=">"):
+    # 반환: {"x": x_thresholds, "y": y_thresholds, "count": (m, k), "success": (m, k), "rate": (m, k)}
+    #   count[i, j] = #(x x_op x_thresholds[i] & y y_op y_thresholds[j])
+    for op in (x_op, y_op):
+        if op not in OPS:
+            raise ValueError(f"지원하지 않는 op: {op}")
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    success = np.asarray(success, dtype=np.float64)
+    keep = ~np.isnan(x) & ~np.isnan(y) & ~np.isnan(success)
+    x, y, success = x[keep], y[keep], success[keep]
+
+    xt = np.sort(np.asarray(x_thresholds, dtype=np.float64))
+    yt = np.sort(np.asarray(y_thresholds, dtype=np.float64))
+    m, k = len(xt), len(yt)
+
+    cell = _axis_bins(x, xt, x_op) * (k + 1) + _axis_bins(y, yt, y_op)
+    size = (m + 1) * (k + 1)
+    hist_n = np.bincount(cell, minlength=size).reshape(m + 1, k + 1)
+    hist_s = np.bincount(cell, weights=success, minlength=size).reshape(m + 1, k + 1)
+
+    count = _cumulate(_cumulate(hist_n, 0, x_op), 1, y_op)
+    succ = _cumulate(_cumulate(hist_s, 0, x_op), 1, y_op)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rate = np.where(count > 0, succ / count, np.nan)
+    return {"x": xt, "y": yt, "count": count, "success": succ, "rate": rate}
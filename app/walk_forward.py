@@ -0,0 +1,144 @@
+import argparse
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from panel_cube import load_panel_cube, open_cube, cube_ev_values, CUBE_DIR
+from risk_metrics import compute_metrics
+from backtest_engine import build_param_grid, run_vector_engine, equity_value
+from run_parametric_backtest import (
+    INPUT_PATH,
+    INITIAL_SEED,
+    profit_targets,
+    ev_quantiles,
+    holding_days_list,
+    stop_levels,
+)
+
+# ============================================================
+# Walk-forward 최적화
+# ============================================================
+# 컴파일된 패널 cube 위에서 학습 구간 [a, b) 마다 그리드를 돌려 최적 파라미터를 고르고,
+# 바로 다음 검증 구간 [b, c) 에 새 시드로 적용한다.
+# - EV_cut 분위수는 학습 구간 EV 로만 계산 (미래 EV 누수 없음)
+# - 검증 구간 종료 시 보유 중인 포지션은 마지막 종가로 평가
+# - fold 는 서로 독립이므로 워커마다 cube 를 mmap 으로 열어 병렬 실행
+# 검증 구간 평가금액을 이어 붙인 것이 out-of-sample 곡선
+
+FOLD_PATH = "data/walk_forward_folds.csv"
+EQUITY_PATH = "data/walk_forward_equity.csv"
+
+TRAIN_DAYS = 504
+TEST_DAYS = 126
+
+
+def build_folds(n_dates, train_days, test_days, anchored=False):
+    folds = []
+    b = train_days
+    while b < n_dates:
+        a = 0 if anchored else b - train_days
+        c = min(b + test_days, n_dates)
+        folds.append((a, b, c))
+        b = c
+    return folds
+
+
+def run_fold(cube_dir, fold):
+    a, b, c = fold
+    cube = open_cube(cube_dir)
+
+    # 학습: 구간 EV 분위수로 그리드 생성 → 구간 끝 평가금액 최대 파라미터
+    param_grid = build_param_grid(
+        cube_ev_values(cube, a, b), ev_quantiles, holding_days_list, stop_levels, profit_targets
+    )
+    state = run_vector_engine(cube, param_grid, INITIAL_SEED, t_start=a, t_end=b)
+    train_multiple = equity_value(state) / INITIAL_SEED
+    best = int(np.argmax(train_multiple))
+
+    # 검증: 고른 파라미터 1개를 새 시드로 [b, c) 실행
+    equity = np.zeros((1, c), dtype=np.float64)
+    run_vector_engine(
+        cube, [param_grid[best]], INITIAL_SEED, t_start=b, t_end=c, equity_out=equity
+    )
+    return param_grid[best], train_multiple[best], equity[0, b:c]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--train-days", type=int, default=TRAIN_DAYS, help="학습 구간 길이 (거래일)")
+    parser.add_argument("--test-days", type=int, default=TEST_DAYS, help="검증 구간 길이 (거래일)")
+    parser.add_argument("--anchored", action="store_true", help="학습 구간 시작을 처음으로 고정 (expanding window)")
+    parser.add_argument("--workers", type=int, default=1, help="fold 를 N개 프로세스로 병렬 실행")
+    args = parser.parse_args()
+
+    cube = load_panel_cube(INPUT_PATH, CUBE_DIR)
+    dates = pd.to_datetime(np.asarray(cube["dates"]))
+
+    folds = build_folds(len(dates), args.train_days, args.test_days, args.anchored)
+    if not folds:
+        print(f"⚠️ 패널 기간({len(dates)}일)이 학습 구간보다 짧음")
+        return
+    print(f"🔁 Walk-forward: {len(folds)} folds (train={args.train_days}, test={args.test_days}, workers={args.workers})")
+
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(folds))) as executor:
+            parts = list(executor.map(run_fold, [CUBE_DIR] * len(folds), folds))
+    else:
+        parts = [run_fold(CUBE_DIR, fold) for fold in folds]
+
+    # ============================================================
+    # 검증 구간 곡선 이어 붙이기 (각 fold 수익률을 누적)
+    # ============================================================
+    fold_rows = []
+    curves = []
+    level = 1.0
+
+    for i, ((a, b, c), (param, train_multiple, test_equity)) in enumerate(zip(folds, parts)):
+        q, ev_cut, profit_target, max_days, stop_level = param
+        test_multiple = test_equity[-1] / INITIAL_SEED
+
+        curves.append(pd.DataFrame({
+            "Date": dates[b:c],
+            "Fold": i,
+            "Fold_Equity": test_equity,
+            "Equity": level * test_equity,
+        }))
+        level *= test_multiple
+
+        fold_rows.append({
+            "Fold": i,
+            "Train_Start": dates[a].date(),
+            "Train_End": dates[b - 1].date(),
+            "Test_Start": dates[b].date(),
+            "Test_End": dates[c - 1].date(),
+            "EV_quantile": q,
+            "EV_cut": ev_cut,
+            "Profit_Target": profit_target,
+            "Max_Holding_Days": max_days,
+            "Stop_Level": stop_level,
+            "Train_Seed_Multiple": train_multiple,
+            "Test_Seed_Multiple": test_multiple,
+        })
+
+    fold_df = pd.DataFrame(fold_rows)
+    equity_df = pd.concat(curves, ignore_index=True)
+    fold_df.to_csv(FOLD_PATH, index=False)
+    equity_df.to_csv(EQUITY_PATH, index=False)
+
+    oos = compute_metrics(
+        equity_df["Equity"].to_numpy()[None, :], equity_df["Date"], INITIAL_SEED
+    ).iloc[0]
+
+    print("=" * 60)
+    print(fold_df[["Fold", "Test_Start", "Test_End", "EV_quantile", "Profit_Target",
+                   "Max_Holding_Days", "Stop_Level", "Train_Seed_Multiple", "Test_Seed_Multiple"]])
+    print("-" * 60)
+    print(f"OOS Seed_Multiple : {level:.4f}")
+    print(f"OOS CAGR          : {oos['CAGR']:.2%}")
+    print(f"OOS Sharpe        : {oos['Sharpe']:.2f}")
+    print("=" * 60)
+    print(f"✅ 저장 완료 → {FOLD_PATH}, {EQUITY_PATH}")
+
+
+if __name__ == "__main__":
+    main()